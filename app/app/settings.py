@@ -72,6 +72,82 @@ DATABASES = {
     }
 }
 
+# Cache
+# Local memory by default. Point CACHE_BACKEND and CACHE_LOCATION at a
+# shared backend (e.g. memcached or redis) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Threads running the async read views. Each keeps a database connection.
+ASYNC_VIEW_THREADS = int(os.environ.get('ASYNC_VIEW_THREADS', 8))
+
+# Cache alias and timeout (seconds) for recipe API list responses.
+RECIPE_CACHE_ALIAS = 'default'
+RECIPE_CACHE_TIMEOUT = 300
+
+# Cache list responses, and send ETags and answer If-None-Match with 304
+# on recipe API reads. None enables them only when RECIPE_CACHE_ALIAS is
+# shared between processes, since they rely on a per-user version counter
+# kept there.
+RECIPE_CACHE_LISTS = None
+RECIPE_ETAGS = None
+
+# Build list responses from values() rows rather than model instances.
+RECIPE_FAST_LIST = True
+
+# Recipes read and serialized at a time by the streaming export.
+RECIPE_EXPORT_CHUNK_SIZE = 500
+
+# Recipe bulk endpoint: maximum items per request and rows per statement.
+RECIPE_BULK_MAX_ITEMS = 1000
+RECIPE_BULK_BATCH_SIZE = 500
+
+# Recipe import: rows written per transaction and row errors reported.
+RECIPE_IMPORT_BATCH_SIZE = 500
+RECIPE_IMPORT_MAX_ERRORS = 100
+
+# Tag and ingredient autocomplete: default and largest number of matches.
+# The names of up to RECIPE_AUTOCOMPLETE_CACHE_USERS users are kept in
+# memory per process, for users with at most CACHE_MAX_NAMES names, when
+# RECIPE_CACHE_ALIAS is shared between processes. Set CACHE_USERS to 0 to
+# always query the database.
+RECIPE_AUTOCOMPLETE_LIMIT = 10
+RECIPE_AUTOCOMPLETE_MAX_LIMIT = 50
+RECIPE_AUTOCOMPLETE_CACHE_USERS = 256
+RECIPE_AUTOCOMPLETE_CACHE_MAX_NAMES = 5000
+
+# Recipe image variants: name to longest edge in pixels. Each is written as
+# WebP and JPEG by RECIPE_IMAGE_WORKERS background threads. Set
+# RECIPE_IMAGE_PROCESSING to 'sync' to render them when the upload commits.
+RECIPE_IMAGE_VARIANTS = {
+    'thumb': 200,
+    'medium': 800,
+}
+RECIPE_IMAGE_QUALITY = 80
+RECIPE_IMAGE_WORKERS = 2
+RECIPE_IMAGE_PROCESSING = 'thread'
+# Seconds a job may stay processing before process_image_jobs reruns it.
+RECIPE_IMAGE_JOB_TIMEOUT = 600
+# Largest accepted recipe image upload, in bytes and in pixels.
+RECIPE_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+RECIPE_IMAGE_MAX_PIXELS = 40 * 1000 * 1000
+
+# Token authentication cache. Tokens are kept in a per-process LRU of
+# MAX_SIZE entries for TTL seconds. Set SHARED_ALIAS to a CACHES alias to
+# also share them between processes.
+TOKEN_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 60,
+    'SHARED_ALIAS': None,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -105,6 +181,55 @@ USE_TZ = True
 
 AUTH_USER_MODEL = 'core.User'
 
+# Loads the user's API token with the user on login.
+AUTHENTICATION_BACKENDS = [
+    'core.backends.TokenModelBackend',
+]
+
+# Password hashing
+# New hashes use PASSWORD_HASH_ITERATIONS rounds of PBKDF2-SHA256, hashes
+# with another count are upgraded on the user's next login. The other
+# hashers only verify passwords hashed before switching to them.
+PASSWORD_HASHERS = [
+    'core.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get('PASSWORD_HASH_ITERATIONS', 260000))
+
+# The async login and signup views hash in a pool of
+# PASSWORD_HASH_WORKERS processes ('thread' for threads). Up to
+# PASSWORD_HASH_QUEUE_SIZE more hashes may wait, further requests get a
+# 429. Wait time counters are kept in the PASSWORD_HASH_STATS_ALIAS cache,
+# which must be shared with the hash_pool_stats command, e.g. memcached or
+# redis. Unset, no counters are kept.
+PASSWORD_HASH_POOL = os.environ.get('PASSWORD_HASH_POOL', 'process')
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE_SIZE = int(
+    os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))
+PASSWORD_HASH_STATS_ALIAS = os.environ.get('PASSWORD_HASH_STATS_ALIAS')
+
+# Django REST framework
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'recipe.pagination.RecipeCursorPagination',
+    # Default number of items per page on list endpoints. Clients may ask
+    # for a different size with the `page_size` query parameter.
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 100)),
+    # JSON is encoded and decoded with orjson when it is installed, with
+    # the same output as DRF's stdlib JSONRenderer and JSONParser.
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 # Static Files
 STATIC_URL = '/static/'
 STATIC_ROOT = '/web/static'
@@ -112,6 +237,16 @@ STATIC_ROOT = '/web/static'
 # Media Files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = '/web/media'
+# Uploads are named by content hash, so identical files are stored once.
+# Unreferenced files are removed by the gc_media command.
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+# Media serving. Content-addressed files are cached for a year, other files
+# for MEDIA_MAX_AGE seconds. Set MEDIA_SENDFILE to 'x-sendfile' (Apache) or
+# 'x-accel-redirect' (nginx, internal location MEDIA_ACCEL_PREFIX) to have
+# the web server send file bytes instead of the application.
+MEDIA_MAX_AGE = 3600
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
 
 
 # Default primary key field type
@@ -1,7 +1,8 @@
+import re
 from django.contrib import admin
-from django.urls import path, include
-from django.conf.urls.static import static
+from django.urls import path, re_path, include
 from django.conf import settings
+from core.views import serve_media
 
 urlpatterns = [
     path(
@@ -16,4 +17,9 @@ urlpatterns = [
         'api/recipe/',
         include('recipe.urls')
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(
+        r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+        serve_media,
+        name='media'
+    ),
+]
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Tag, Ingredient, Recipe
+from .models import User, Tag, Ingredient, Recipe, ImageJob, StoredFile
 from django.utils.translation import gettext as _
 
 
@@ -35,3 +35,5 @@ admin.site.register(User, UserAdmin)
 admin.site.register(Tag)
 admin.site.register(Ingredient)
 admin.site.register(Recipe)
+admin.site.register(ImageJob)
+admin.site.register(StoredFile)
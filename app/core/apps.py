@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """
+        Connects the token cache invalidation signal handlers and
+        registers the system checks.
+        """
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,208 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import DEFERRED
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+SHARED_KEY = 'auth:token:{digest}'
+
+
+class TokenCache:
+    """
+    Bounded in-process LRU cache of authenticated tokens.
+
+    Entries expire after `ttl` seconds. Signals only reach the process
+    that made the change, so the TTL bounds how long other processes may
+    keep accepting a deleted token or a deactivated user.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value):
+        """
+        Caches value for key, evicting the least recently used entries.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Removes key from the cache.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_local_cache = None
+
+
+def get_local_cache():
+    """
+    Returns the process wide token cache, creating it on first use.
+    """
+    global _local_cache
+    if _local_cache is None:
+        options = getattr(settings, 'TOKEN_CACHE', {})
+        _local_cache = TokenCache(
+            maxsize=options.get('MAX_SIZE', 1024),
+            ttl=options.get('TTL', 60),
+        )
+
+    return _local_cache
+
+
+def get_shared_cache():
+    """
+    Returns the optional shared cache tier, or None when not configured.
+    """
+    alias = getattr(settings, 'TOKEN_CACHE', {}).get('SHARED_ALIAS')
+
+    return caches[alias] if alias else None
+
+
+def shared_key(key):
+    """
+    Returns the shared cache key for a token without exposing the token.
+    """
+    return SHARED_KEY.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+
+def invalidate_token(key):
+    """
+    Removes a token from every cache tier.
+    """
+    get_local_cache().delete(key)
+    shared = get_shared_cache()
+    if shared is not None:
+        shared.delete(shared_key(key))
+
+
+def issue_token(user):
+    """
+    Returns the API token of user, creating it on first use.
+
+    A token loaded with the user, e.g. by TokenModelBackend, costs no
+    query, a missing one a single INSERT. Tokens created concurrently
+    by another request are read back instead.
+    """
+    try:
+        return user.auth_token
+    except ObjectDoesNotExist:
+        pass
+    try:
+        with transaction.atomic():
+            return Token.objects.create(user=user)
+    except IntegrityError:
+        return Token.objects.get(user=user)
+
+
+def cached_user(user_id, is_active):
+    """
+    Returns a user with only its ID and active flag loaded.
+
+    Other fields are deferred and load from the database when accessed,
+    and saving writes only the loaded fields.
+    """
+    UserModel = get_user_model()
+    loaded = {UserModel._meta.pk.attname: user_id, 'is_active': is_active}
+    values = [loaded.get(field.attname, DEFERRED)
+              for field in UserModel._meta.concrete_fields]
+
+    return UserModel.from_db(UserModel.objects.db, None, values)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the token and user lookup.
+
+    Reads go to the in-process LRU first, then to the shared cache if one
+    is configured, and only then to the database. Only the user's ID and
+    active flag are cached, so such requests get a user whose other fields
+    load on access. Writes always check the token against the database.
+    """
+    refresh = False
+
+    def authenticate(self, request):
+        """
+        Authenticates request, bypassing the caches for unsafe methods.
+        """
+        self.refresh = request.method not in SAFE_METHODS
+
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        """
+        Returns the user and token for key, using the caches when possible.
+        """
+        local = get_local_cache()
+        shared = get_shared_cache()
+        payload = None if self.refresh else local.get(key)
+        if payload is None and shared is not None and not self.refresh:
+            payload = shared.get(shared_key(key))
+            if payload is not None:
+                local.set(key, payload)
+
+        if payload is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            payload = (token.user_id, token.user.is_active)
+            local.set(key, payload)
+            if shared is not None:
+                shared.set(shared_key(key), payload, local.ttl)
+        else:
+            user_id, is_active = payload
+            token = self.get_model()(key=key, user_id=user_id)
+            token.user = cached_user(user_id, is_active)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (token.user, token)
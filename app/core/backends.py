@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class TokenModelBackend(ModelBackend):
+    """
+    Model backend loading the user's API token along with the user.
+
+    Token logins then find an existing token without another query.
+    Behaves like ModelBackend otherwise, including hashing a password
+    for unknown users so response times do not reveal which exist.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        """
+        Returns the active user with these credentials, or None.
+        """
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.select_related(
+                'auth_token').get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and \
+                self.user_can_authenticate(user):
+            return user
+
+        return None
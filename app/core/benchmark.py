@@ -0,0 +1,103 @@
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from core.models import Tag, Ingredient, Recipe
+
+
+class Rollback(Exception):
+    """
+    Raised to discard everything a benchmark wrote to the database.
+    """
+
+
+@contextmanager
+def rolled_back():
+    """
+    Runs the block in a transaction that is always rolled back.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def measure(func, repeat=5):
+    """
+    Calls func repeatedly and returns the median duration in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def create_benchmark_user():
+    """
+    Creates a throwaway user to own the seeded rows.
+    """
+    return get_user_model().objects.create_user(
+        f'benchmark-{uuid.uuid4().hex}@blainesmith.me',
+        uuid.uuid4().hex,
+    )
+
+
+def seed_recipes(user, count, tags=20, ingredients=50, per_recipe=3):
+    """
+    Bulk creates recipes for user, each linked to tags and ingredients.
+
+    Returns the tag and ingredient IDs so callers can filter on them.
+    """
+    Tag.objects.bulk_create(
+        Tag(user=user, name=f'Tag {i}') for i in range(tags)
+    )
+    Ingredient.objects.bulk_create(
+        Ingredient(user=user, name=f'Ingredient {i}')
+        for i in range(ingredients)
+    )
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                user=user,
+                title=f'Recipe {i}',
+                prep_time_mins=10,
+                cook_time_mins=20,
+                price='9.99',
+            )
+            for i in range(count)
+        ),
+        batch_size=1000,
+    )
+    # Not every backend returns primary keys from bulk inserts.
+    tag_ids = list(
+        Tag.objects.filter(user=user).values_list('id', flat=True))
+    ingredient_ids = list(
+        Ingredient.objects.filter(user=user).values_list('id', flat=True))
+    recipe_ids = Recipe.objects.filter(user=user).values_list('id', flat=True)
+
+    tag_links = []
+    ingredient_links = []
+    for n, recipe_id in enumerate(recipe_ids.iterator()):
+        for k in range(min(per_recipe, tags, ingredients)):
+            tag_links.append(Recipe.tags.through(
+                recipe_id=recipe_id,
+                tag_id=tag_ids[(n + k) % len(tag_ids)],
+            ))
+            ingredient_links.append(Recipe.ingredients.through(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_ids[(n + k) % len(ingredient_ids)],
+            ))
+    Recipe.tags.through.objects.bulk_create(tag_links, batch_size=1000)
+    Recipe.ingredients.through.objects.bulk_create(
+        ingredient_links,
+        batch_size=1000,
+    )
+
+    return tag_ids, ingredient_ids
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from .hashing import get_stats_cache, stats_shared
+
+
+@register()
+def check_hash_stats_cache(app_configs, **kwargs):
+    """
+    Warns when the hashing pool counters are kept in a per-process cache.
+
+    The hash_pool_stats command runs in its own process and could never
+    read them.
+    """
+    if get_stats_cache() is not None and not stats_shared():
+        return [
+            Warning(
+                'PASSWORD_HASH_STATS_ALIAS is a per-process cache.',
+                hint=(
+                    'Point it at a cache shared with the hash_pool_stats '
+                    'command, such as memcached or redis, or unset it.'
+                ),
+                obj=settings.PASSWORD_HASH_STATS_ALIAS,
+                id='core.W001',
+            )
+        ]
+
+    return []
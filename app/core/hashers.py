@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 hasher with the work factor taken from settings.
+
+    PASSWORD_HASH_ITERATIONS sets the iterations of new hashes. Hashes
+    made with any other count still verify, and are rewritten with the
+    configured count on the user's next successful login, so the policy
+    can be raised or lowered without a password reset.
+    """
+
+    @property
+    def iterations(self):
+        """
+        Returns the configured number of PBKDF2 iterations.
+        """
+        return getattr(
+            settings,
+            'PASSWORD_HASH_ITERATIONS',
+            hashers.PBKDF2PasswordHasher.iterations,
+        )
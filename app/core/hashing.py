@@ -0,0 +1,262 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+STATS_KEY = 'auth:hashpool:{name}'
+STATS_NAMES = ('jobs', 'wait_ms', 'rejected')
+# Upper bounds in milliseconds of the wait time histogram buckets.
+WAIT_BUCKETS = (1, 10, 100, 1000)
+
+
+class PoolSaturated(Exception):
+    """
+    Raised when the hashing queue is full.
+    """
+
+
+def _init_worker():
+    """
+    Sets Django up in a freshly spawned worker process.
+    """
+    import django
+    django.setup()
+
+
+def _make_password(password):
+    """
+    Returns a password hashed with the preferred hasher, and when the
+    work started.
+    """
+    started = time.time()
+
+    return hashers.make_password(password), started
+
+
+def _check_password(password, encoded):
+    """
+    Returns whether password matches encoded, a new hash if the stored
+    one must be upgraded, and when the work started.
+    """
+    started = time.time()
+    upgraded = []
+    valid = hashers.check_password(
+        password,
+        encoded,
+        setter=lambda raw: upgraded.append(hashers.make_password(raw)),
+    )
+
+    return (valid, upgraded[0] if upgraded else None), started
+
+
+class HashPool:
+    """
+    Bounded pool hashing passwords off the event loop.
+
+    At most `workers` hashes run at once, in separate processes so they
+    neither block the event loop nor hold the GIL, and at most
+    `queue_size` more wait for a worker. Beyond that PoolSaturated is
+    raised straight away, letting callers shed load instead of queueing
+    without bound. The time each job waited for a worker is recorded.
+    """
+
+    def __init__(self, workers=2, queue_size=32, kind='process'):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.kind = kind
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self):
+        """
+        Returns the executor, starting it on first use.
+        """
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    # Spawned rather than forked, since the server process
+                    # may be running threads.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix='hash',
+                    )
+
+            return self._executor
+
+    def shutdown(self):
+        """
+        Stops the workers, a new executor is started on the next job.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    async def run(self, func, *args):
+        """
+        Runs func(*args) in the pool and returns its result.
+        """
+        with self._lock:
+            if self.pending >= self.workers + self.queue_size:
+                saturated = True
+            else:
+                saturated = False
+                self.pending += 1
+        if saturated:
+            await asyncio.get_running_loop().run_in_executor(
+                None, record, 'rejected')
+            raise PoolSaturated
+
+        loop = asyncio.get_running_loop()
+        try:
+            submitted = time.time()
+            try:
+                result, started = await loop.run_in_executor(
+                    self.get_executor(), func, *args)
+            except BrokenProcessPool:
+                # A worker died, start afresh for the next job.
+                self.shutdown()
+                raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+        await loop.run_in_executor(
+            None, record_wait, max(started - submitted, 0) * 1000)
+
+        return result
+
+    async def make_password(self, password):
+        """
+        Returns password hashed with the preferred hasher.
+        """
+        return await self.run(_make_password, password)
+
+    async def check_password(self, password, encoded):
+        """
+        Returns whether password matches encoded, and the upgraded hash
+        to store if the hasher settings changed, else None.
+        """
+        return await self.run(_check_password, password, encoded)
+
+
+_pool = None
+
+
+def get_hash_pool():
+    """
+    Returns the process wide hashing pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        _pool = HashPool(
+            workers=getattr(settings, 'PASSWORD_HASH_WORKERS', 2),
+            queue_size=getattr(settings, 'PASSWORD_HASH_QUEUE_SIZE', 32),
+            kind=getattr(settings, 'PASSWORD_HASH_POOL', 'process'),
+        )
+
+    return _pool
+
+
+def get_stats_cache():
+    """
+    Returns the cache holding the pool counters of every process, or None.
+
+    Counters are only kept when PASSWORD_HASH_STATS_ALIAS is set.
+    """
+    alias = getattr(settings, 'PASSWORD_HASH_STATS_ALIAS', None)
+
+    return caches[alias] if alias else None
+
+
+def stats_shared():
+    """
+    Returns whether the pool counters can be read from other processes.
+    """
+    cache = get_stats_cache()
+
+    return cache is not None and not isinstance(
+        cache, (LocMemCache, DummyCache))
+
+
+def record(name, amount=1):
+    """
+    Increments a hashing pool counter.
+    """
+    cache = get_stats_cache()
+    if cache is None:
+        return
+    key = STATS_KEY.format(name=name)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        if not cache.add(key, amount, None):
+            cache.incr(key, amount)
+
+
+def bucket_name(ms):
+    """
+    Returns the histogram bucket counting a wait of ms milliseconds.
+    """
+    for bound in WAIT_BUCKETS:
+        if ms <= bound:
+            return f'wait_le_{bound}ms'
+
+    return f'wait_gt_{WAIT_BUCKETS[-1]}ms'
+
+
+def bucket_names():
+    """
+    Returns the names of the wait time histogram buckets, in order.
+    """
+    return [bucket_name(bound) for bound in WAIT_BUCKETS] + \
+        [bucket_name(WAIT_BUCKETS[-1] + 1)]
+
+
+def record_wait(ms):
+    """
+    Records how long a job waited for a worker.
+    """
+    record('jobs')
+    record('wait_ms', round(ms))
+    record(bucket_name(ms))
+
+
+def hash_pool_stats():
+    """
+    Returns the hashing pool counters.
+    """
+    names = list(STATS_NAMES) + bucket_names()
+    cache = get_stats_cache()
+    values = cache.get_many(
+        [STATS_KEY.format(name=name) for name in names]) if cache else {}
+
+    return {
+        name: values.get(STATS_KEY.format(name=name), 0) for name in names
+    }
+
+
+def reset_hash_pool_stats():
+    """
+    Resets the hashing pool counters.
+    """
+    cache = get_stats_cache()
+    if cache is None:
+        return
+    cache.delete_many([
+        STATS_KEY.format(name=name)
+        for name in list(STATS_NAMES) + bucket_names()
+    ])
@@ -0,0 +1,118 @@
+import os
+import time
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import StoredFile
+
+# Directory holding recipe images and their variants.
+UPLOAD_DIR = 'uploads/recipe'
+# File names looked up per query.
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    """
+    Django command to delete media files no longer referenced.
+
+    Files whose reference count dropped to zero are removed, as are files
+    without any count, such as variants of a replaced image or abandoned
+    partial uploads. Files written within the grace period are kept, since
+    their reference may not be committed yet. Saving a stored file again
+    refreshes its modification time, which is checked again right before
+    the file is deleted.
+    """
+    help = 'Deletes unreferenced recipe image files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=3600,
+            help='Keep files modified within this many seconds.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the files without deleting them.',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.cutoff = time.time() - options['grace']
+        self.deleted = 0
+
+        released = StoredFile.objects.filter(refcount__lte=0)
+        for stored in released.iterator():
+            if not self.is_expired(stored.name):
+                continue
+            if self.dry_run:
+                self.remove(stored.name)
+                continue
+            self.release(stored.pk)
+
+        expired = [
+            name for name in self.walk(UPLOAD_DIR) if self.is_expired(name)
+        ]
+        for start in range(0, len(expired), BATCH_SIZE):
+            batch = expired[start:start + BATCH_SIZE]
+            counted = set(StoredFile.objects.filter(
+                name__in=batch).values_list('name', flat=True))
+            for name in batch:
+                if name not in counted:
+                    self.remove(name)
+
+        verb = 'Would delete' if self.dry_run else 'Deleted'
+        self.stdout.write(
+            self.style.SUCCESS(f'{verb} {self.deleted} files')
+        )
+
+    def release(self, pk):
+        """
+        Deletes a released file and its row, unless referenced meanwhile.
+
+        The row stays locked until both are gone, so a reference added
+        concurrently is counted against a new row.
+        """
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(
+                pk=pk, refcount__lte=0).first()
+            if stored is not None and self.remove(stored.name):
+                stored.delete()
+
+    def walk(self, directory):
+        """
+        Yields the names of all files below a storage directory.
+        """
+        if not default_storage.exists(directory):
+            return
+        directories, files = default_storage.listdir(directory)
+        for name in files:
+            yield os.path.join(directory, name)
+        for subdirectory in directories:
+            yield from self.walk(os.path.join(directory, subdirectory))
+
+    def is_expired(self, name):
+        """
+        Returns whether a file is missing or older than the grace period.
+        """
+        if not default_storage.exists(name):
+            return True
+
+        return default_storage.get_modified_time(name).timestamp() \
+            < self.cutoff
+
+    def remove(self, name):
+        """
+        Deletes a file from storage, or only reports it on a dry run.
+
+        Returns whether the file was deleted. Files saved again since the
+        grace period started are kept.
+        """
+        if self.dry_run:
+            self.stdout.write(name)
+        elif not default_storage.delete_unless_modified(name, self.cutoff):
+            return False
+        self.deleted += 1
+
+        return True
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.hashing import (bucket_names, hash_pool_stats,
+                          reset_hash_pool_stats, stats_shared)
+
+
+class Command(BaseCommand):
+    """
+    Django command to show the password hashing pool counters.
+
+    The counters are kept in PASSWORD_HASH_STATS_ALIAS, which must be
+    shared with the server processes for this command to read them.
+    """
+    help = 'Shows password hashing pool jobs, wait times and rejections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after showing them.',
+        )
+
+    def handle(self, *args, **options):
+        if not stats_shared():
+            raise CommandError(
+                'PASSWORD_HASH_STATS_ALIAS is unset or a per-process '
+                'cache, the counters are not visible to this command.'
+            )
+        stats = hash_pool_stats()
+        jobs = stats['jobs']
+        mean = stats['wait_ms'] / jobs if jobs else 0
+        self.stdout.write(
+            f"jobs={jobs} rejected={stats['rejected']} "
+            f'mean_wait={mean:.1f}ms'
+        )
+        self.stdout.write(
+            ' '.join(f'{name}={stats[name]}' for name in bucket_names()))
+        if options['reset']:
+            reset_hash_pool_stats()
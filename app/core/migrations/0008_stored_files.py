@@ -0,0 +1,40 @@
+# Generated by Django 3.2.6 on 2026-10-16 20:47
+
+from collections import Counter
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    """
+    Counts the files recipes already refer to, so gc_media keeps them.
+    """
+    Recipe = apps.get_model('core', 'Recipe')
+    StoredFile = apps.get_model('core', 'StoredFile')
+    counts = Counter()
+    recipes = Recipe.objects.exclude(image='').exclude(image=None)
+    for image, variants in recipes.values_list('image', 'image_variants'):
+        counts[image] += 1
+        counts.update(set((variants or {}).values()))
+    StoredFile.objects.bulk_create(
+        [StoredFile(name=name, refcount=n) for name, n in counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refcount', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.6 on 2026-10-16 20:51
+
+from collections import defaultdict
+from django.db import migrations, models
+
+CREATE_INDEX = (
+    "CREATE INDEX core_recipe_search_idx ON core_recipe "
+    "USING GIN (to_tsvector('english'::regconfig, search_document))"
+)
+DROP_INDEX = 'DROP INDEX core_recipe_search_idx'
+
+
+def build_documents(apps, schema_editor):
+    """
+    Fills the search documents of existing recipes.
+    """
+    Recipe = apps.get_model('core', 'Recipe')
+    names = defaultdict(list)
+    for field, related in (('tags', 'tag'), ('ingredients', 'ingredient')):
+        through = Recipe._meta.get_field(field).remote_field.through
+        links = through.objects.order_by(f'{related}__name').values_list(
+            'recipe_id', f'{related}__name')
+        for recipe_id, name in links.iterator():
+            names[recipe_id].append(name)
+
+    recipes = list(Recipe.objects.only('id', 'title'))
+    for recipe in recipes:
+        recipe.search_document = '\n'.join(
+            ' '.join(text.split())
+            for text in [recipe.title, *names[recipe.pk]]
+        )
+    Recipe.objects.bulk_update(recipes, ['search_document'], batch_size=500)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Indexes the search documents for full-text search on PostgreSQL.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    """
+    Drops the full-text search index.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_stored_files'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
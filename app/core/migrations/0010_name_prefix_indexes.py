@@ -0,0 +1,42 @@
+# Generated by Django 3.2.6 on 2026-10-16 21:02
+
+from django.db import migrations
+
+TABLES = ('core_tag', 'core_ingredient')
+
+
+def create_prefix_indexes(apps, schema_editor):
+    """
+    Indexes upper-cased names for case-insensitive prefix matches.
+
+    text_pattern_ops lets PostgreSQL answer LIKE 'prefix%' from the index
+    whatever the database collation.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            f'CREATE INDEX {table}_user_prefix_idx ON {table} '
+            f'(user_id, UPPER(name) text_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    """
+    Drops the name prefix indexes.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(f'DROP INDEX {table}_user_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipe_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.6 on 2026-10-16 22:10
+
+from django.db import migrations
+from django.db.models import F, OuterRef, Subquery
+
+# Duplicates merged per batch of queries.
+BATCH_SIZE = 500
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Merges tags and ingredients sharing a user and name into the oldest.
+
+    Recipe links to a duplicate are moved to the kept object in bulk,
+    skipping recipes that already link to it, before the duplicates are
+    deleted.
+    """
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field in (('Tag', 'tags'), ('Ingredient', 'ingredients')):
+        model = apps.get_model('core', model_name)
+        through = Recipe._meta.get_field(field).remote_field.through
+        column = f'{model._meta.model_name}_id'
+        oldest = model.objects.filter(
+            user_id=OuterRef('user_id'),
+            name=OuterRef('name'),
+        ).order_by('id').values('id')[:1]
+        duplicates = list(
+            model.objects.annotate(keep=Subquery(oldest)).exclude(
+                id=F('keep')).values_list('id', 'keep')
+        )
+        for start in range(0, len(duplicates), BATCH_SIZE):
+            kept = dict(duplicates[start:start + BATCH_SIZE])
+            links = through.objects.filter(**{f'{column}__in': list(kept)})
+            through.objects.bulk_create(
+                [
+                    through(recipe_id=recipe_id, **{column: kept[pk]})
+                    for recipe_id, pk in links.values_list(
+                        'recipe_id', column)
+                ],
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            links.delete()
+            model.objects.filter(id__in=list(kept)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_name_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
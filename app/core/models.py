@@ -18,16 +18,23 @@ def recipe_image_filepath(instance, filename):
 
 class UserManager(BaseUserManager):
 
-    def create_user(self, email, password=None, **extra_fields):
+    def create_user(self, email, password=None, password_hash=None,
+                    **extra_fields):
         """
         Creates a new user model.
+
+        `password_hash` is an already hashed password, e.g. one hashed
+        off the request thread, used instead of hashing `password`.
         """
         if not email:
             # Raises error if email is None
             raise ValueError('Please enter an email address')
 
         user = self.model(email=self.normalize_email(email), **extra_fields)
-        user.set_password(password)
+        if password_hash is not None:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save(using=self._db)
 
         return user
@@ -65,8 +72,20 @@ class Tag(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Covered by the unique (user, name) constraint below.
+        db_index=False,
     )
 
+    class Meta:
+        constraints = [
+            # Lets concurrent get-or-create by name insert ON CONFLICT. Its
+            # index also serves the per-user list ordered by name.
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='core_tag_user_name_uniq',
+            ),
+        ]
+
     def __str__(self):
         """
         Provides a readable string representation of Tag object.
@@ -81,9 +100,21 @@ class Ingredient(models.Model):
     name = models.CharField(max_length=150)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # Covered by the unique (user, name) constraint below.
+        db_index=False,
     )
 
+    class Meta:
+        constraints = [
+            # Lets concurrent get-or-create by name insert ON CONFLICT. Its
+            # index also serves the per-user list ordered by name.
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='core_ingredient_user_name_uniq',
+            ),
+        ]
+
     def __str__(self):
         """
         Provides a readable string representation of Ingredient object.
@@ -97,19 +128,90 @@ class Recipe(models.Model):
     """
     title = models.CharField(max_length=150)
     image = models.ImageField(null=True, upload_to=recipe_image_filepath)
+    # Resized copies of image, variant name to storage name.
+    image_variants = models.JSONField(default=dict, blank=True)
     prep_time_mins = models.IntegerField()
     cook_time_mins = models.IntegerField()
     price = models.DecimalField(max_digits=6, decimal_places=2)
     url = models.CharField(max_length=255, blank=True)
     ingredients = models.ManyToManyField('Ingredient')
     tags = models.ManyToManyField('Tag')
+    # Title, tag and ingredient names, kept current for full-text search.
+    search_document = models.TextField(blank=True, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # Covered by the (user, id) index below.
+        db_index=False,
     )
 
+    class Meta:
+        indexes = [
+            # Serves the per-user list ordered newest first.
+            models.Index(
+                fields=['user', '-id'],
+                name='core_recipe_user_id_idx',
+            ),
+        ]
+
     def __str__(self):
         """
         Provides a readable string representation of Recipe object.
         """
         return self.title
+
+
+class ImageJob(models.Model):
+    """
+    Queued generation of resized variants for a recipe image.
+    """
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    recipe = models.ForeignKey('Recipe', on_delete=models.CASCADE)
+    # Image the job was queued for, a newer upload supersedes the job.
+    image = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'id'],
+                name='core_imagejob_status_idx',
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Provides a readable string representation of ImageJob object.
+        """
+        return f'{self.image} ({self.status})'
+
+
+class StoredFile(models.Model):
+    """
+    Number of references to a file in content-addressed media storage.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.IntegerField(default=0)
+
+    def __str__(self):
+        """
+        Provides a readable string representation of StoredFile object.
+        """
+        return f'{self.name} ({self.refcount})'
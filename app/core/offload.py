@@ -0,0 +1,67 @@
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the thread pool running offloaded views, creating it on first
+    use.
+
+    Each thread keeps its own database connection, so the pool size also
+    bounds the connections offloaded views hold.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ASYNC_VIEW_THREADS', 8),
+                thread_name_prefix='view',
+            )
+
+        return _executor
+
+
+def run_view(view, request, *args, **kwargs):
+    """
+    Runs a sync view in the current thread and returns its rendered
+    response.
+    """
+    # What request_started and request_finished do for the handler's
+    # own thread: drop connections past CONN_MAX_AGE or left broken.
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            # Rendered here rather than back in the handler's thread.
+            response = response.render()
+    finally:
+        close_old_connections()
+
+    return response
+
+
+def offload(view):
+    """
+    Returns an async view running a sync view in a thread pool.
+
+    Under ASGI Django runs every sync view in one shared thread, so slow
+    database reads queue behind each other. The returned view instead
+    awaits the sync view in a pool of ASYNC_VIEW_THREADS threads, and
+    the event loop keeps serving other requests meanwhile.
+    """
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await sync_to_async(
+            run_view,
+            thread_sensitive=False,
+            executor=get_executor(),
+        )(view, request, *args, **kwargs)
+
+    return async_view
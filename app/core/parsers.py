@@ -0,0 +1,30 @@
+import codecs
+from io import BytesIO
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from .renderers import orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON parser decoding with orjson when it is installed.
+
+    Bodies orjson rejects are parsed again by the stdlib parser, which
+    accepts the same documents apart from integers beyond 64 bits and
+    reports errors as before. Other charsets than UTF-8 use it directly.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the incoming bytestream as JSON.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import invalidate_token
+from .models import Recipe
+from .storage import add_references, remove_references, recipe_file_names
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """
+    Stops accepting a deleted token.
+    """
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, created, **kwargs):
+    """
+    Drops cached tokens of a changed user, e.g. after deactivation.
+    """
+    if created:
+        return
+    for key in Token.objects.filter(user=instance).values_list(
+            'key', flat=True):
+        invalidate_token(key)
+
+
+@receiver(post_init, sender=Recipe)
+def recipe_loaded(sender, instance, **kwargs):
+    """
+    Remembers the files a recipe refers to, to count changes on save.
+    """
+    instance._stored_files = recipe_file_names(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    """
+    Updates reference counts of files added to or dropped from a recipe.
+    """
+    names = recipe_file_names(instance)
+    add_references(names - instance._stored_files)
+    remove_references(instance._stored_files - names)
+    instance._stored_files = names
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    """
+    Releases the files of a deleted recipe.
+    """
+    remove_references(instance._stored_files)
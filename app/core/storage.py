@@ -0,0 +1,131 @@
+import hashlib
+import os
+import uuid
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+
+
+def hash_file(content):
+    """
+    Returns the SHA-256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by the SHA-256 of their content.
+
+    The requested file name only contributes its directory and extension,
+    so saving bytes that are already stored writes nothing and returns the
+    existing name. Files are shared between references and only removed by
+    the gc_media command once no reference is left.
+    """
+
+    def save(self, name, content, max_length=None):
+        """
+        Stores content under its hash, skipping the write for duplicates.
+        """
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = getattr(content, 'content_hash', None) or hash_file(content)
+        directory, filename = os.path.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        name = os.path.join(directory, digest[:2], f'{digest}{ext}')
+        if self.exists(name):
+            # Refresh the modification time so a concurrent gc_media run
+            # treats the file as recently written.
+            try:
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                # Collected meanwhile, write it again.
+                pass
+
+        return super().save(name, content, max_length)
+
+    def delete_unless_modified(self, name, cutoff):
+        """
+        Deletes a file unless it was modified after the cutoff timestamp.
+
+        The file is renamed aside before its modification time is read. A
+        save of the same content either refreshed that time beforehand,
+        and the file is put back, or finds no file and writes a new one.
+        Returns whether the file is gone.
+        """
+        path = self.path(name)
+        aside = f'{path}.{uuid.uuid4().hex}.deleting'
+        try:
+            os.rename(path, aside)
+        except FileNotFoundError:
+            return True
+        if os.stat(aside).st_mtime < cutoff:
+            os.remove(aside)
+            return True
+
+        try:
+            # Fails if a save wrote the file again meanwhile, which holds
+            # the same bytes.
+            os.link(aside, path)
+        except FileExistsError:
+            pass
+        os.remove(aside)
+
+        return False
+
+
+def add_references(names):
+    """
+    Counts one more reference to each stored file name.
+    """
+    from .models import StoredFile
+    names = [name for name in names if name]
+    if not names:
+        return
+    StoredFile.objects.bulk_create(
+        [StoredFile(name=name) for name in names],
+        ignore_conflicts=True,
+    )
+    StoredFile.objects.filter(name__in=names).update(
+        refcount=F('refcount') + 1,
+    )
+
+
+def remove_references(names):
+    """
+    Counts one reference less to each stored file name.
+    """
+    from .models import StoredFile
+    names = [name for name in names if name]
+    if not names:
+        return
+    StoredFile.objects.filter(name__in=names).update(
+        refcount=F('refcount') - 1,
+    )
+
+
+def recipe_file_names(recipe):
+    """
+    Returns the stored file names a recipe refers to.
+
+    Fields deferred on the instance are left out, so they are never
+    loaded just to be counted.
+    """
+    names = set()
+    loaded = recipe.__dict__
+    image = loaded.get('image')
+    if image:
+        names.add(getattr(image, 'name', image))
+    names.update((loaded.get('image_variants') or {}).values())
+    names.discard('')
+    names.discard(None)
+
+    return names
@@ -0,0 +1,169 @@
+from unittest.mock import patch
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core import authentication
+from core.authentication import TokenCache, get_local_cache
+from core.tests.test_models import dummy_user
+
+PROFILE_URL = reverse('user:profile')
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+    },
+}
+
+
+class TokenCacheTests(TestCase):
+
+    def test_evicts_least_recently_used(self):
+        """
+        Test the cache never holds more than maxsize entries.
+        """
+        cache = TokenCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    @patch('core.authentication.time.monotonic')
+    def test_entries_expire(self, monotonic):
+        """
+        Test entries are dropped once their TTL has passed.
+        """
+        monotonic.return_value = 100
+        cache = TokenCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+
+        monotonic.return_value = 159
+        self.assertEqual(cache.get('a'), 1)
+        monotonic.return_value = 160
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """
+    Test authenticating with cached tokens.
+    """
+
+    def setUp(self):
+        get_local_cache().clear()
+        self.user = dummy_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_cached_token_skips_database(self):
+        """
+        Test a repeated request authenticates without queries.
+
+        The profile view itself reads the user once per request.
+        """
+        with self.assertNumQueries(2):
+            res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_invalid_token(self):
+        """
+        Test an unknown token is rejected.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token notatoken')
+        res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_rejected(self):
+        """
+        Test deleting a token invalidates the cached entry.
+        """
+        self.client.get(PROFILE_URL)
+        self.token.delete()
+
+        res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """
+        Test deactivating a user invalidates the cached entry.
+        """
+        self.client.get(PROFILE_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_is_visible(self):
+        """
+        Test changes to the user are not hidden by the cache.
+        """
+        self.client.get(PROFILE_URL)
+        self.client.patch(PROFILE_URL, {'name': 'Arya Stark'})
+
+        res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.data['name'], 'Arya Stark')
+
+    def test_write_does_not_restore_stale_user(self):
+        """
+        Test a write with a cached token sees changes made elsewhere.
+        """
+        self.client.get(PROFILE_URL)
+        # An update without signals stands in for another process.
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False, password='changed')
+
+        res = self.client.patch(PROFILE_URL, {'name': 'Arya Stark'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.password, 'changed')
+
+    def test_profile_update_saves_submitted_fields(self):
+        """
+        Test a profile update leaves fields it did not submit alone.
+        """
+        with patch.object(get_user_model(), 'save') as save:
+            res = self.client.patch(PROFILE_URL, {'name': 'Arya Stark'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        save.assert_called_once_with(update_fields=['name'])
+
+    @override_settings(
+        CACHES=SHARED_CACHES,
+        TOKEN_CACHE={'SHARED_ALIAS': 'tokens'},
+    )
+    def test_shared_tier(self):
+        """
+        Test tokens cached by another process are used and invalidated.
+        """
+        self.client.get(PROFILE_URL)
+        key = authentication.shared_key(self.token.key)
+        self.assertEqual(caches['tokens'].get(key), (self.user.pk, True))
+
+        # Simulate a fresh process with an empty local tier.
+        get_local_cache().clear()
+        with self.assertNumQueries(1):
+            res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.token.delete()
+        self.assertIsNone(caches['tokens'].get(key))
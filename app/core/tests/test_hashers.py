@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core.hashers import PBKDF2PasswordHasher
+
+TOKEN_URL = reverse('user:token')
+
+
+def iterations(encoded):
+    """
+    Returns the PBKDF2 iterations of an encoded password.
+    """
+    return identify_hasher(encoded).decode(encoded)['iterations']
+
+
+class PasswordHasherTests(TestCase):
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_iterations_from_settings(self):
+        """
+        Test new hashes use the configured work factor.
+        """
+        encoded = make_password('password12345')
+
+        self.assertIsInstance(identify_hasher(encoded), PBKDF2PasswordHasher)
+        self.assertEqual(iterations(encoded), 1000)
+
+    def test_other_iterations_verify_and_upgrade(self):
+        """
+        Test a hash with another count is accepted and then rewritten.
+        """
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            user = get_user_model().objects.create_user(
+                'test@blainesmith.me',
+                'password12345',
+            )
+
+        with self.settings(PASSWORD_HASH_ITERATIONS=1200):
+            res = APIClient().post(TOKEN_URL, {
+                'email': 'test@blainesmith.me',
+                'password': 'password12345',
+            })
+
+        self.assertIn('token', res.data)
+        user.refresh_from_db()
+        self.assertEqual(iterations(user.password), 1200)
+        self.assertTrue(user.check_password('password12345'))
+
+
+class TokenLoginTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345',
+        )
+        self.payload = {
+            'email': 'test@blainesmith.me',
+            'password': 'password12345',
+        }
+
+    def test_token_issued_once(self):
+        """
+        Test the first login creates the token and later ones reuse it.
+        """
+        first = APIClient().post(TOKEN_URL, self.payload)
+        second = APIClient().post(TOKEN_URL, self.payload)
+
+        token = Token.objects.get(user=self.user)
+        self.assertEqual(first.data['token'], token.key)
+        self.assertEqual(second.data['token'], token.key)
+
+    def test_login_single_query(self):
+        """
+        Test the user and an existing token are read in one query.
+        """
+        token = Token.objects.create(user=self.user)
+
+        with self.assertNumQueries(1):
+            res = APIClient().post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.data['token'], token.key)
+
+    def test_inactive_user_refused(self):
+        """
+        Test inactive users cannot log in.
+        """
+        self.user.is_active = False
+        self.user.save()
+
+        res = APIClient().post(TOKEN_URL, self.payload)
+
+        self.assertNotIn('token', res.data)
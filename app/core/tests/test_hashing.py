@@ -0,0 +1,131 @@
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+from core import hashing
+from core.checks import check_hash_stats_cache
+from core.hashing import HashPool, PoolSaturated, hash_pool_stats
+
+# Like memcached or redis, a file based cache is shared between processes.
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'stats': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='hash-stats-'),
+    },
+}
+
+
+@override_settings(PASSWORD_HASH_STATS_ALIAS='default')
+class HashPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_process_pool(self):
+        """
+        Test passwords are hashed and checked in worker processes.
+        """
+        pool = HashPool(workers=1, kind='process')
+        try:
+            encoded = await pool.make_password('password12345')
+            valid, upgraded = await pool.check_password(
+                'password12345', encoded)
+        finally:
+            pool.shutdown()
+
+        self.assertTrue(check_password('password12345', encoded))
+        self.assertTrue(valid)
+        self.assertIsNone(upgraded)
+        self.assertEqual(pool.pending, 0)
+
+    async def test_upgraded_hash(self):
+        """
+        Test a hash made with other settings comes back upgraded.
+        """
+        pool = HashPool(workers=1, kind='thread')
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            encoded = await pool.make_password('password12345')
+        with self.settings(PASSWORD_HASH_ITERATIONS=1100):
+            valid, upgraded = await pool.check_password(
+                'password12345', encoded)
+            wrong = await pool.check_password('incorrect', encoded)
+
+        self.assertTrue(valid)
+        self.assertIn('$1100$', upgraded)
+        self.assertEqual(wrong, (False, None))
+
+    async def test_saturated(self):
+        """
+        Test jobs beyond the workers and queue are refused and counted.
+        """
+        pool = HashPool(workers=1, queue_size=1, kind='thread')
+        pool.pending = 2
+
+        with self.assertRaises(PoolSaturated):
+            await pool.make_password('password12345')
+
+        self.assertEqual(pool.pending, 2)
+        self.assertEqual(hash_pool_stats()['rejected'], 1)
+
+    async def test_wait_recorded(self):
+        """
+        Test each job's wait for a worker is counted in a bucket.
+        """
+        pool = HashPool(workers=1, kind='thread')
+
+        await pool.make_password('password12345')
+        await pool.make_password('password12345')
+
+        stats = hash_pool_stats()
+        self.assertEqual(stats['jobs'], 2)
+        self.assertEqual(
+            sum(value for name, value in stats.items()
+                if name.startswith('wait_') and name != 'wait_ms'),
+            2,
+        )
+
+    @override_settings(
+        CACHES=SHARED_CACHES,
+        PASSWORD_HASH_STATS_ALIAS='stats',
+    )
+    def test_stats_command(self):
+        """
+        Test the command shows and resets counters of other processes.
+        """
+        caches['stats'].set('auth:hashpool:jobs', 4)
+        caches['stats'].set('auth:hashpool:wait_ms', 10)
+        out = StringIO()
+
+        # A separate cache instance stands in for the command's process.
+        other = caches.create_connection('stats')
+        with patch.object(hashing, 'get_stats_cache', return_value=other):
+            call_command('hash_pool_stats', '--reset', stdout=out)
+
+        self.assertIn('jobs=4 rejected=0 mean_wait=2.5ms', out.getvalue())
+        self.assertEqual(hash_pool_stats()['jobs'], 0)
+
+    def test_stats_command_requires_shared_cache(self):
+        """
+        Test counters in a per-process cache are not reported.
+        """
+        with self.assertRaises(CommandError):
+            call_command('hash_pool_stats', stdout=StringIO())
+        self.assertEqual(
+            [w.id for w in check_hash_stats_cache(None)], ['core.W001'])
+
+    @override_settings(PASSWORD_HASH_STATS_ALIAS=None)
+    async def test_no_stats_without_alias(self):
+        """
+        Test no counters are kept unless an alias is configured.
+        """
+        await HashPool(workers=1, kind='thread').make_password('password1')
+
+        self.assertEqual(cache.get('auth:hashpool:jobs'), None)
+        self.assertEqual(check_hash_stats_cache(None), [])
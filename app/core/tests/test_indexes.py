@@ -0,0 +1,75 @@
+from django.db import connection
+from django.test import TestCase
+from core.models import Tag, Ingredient, Recipe
+from core.tests.test_models import dummy_user
+
+
+class IndexUsageTests(TestCase):
+    """
+    Test the hot API queries are planned against the composite indexes.
+    """
+
+    def setUp(self):
+        self.user = dummy_user()
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan sequentially, so stop
+            # the planner from preferring that over the indexes.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        """
+        Asserts EXPLAIN for the queryset mentions the index.
+        """
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def unique_index(self, model_name):
+        """
+        Returns the name of the index behind a (user, name) constraint.
+
+        SQLite names the indexes of table constraints itself.
+        """
+        if connection.vendor == 'sqlite':
+            return f'sqlite_autoindex_core_{model_name}_1'
+
+        return f'core_{model_name}_user_name_uniq'
+
+    def test_tag_list_uses_index(self):
+        """
+        Test the per-user tag list uses the (user, name) index.
+        """
+        queryset = Tag.objects.filter(user=self.user).order_by('-name', '-id')
+        self.assertUsesIndex(queryset, self.unique_index('tag'))
+
+    def test_ingredient_list_uses_index(self):
+        """
+        Test the per-user ingredient list uses the (user, name) index.
+        """
+        queryset = Ingredient.objects.filter(
+            user=self.user).order_by('-name', '-id')
+        self.assertUsesIndex(queryset, self.unique_index('ingredient'))
+
+    def test_recipe_list_uses_index(self):
+        """
+        Test the per-user recipe list uses the (user, -id) index.
+        """
+        queryset = Recipe.objects.filter(user=self.user).order_by('-id')
+        self.assertUsesIndex(queryset, 'core_recipe_user_id_idx')
+
+    def test_recipes_by_tag_uses_index(self):
+        """
+        Test looking up recipes by tag uses the through table index.
+        """
+        queryset = Recipe.tags.through.objects.filter(
+            tag_id__in=[1, 2]).values('recipe_id')
+        self.assertUsesIndex(queryset, 'core_recipe_tags_tag_recipe_idx')
+
+    def test_recipes_by_ingredient_uses_index(self):
+        """
+        Test looking up recipes by ingredient uses the through table index.
+        """
+        queryset = Recipe.ingredients.through.objects.filter(
+            ingredient_id__in=[1, 2]).values('recipe_id')
+        self.assertUsesIndex(queryset, 'core_recipe_ingr_ingr_recipe_idx')
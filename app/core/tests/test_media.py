@@ -0,0 +1,153 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+
+DATA = bytes(range(256)) * 64
+
+
+def media_url(name):
+    """
+    Media file URL.
+    """
+    return f'/media/{name}'
+
+
+class MediaServingTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.name = default_storage.save(
+            'uploads/recipe/image.jpg', ContentFile(DATA))
+        self.path = default_storage.path(self.name)
+
+    def test_serves_file_with_cache_headers(self):
+        """
+        Test content-addressed files are served as immutable.
+        """
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b''.join(res.streaming_content), DATA)
+        self.assertEqual(res['Content-Type'], 'image/jpeg')
+        self.assertEqual(res['Content-Length'], str(len(DATA)))
+        self.assertEqual(res['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', res['Cache-Control'])
+        digest = hashlib.sha256(DATA).hexdigest()
+        self.assertEqual(res['ETag'], f'"{digest}"')
+
+    def test_other_files_are_revalidated(self):
+        """
+        Test files not named by hash get a bounded cache lifetime.
+        """
+        with open(os.path.join(os.path.dirname(self.path), 'x.jpg'),
+                  'wb') as file:
+            file.write(b'plain')
+        name = os.path.join(os.path.dirname(self.name), 'x.jpg')
+
+        with self.settings(MEDIA_MAX_AGE=60):
+            res = self.client.get(media_url(name))
+        self.assertEqual(res['Cache-Control'], 'public, max-age=60')
+        self.assertNotIn('immutable', res['Cache-Control'])
+
+    def test_conditional_requests(self):
+        """
+        Test matching ETag or date validators are answered with 304.
+        """
+        etag = self.client.get(media_url(self.name))['ETag']
+
+        res = self.client.get(media_url(self.name), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res['ETag'], etag)
+
+        res = self.client.get(
+            media_url(self.name),
+            HTTP_IF_MODIFIED_SINCE=http_date(os.path.getmtime(self.path)),
+        )
+        self.assertEqual(res.status_code, 304)
+
+    def test_range_requests(self):
+        """
+        Test single byte ranges are served as partial content.
+        """
+        res = self.client.get(media_url(self.name), HTTP_RANGE='bytes=10-19')
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b''.join(res.streaming_content), DATA[10:20])
+        self.assertEqual(res['Content-Range'], f'bytes 10-19/{len(DATA)}')
+        self.assertEqual(res['Content-Length'], '10')
+
+        res = self.client.get(media_url(self.name), HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(res.streaming_content), DATA[-5:])
+
+        res = self.client.get(
+            media_url(self.name),
+            HTTP_RANGE=f'bytes={len(DATA)}-',
+        )
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res['Content-Range'], f'bytes */{len(DATA)}')
+
+    def test_stale_if_range_sends_whole_file(self):
+        """
+        Test a range for another version of the file is ignored.
+        """
+        res = self.client.get(
+            media_url(self.name),
+            HTTP_RANGE='bytes=0-9',
+            HTTP_IF_RANGE='"outdated"',
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b''.join(res.streaming_content), DATA)
+
+    def test_missing_and_hidden_files(self):
+        """
+        Test unknown, partial upload and out of root paths are not served.
+        """
+        part = os.path.join(os.path.dirname(self.path), '.upload.part')
+        open(part, 'wb').close()
+
+        for name in ('uploads/recipe/missing.jpg', 'uploads/recipe',
+                     'uploads/recipe/.upload.part', '../etc/passwd'):
+            res = self.client.get(media_url(name))
+            self.assertEqual(res.status_code, 404)
+
+    def test_rejects_unsafe_methods(self):
+        """
+        Test only GET and HEAD are allowed.
+        """
+        res = self.client.post(media_url(self.name))
+
+        self.assertEqual(res.status_code, 405)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_accel_redirect(self):
+        """
+        Test nginx mode hands the file to an internal location.
+        """
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b'')
+        self.assertEqual(
+            res['X-Accel-Redirect'],
+            f'/protected-media/{self.name}',
+        )
+        self.assertIn('immutable', res['Cache-Control'])
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_sendfile(self):
+        """
+        Test sendfile mode passes the file path to the web server.
+        """
+        res = self.client.get(media_url(self.name))
+
+        self.assertEqual(res['X-Sendfile'], self.path)
+        self.assertEqual(res.content, b'')
@@ -0,0 +1,130 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from core import renderers
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+PAYLOAD = ReturnList([
+    ReturnDict({
+        'id': 1,
+        'title': 'Crème brûlée \u2028\u2029',
+        'price': Decimal('7.50'),
+        'tags': [1, 2],
+        'thumbnail': None,
+        'ratio': 0.1,
+        'created': datetime.datetime(
+            2021, 8, 1, 12, 30, 5, 123456, tzinfo=timezone.utc),
+        'local': datetime.datetime(2021, 8, 1, 12, 30),
+        'day': datetime.date(2021, 8, 1),
+        'time': datetime.time(9, 15),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Name'),
+        1: 'integer key',
+    }, serializer=None),
+], serializer=None)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_matches_stdlib_renderer(self):
+        """
+        Test the output is byte for byte the one of JSONRenderer.
+        """
+        with patch.object(renderers, 'JSONRenderer') as stdlib:
+            ret = FastJSONRenderer().render(PAYLOAD)
+        stdlib.assert_not_called()
+        self.assertEqual(ret, JSONRenderer().render(PAYLOAD))
+        self.assertEqual(
+            FastJSONRenderer().render({'price': Decimal('1.10')}),
+            JSONRenderer().render({'price': Decimal('1.10')}),
+        )
+
+    def test_large_integers(self):
+        """
+        Test integers orjson cannot encode are rendered by the stdlib.
+        """
+        data = {'big': 2 ** 70}
+
+        self.assertEqual(
+            FastJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+    def test_empty_data(self):
+        """
+        Test None renders an empty body.
+        """
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_indent_uses_stdlib(self):
+        """
+        Test indented output is still available.
+        """
+        data = {'title': 'Soup'}
+        with patch.object(renderers.orjson, 'dumps') as dumps:
+            ret = FastJSONRenderer().render(
+                data, 'application/json; indent=2')
+        dumps.assert_not_called()
+        self.assertEqual(ret, b'{\n  "title": "Soup"\n}')
+
+    def test_without_orjson(self):
+        """
+        Test the renderer falls back to the stdlib without orjson.
+        """
+        with patch.object(renderers, 'orjson', None):
+            ret = FastJSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(ret, JSONRenderer().render(PAYLOAD))
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def parse(self, body, parser=None):
+        """
+        Parses a JSON body.
+        """
+        parser = parser or FastJSONParser()
+
+        return parser.parse(BytesIO(body), 'application/json', {})
+
+    def test_matches_stdlib_parser(self):
+        """
+        Test documents are parsed like by JSONParser.
+        """
+        body = JSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(self.parse(body), self.parse(body, JSONParser()))
+
+    def test_invalid_json(self):
+        """
+        Test invalid bodies raise the stdlib parse error.
+        """
+        for body in (b'{"title": ', b'[NaN]'):
+            with self.assertRaises(ParseError) as fast:
+                self.parse(body)
+            with self.assertRaises(ParseError) as stdlib:
+                self.parse(body, JSONParser())
+            self.assertEqual(str(fast.exception), str(stdlib.exception))
+
+    def test_other_charset(self):
+        """
+        Test bodies in other encodings are decoded with their charset.
+        """
+        parser = FastJSONParser()
+        data = parser.parse(
+            BytesIO('{"title": "Crème"}'.encode('latin-1')),
+            'application/json',
+            {'encoding': 'latin-1'},
+        )
+
+        self.assertEqual(data, {'title': 'Crème'})
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase
+from core.models import Recipe, StoredFile
+from core.management.commands import gc_media
+from core.storage import ContentAddressedStorage
+from core.tests.test_models import dummy_user
+
+
+def sample_recipe(user, **params):
+    """
+    Create sample recipe.
+    """
+    defaults = {
+        'title': 'Tacos',
+        'prep_time_mins': 10,
+        'cook_time_mins': 10,
+        'price': 6.00,
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def refcount(name):
+    """
+    Returns the reference count of a stored file.
+    """
+    return StoredFile.objects.get(name=name).refcount
+
+
+def collect(**options):
+    """
+    Runs gc_media and returns its output.
+    """
+    out = StringIO()
+    call_command('gc_media', stdout=out, **options)
+
+    return out.getvalue()
+
+
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.storage = ContentAddressedStorage()
+        self.user = dummy_user()
+
+    def test_names_files_by_hash(self):
+        """
+        Test the file name is the content hash with the original extension.
+        """
+        data = b'recipe image'
+        name = self.storage.save('uploads/recipe/a.JPG', ContentFile(data))
+
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(
+            name,
+            f'uploads/recipe/{digest[:2]}/{digest}.jpg',
+        )
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), data)
+
+    def test_duplicate_writes_nothing(self):
+        """
+        Test saving stored content returns the existing name untouched.
+        """
+        first = self.storage.save('uploads/recipe/a.jpg', ContentFile(b'x'))
+        path = self.storage.path(first)
+        os.utime(path, (0, 0))
+
+        second = self.storage.save('uploads/recipe/b.jpg', ContentFile(b'x'))
+        self.assertEqual(first, second)
+        self.assertEqual(
+            os.listdir(os.path.dirname(path)),
+            [os.path.basename(path)],
+        )
+        self.assertGreater(os.path.getmtime(path), 0)
+
+    def test_recipes_share_counted_file(self):
+        """
+        Test identical images are stored once and counted per recipe.
+        """
+        first = sample_recipe(self.user)
+        second = sample_recipe(self.user)
+        first.image.save('one.jpg', ContentFile(b'same'))
+        second.image.save('two.jpg', ContentFile(b'same'))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(refcount(first.image.name), 2)
+
+        second.delete()
+        self.assertEqual(refcount(first.image.name), 1)
+
+    def test_variants_are_counted(self):
+        """
+        Test variant files gain and lose references with the recipe.
+        """
+        recipe = sample_recipe(self.user)
+        variant = default_storage.save(
+            'uploads/recipe/variants/v.webp', ContentFile(b'variant'))
+        recipe.image_variants = {'thumb_webp': variant}
+        recipe.save()
+        self.assertEqual(refcount(variant), 1)
+
+        recipe = Recipe.objects.get(pk=recipe.pk)
+        recipe.image_variants = {}
+        recipe.save()
+        self.assertEqual(refcount(variant), 0)
+
+    def test_gc_deletes_released_files(self):
+        """
+        Test files of a re-imaged recipe are collected, shared ones kept.
+        """
+        recipe = sample_recipe(self.user)
+        other = sample_recipe(self.user)
+        recipe.image.save('old.jpg', ContentFile(b'old'))
+        other.image.save('shared.jpg', ContentFile(b'shared'))
+        old = recipe.image.name
+        recipe.image.save('new.jpg', ContentFile(b'shared'))
+        self.assertEqual(refcount(old), 0)
+
+        out = collect(grace=-1)
+        self.assertIn('Deleted 1 files', out)
+        self.assertFalse(default_storage.exists(old))
+        self.assertFalse(StoredFile.objects.filter(name=old).exists())
+        self.assertTrue(default_storage.exists(recipe.image.name))
+        self.assertEqual(refcount(recipe.image.name), 2)
+
+    def test_gc_sweeps_uncounted_files(self):
+        """
+        Test files without references are swept after the grace period.
+        """
+        orphan = default_storage.save(
+            'uploads/recipe/orphan.jpg', ContentFile(b'orphan'))
+        os.utime(default_storage.path(orphan), (0, 0))
+        fresh = default_storage.save(
+            'uploads/recipe/fresh.jpg', ContentFile(b'fresh'))
+
+        collect()
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(fresh))
+
+    def test_gc_keeps_file_saved_again_during_run(self):
+        """
+        Test a released file saved again after the scan is not deleted.
+        """
+        recipe = sample_recipe(self.user)
+        recipe.image.save('old.jpg', ContentFile(b'old'))
+        old = recipe.image.name
+        recipe.image.save('new.jpg', ContentFile(b'new'))
+        os.utime(default_storage.path(old), (0, 0))
+
+        # The scan saw an expired file, then an upload saved it again.
+        def save_again(name):
+            default_storage.save('uploads/recipe/a.jpg', ContentFile(b'old'))
+            return True
+
+        with patch.object(
+                gc_media.Command, 'is_expired', side_effect=save_again):
+            out = collect()
+
+        self.assertIn('Deleted 0 files', out)
+        self.assertTrue(default_storage.exists(old))
+        self.assertTrue(StoredFile.objects.filter(name=old).exists())
+
+    def test_delete_unless_modified(self):
+        """
+        Test only files untouched since the cutoff are deleted.
+        """
+        stale = default_storage.save(
+            'uploads/recipe/stale.jpg', ContentFile(b'stale'))
+        fresh = default_storage.save(
+            'uploads/recipe/fresh.jpg', ContentFile(b'fresh'))
+        os.utime(default_storage.path(stale), (0, 0))
+        cutoff = os.stat(default_storage.path(fresh)).st_mtime
+
+        self.assertTrue(default_storage.delete_unless_modified(stale, cutoff))
+        self.assertFalse(default_storage.delete_unless_modified(fresh, cutoff))
+        self.assertFalse(default_storage.exists(stale))
+        self.assertTrue(default_storage.exists(fresh))
+        self.assertEqual(
+            os.listdir(os.path.dirname(default_storage.path(fresh))),
+            [os.path.basename(fresh)],
+        )
+
+    def test_gc_dry_run(self):
+        """
+        Test a dry run lists files without deleting them.
+        """
+        orphan = default_storage.save(
+            'uploads/recipe/orphan.jpg', ContentFile(b'dry'))
+
+        out = collect(grace=-1, dry_run=True)
+        self.assertIn(orphan, out)
+        self.assertIn('Would delete 1 files', out)
+        self.assertTrue(default_storage.exists(orphan))
@@ -0,0 +1,179 @@
+import mimetypes
+import os
+import re
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Names written by the content-addressed storage, a SHA-256 and extension.
+CONTENT_ADDRESSED = re.compile(r'^[0-9a-f]{64}\.\w+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Cache lifetime of content-addressed files, which never change.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Returns the (start, end) byte offsets of a single-range header.
+
+    Returns None when the header should be ignored and the whole file
+    sent, and raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None:
+        # Multiple or unknown ranges, the full response is always valid.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError('Range not satisfiable')
+
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    """
+    Returns whether a range request still applies to the current file.
+    """
+    validator = request.META.get('HTTP_IF_RANGE')
+    if validator is None:
+        return True
+    if validator.startswith(('"', 'W/')):
+        return validator == etag
+
+    return parse_http_date_safe(validator) == int(mtime)
+
+
+def iter_range(path, start, length):
+    """
+    Yields length bytes of a file from start, in blocks.
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def sendfile_response(name, path):
+    """
+    Returns an empty response telling the web server to send the file.
+    """
+    response = HttpResponse()
+    mode = getattr(settings, 'MEDIA_SENDFILE', None)
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix + name
+    else:
+        response['X-Sendfile'] = path
+    # The web server fills in the type and length of the file.
+    del response['Content-Type']
+
+    return response
+
+
+def file_response(request, full_path, stat, etag):
+    """
+    Returns the whole file, or the requested byte range of it.
+    """
+    content_type = mimetypes.guess_type(full_path)[0]
+    content_type = content_type or 'application/octet-stream'
+    size = stat.st_size
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and if_range_matches(
+            request, etag, stat.st_mtime):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+        else:
+            response = FileResponse(
+                open(full_path, 'rb'),
+                content_type=content_type,
+            )
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type, status=206)
+        else:
+            response = StreamingHttpResponse(
+                iter_range(full_path, start, length),
+                content_type=content_type,
+                status=206,
+            )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serves a file from MEDIA_ROOT with caching and byte range support.
+
+    Responses carry an ETag and Last-Modified, so revalidation is answered
+    with 304. Content-addressed files are marked immutable. With the
+    MEDIA_SENDFILE setting the web server sends the bytes instead.
+    """
+    name = os.path.basename(path)
+    if not name or name.startswith('.'):
+        raise Http404('File not found')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('File not found')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    if CONTENT_ADDRESSED.match(name):
+        etag = f'"{name.split(".")[0]}"'
+        cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        max_age = getattr(settings, 'MEDIA_MAX_AGE', 3600)
+        cache_control = f'public, max-age={max_age}'
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(stat.st_mtime),
+    )
+    if response is None:
+        if getattr(settings, 'MEDIA_SENDFILE', None):
+            response = sendfile_response(path, full_path)
+        else:
+            response = file_response(request, full_path, stat, etag)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+
+    return response
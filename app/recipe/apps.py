@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class RecipeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipe'
+
+    def ready(self):
+        """
+        Connects the cache invalidation signal handlers and registers the
+        system checks.
+        """
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,99 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models.functions import Upper
+from .cache import get_cache, get_user_version, is_process_local
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+class PrefixIndex:
+    """
+    Names of one user's tags or ingredients, sorted for prefix lookups.
+    """
+
+    def __init__(self, rows):
+        entries = sorted((name.upper(), pk, name) for pk, name in rows)
+        self.keys = [key for key, _, _ in entries]
+        self.rows = [(pk, name) for _, pk, name in entries]
+
+    def search(self, prefix, limit):
+        """
+        Returns up to limit (id, name) rows whose name starts with prefix.
+        """
+        prefix = prefix.upper()
+        start = bisect_left(self.keys, prefix)
+        matches = []
+        for key, row in zip(self.keys[start:start + limit],
+                            self.rows[start:start + limit]):
+            if not key.startswith(prefix):
+                break
+            matches.append(row)
+
+        return matches
+
+
+def get_prefix_index(model, user_id):
+    """
+    Returns the in-memory prefix index of a user's names, or None.
+
+    Indexes are built from one query and reused until the user's recipe
+    data version changes. Users with more names than the configured
+    maximum, or a cache size of zero, are served from the database. So is
+    everyone when RECIPE_CACHE_ALIAS is per-process, as other workers
+    would not see the version change and keep stale indexes.
+    """
+    max_users = getattr(settings, 'RECIPE_AUTOCOMPLETE_CACHE_USERS', 256)
+    if not max_users or is_process_local(get_cache()):
+        return None
+    key = (model._meta.label, user_id)
+    # Read the version first, a write racing the build then only leaves
+    # an index for a version that is already outdated.
+    version = get_user_version(user_id)
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is not None and entry[0] == version:
+            _indexes.move_to_end(key)
+            return entry[1]
+
+    max_names = getattr(settings, 'RECIPE_AUTOCOMPLETE_CACHE_MAX_NAMES', 5000)
+    rows = list(
+        model.objects.filter(user_id=user_id).values_list(
+            'id', 'name')[:max_names + 1]
+    )
+    index = PrefixIndex(rows) if len(rows) <= max_names else None
+    with _indexes_lock:
+        _indexes[key] = (version, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > max_users:
+            _indexes.popitem(last=False)
+
+    return index
+
+
+def clear_prefix_indexes():
+    """
+    Drops every in-memory prefix index.
+    """
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def autocomplete(model, user_id, prefix, limit):
+    """
+    Returns a user's (id, name) rows whose name starts with prefix.
+
+    Matching ignores case and rows are ordered by name, then ID.
+    """
+    index = get_prefix_index(model, user_id)
+    if index is not None:
+        return index.search(prefix, limit)
+
+    return list(
+        model.objects.filter(
+            user_id=user_id,
+            name__istartswith=prefix,
+        ).order_by(Upper('name'), 'id').values_list('id', 'name')[:limit]
+    )
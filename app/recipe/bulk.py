@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from core.models import Tag, Ingredient, Recipe
+from .cache import invalidate_user
+from .search import refresh_search_documents
+
+M2M_FIELDS = ('tags', 'ingredients')
+
+
+def get_batch_size():
+    """
+    Returns the number of rows written per INSERT or UPDATE statement.
+    """
+    return getattr(settings, 'RECIPE_BULK_BATCH_SIZE', 500)
+
+
+def prefetch_related_ids(recipes):
+    """
+    Loads the tag and ingredient IDs of recipes in one query each.
+    """
+    prefetch_related_objects(
+        recipes,
+        Prefetch('tags', queryset=Tag.objects.only('id').order_by('id')),
+        Prefetch('ingredients',
+                 queryset=Ingredient.objects.only('id').order_by('id')),
+    )
+
+
+def _write_links(pairs, replace):
+    """
+    Writes the M2M links of (recipe, validated data) pairs in bulk.
+
+    Only relations present in the data are touched. With `replace` the
+    existing links of those relations are deleted first.
+    """
+    for field in M2M_FIELDS:
+        m2m_field = Recipe._meta.get_field(field)
+        through = m2m_field.remote_field.through
+        column = f'{m2m_field.related_model._meta.model_name}_id'
+        changed = [
+            (recipe, data[field]) for recipe, data in pairs if field in data
+        ]
+        if not changed:
+            continue
+
+        if replace:
+            through.objects.filter(
+                recipe_id__in=[recipe.pk for recipe, _ in changed]
+            ).delete()
+        through.objects.bulk_create(
+            (
+                through(recipe_id=recipe.pk, **{column: related_id})
+                for recipe, related in changed
+                for related_id in {obj.pk for obj in related}
+            ),
+            batch_size=get_batch_size(),
+        )
+
+
+def _in_batches(queryset, names):
+    """
+    Yields the objects of queryset with the given names, batch by batch.
+    """
+    batch_size = get_batch_size()
+    for start in range(0, len(names), batch_size):
+        yield from queryset.filter(
+            name__in=names[start:start + batch_size]).order_by('id')
+
+
+def upsert_names(model, user, names):
+    """
+    Returns the user's tags or ingredients by name, creating missing ones.
+
+    Missing names are inserted with ON CONFLICT DO NOTHING under the
+    unique (user, name) constraint and read back, so names created by a
+    concurrent request are reused rather than duplicated. Returns the
+    objects by name and the number of names that were missing.
+    """
+    queryset = model.objects.filter(user=user).only('id', 'name')
+    objects = {obj.name: obj for obj in _in_batches(queryset, names)}
+    missing = [name for name in names if name not in objects]
+    if not missing:
+        return objects, 0
+
+    model.objects.bulk_create(
+        [model(user=user, name=name) for name in missing],
+        batch_size=get_batch_size(),
+        ignore_conflicts=True,
+    )
+    # Ignored rows come back without primary keys, read them all back.
+    objects.update(
+        (obj.name, obj) for obj in _in_batches(queryset, missing))
+    # Bulk writes do not send model signals.
+    invalidate_user(user.pk)
+
+    return objects, len(missing)
+
+
+@transaction.atomic
+def bulk_create_recipes(user, items):
+    """
+    Creates recipes for user from validated serializer data.
+
+    Recipes and each relation's links are inserted in batches, all in one
+    transaction. Returns the created recipes.
+    """
+    recipes = [
+        Recipe(
+            user=user,
+            **{k: v for k, v in data.items() if k not in M2M_FIELDS}
+        )
+        for data in items
+    ]
+    if connection.features.can_return_rows_from_bulk_insert:
+        Recipe.objects.bulk_create(recipes, batch_size=get_batch_size())
+    else:
+        # The links need primary keys, which this backend cannot return
+        # from a bulk insert.
+        for recipe in recipes:
+            recipe.save()
+    _write_links(list(zip(recipes, items)), replace=False)
+    # Bulk writes do not send model signals.
+    refresh_search_documents(recipe.pk for recipe in recipes)
+    invalidate_user(user.pk)
+
+    return recipes
+
+
+@transaction.atomic
+def bulk_update_recipes(user, pairs):
+    """
+    Applies validated serializer data to (recipe, data) pairs of user.
+
+    Changed columns are written with one batched UPDATE, changed relations
+    are replaced wholesale. Returns the updated recipes.
+    """
+    recipes = [recipe for recipe, _ in pairs]
+    fields = set()
+    for recipe, data in pairs:
+        for name, value in data.items():
+            if name not in M2M_FIELDS:
+                setattr(recipe, name, value)
+                fields.add(name)
+
+    if fields:
+        Recipe.objects.bulk_update(
+            recipes,
+            sorted(fields),
+            batch_size=get_batch_size(),
+        )
+    _write_links(pairs, replace=True)
+    refresh_search_documents(recipe.pk for recipe in recipes)
+    invalidate_user(user.pk)
+
+    return recipes
+
+
+def bulk_delete_recipes(user, ids):
+    """
+    Deletes the recipes of user with the given IDs.
+
+    Returns the number of recipes deleted.
+    """
+    _, deleted = Recipe.objects.filter(user=user, pk__in=ids).delete()
+
+    return deleted.get(Recipe._meta.label, 0)
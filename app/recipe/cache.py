@@ -0,0 +1,244 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = 'recipe:version:{user_id}'
+LIST_KEY = 'recipe:list:{user_id}:{version}:{digest}'
+STATS_KEY = 'recipe:stats:{name}'
+
+
+def get_cache():
+    """
+    Returns the cache backend used for recipe API responses.
+    """
+    return caches[getattr(settings, 'RECIPE_CACHE_ALIAS', 'default')]
+
+
+def is_process_local(cache):
+    """
+    Returns whether a cache backend is not shared between processes.
+    """
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def shared_cache_enabled(setting):
+    """
+    Returns whether a feature relying on the user versions is enabled.
+
+    The setting forces it on or off. By default it is only enabled with a
+    shared cache: with a per-process one, a write seen by one worker
+    leaves the version unchanged in the others, which keep serving what
+    they derived from the old data.
+    """
+    enabled = getattr(settings, setting, None)
+    if enabled is None:
+        return not is_process_local(get_cache())
+
+    return enabled
+
+
+def etags_enabled():
+    """
+    Returns whether recipe API responses carry version based ETags.
+
+    Other workers would answer 304 for changed data, see RECIPE_ETAGS.
+    """
+    return shared_cache_enabled('RECIPE_ETAGS')
+
+
+def lists_cached():
+    """
+    Returns whether list responses are cached, see RECIPE_CACHE_LISTS.
+    """
+    return shared_cache_enabled('RECIPE_CACHE_LISTS')
+
+
+def get_user_version(user_id):
+    """
+    Returns the current version of a user's recipe data.
+
+    A missing version starts from the current time rather than from zero,
+    so a counter evicted from the cache cannot reuse a stale version.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_user_version(user_id):
+    """
+    Invalidates every cached response of a user by bumping their version.
+    """
+    try:
+        get_cache().incr(VERSION_KEY.format(user_id=user_id))
+    except ValueError:
+        # No version yet, the next read starts a fresh one.
+        pass
+
+
+def invalidate_user(user_id):
+    """
+    Invalidates a user's cached responses now and again on commit.
+
+    The first bump covers reads later in the same transaction, the second
+    one responses cached by other requests before the write was visible.
+    """
+    bump_user_version(user_id)
+    transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+def record(name):
+    """
+    Increments a cache statistics counter.
+    """
+    cache = get_cache()
+    key = STATS_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def cache_stats():
+    """
+    Returns the response cache hit and miss counters.
+    """
+    cache = get_cache()
+    names = ('hits', 'misses')
+    values = cache.get_many([STATS_KEY.format(name=name) for name in names])
+
+    return {
+        name: values.get(STATS_KEY.format(name=name), 0) for name in names
+    }
+
+
+def reset_cache_stats():
+    """
+    Resets the response cache hit and miss counters.
+    """
+    get_cache().delete_many(
+        [STATS_KEY.format(name=name) for name in ('hits', 'misses')]
+    )
+
+
+def list_cache_key(request):
+    """
+    Returns the cache key of a list response for the requesting user.
+
+    The absolute URI is hashed because pagination links include the host.
+    """
+    digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+    return LIST_KEY.format(
+        user_id=request.user.pk,
+        version=get_user_version(request.user.pk),
+        digest=digest,
+    )
+
+
+class CachedListMixin:
+    """
+    Caches list responses per user and per query string.
+
+    Entries are never deleted. Writes bump the user's version instead,
+    which changes every key the user's responses are stored under. Does
+    nothing unless `lists_cached`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the cached list response, building it on a miss.
+        """
+        if not lists_cached():
+            return super().list(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            record('hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record('misses')
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                response.data,
+                getattr(settings, 'RECIPE_CACHE_TIMEOUT', 300),
+            )
+        response['X-Cache'] = 'MISS'
+
+        return response
+
+
+def response_etag(request):
+    """
+    Returns a strong ETag for a response to the requesting user.
+
+    It only depends on the user's version and on what was requested, so
+    it is known before any query runs.
+    """
+    parts = (
+        request.user.pk,
+        get_user_version(request.user.pk),
+        request.build_absolute_uri(),
+        request.accepted_media_type,
+    )
+    digest = hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with 304 Not Modified when the ETag matches.
+
+    A matching `If-None-Match` is answered without touching the database,
+    any write by the user changes the ETag of all their responses. Lists
+    are handled here, other actions can wrap their handler with
+    `conditional_get`. Does nothing unless `etags_enabled`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the list, or 304 if the client's copy is current.
+        """
+        return self.conditional_get(super().list, request, *args, **kwargs)
+
+    def conditional_get(self, handler, request, *args, **kwargs):
+        """
+        Runs handler unless If-None-Match holds the current ETag.
+        """
+        if not etags_enabled():
+            return handler(request, *args, **kwargs)
+
+        etag = response_etag(request)
+        client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in client_etags or '*' in client_etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            # Responses are per user, clients must revalidate before reuse.
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Authorization',))
+
+        return response
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from .cache import get_cache, is_process_local
+
+# The user versions in RECIPE_CACHE_ALIAS invalidate every derived copy of
+# a user's data. With a per-process cache only the worker handling a write
+# sees the new version, so by default list responses are only cached,
+# ETags only sent and autocomplete indexes only kept when that cache is
+# shared. A per-process cache also keeps the list cache counters out of
+# reach of the recipe_cache_stats command.
+
+
+def check_forced_setting(setting, check_id):
+    """
+    Returns a warning if setting is forced on with a per-process cache.
+    """
+    if getattr(settings, setting, None) and is_process_local(get_cache()):
+        return [
+            Warning(
+                f'{setting} is enabled but RECIPE_CACHE_ALIAS is a '
+                'per-process cache.',
+                hint=(
+                    'With more than one worker process, point '
+                    'RECIPE_CACHE_ALIAS at a shared cache such as '
+                    'memcached or redis. Silence this warning if the '
+                    'application runs a single process.'
+                ),
+                id=check_id,
+            )
+        ]
+
+    return []
+
+
+@register()
+def check_etag_cache(app_configs, **kwargs):
+    """
+    Warns when ETags are forced on with a per-process cache.
+
+    With more than one worker clients then get 304 for data that changed.
+    """
+    return check_forced_setting('RECIPE_ETAGS', 'recipe.W001')
+
+
+@register()
+def check_list_cache(app_configs, **kwargs):
+    """
+    Warns when list caching is forced on with a per-process cache.
+
+    With more than one worker, lists then stay stale for up to
+    RECIPE_CACHE_TIMEOUT seconds after a write, and the hit and miss
+    counters cannot be read by recipe_cache_stats.
+    """
+    return check_forced_setting('RECIPE_CACHE_LISTS', 'recipe.W002')
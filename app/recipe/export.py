@@ -0,0 +1,96 @@
+from collections import defaultdict
+from itertools import islice
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+from core.models import Recipe
+from core.renderers import dumps
+from .fastpath import get_row_serializer
+from .serializers import RecipeSerializer
+
+# Fields of each exported recipe, relations are nested as objects.
+EXPORT_FIELDS = (
+    'id',
+    'title',
+    'ingredients',
+    'tags',
+    'prep_time_mins',
+    'cook_time_mins',
+    'price',
+    'url',
+)
+RELATIONS = ('ingredients', 'tags')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders data as a single line of newline delimited JSON.
+
+    Exports stream their lines directly, this renders error responses
+    for clients that only accept NDJSON.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders data as one JSON line.
+        """
+        if data is None:
+            return b''
+
+        return dumps(data) + b'\n'
+
+
+def get_chunk_size():
+    """
+    Returns the number of recipes read and serialized at a time.
+    """
+    return getattr(settings, 'RECIPE_EXPORT_CHUNK_SIZE', 500)
+
+
+def get_related(recipe_ids):
+    """
+    Returns the tag and ingredient objects of recipes, by recipe ID.
+
+    Objects are in ascending ID order, like in API responses.
+    """
+    related = {}
+    for field in RELATIONS:
+        m2m_field = Recipe._meta.get_field(field)
+        through = m2m_field.remote_field.through
+        name = m2m_field.related_model._meta.model_name
+        links = defaultdict(list)
+        rows = through.objects.filter(recipe_id__in=recipe_ids).order_by(
+            'recipe_id', f'{name}_id',
+        ).values_list('recipe_id', f'{name}_id', f'{name}__name')
+        for recipe_id, related_id, related_name in rows:
+            links[recipe_id].append({'id': related_id, 'name': related_name})
+        related[field] = links
+
+    return related
+
+
+def iter_export(queryset, chunk_size=None):
+    """
+    Yields the recipes of a queryset as NDJSON lines.
+
+    Rows are read through a server-side cursor where the database has
+    them, and tags and ingredients are fetched for one chunk of recipes
+    at a time, so memory use does not grow with the number of recipes.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    row_serializer = get_row_serializer(
+        RecipeSerializer,
+        tuple(name for name in EXPORT_FIELDS if name not in RELATIONS),
+    )
+    rows = row_serializer.get_rows(queryset).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        related = get_related([row['id'] for row in chunk])
+        for item in row_serializer.represent(chunk):
+            for field in RELATIONS:
+                item[field] = related[field].get(item['id'], [])
+            yield dumps({name: item[name] for name in EXPORT_FIELDS}) + b'\n'
@@ -0,0 +1,171 @@
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from core.models import Recipe
+
+# Field types whose representation of a database value is the value.
+IDENTITY_FIELDS = (serializers.IntegerField, serializers.CharField)
+
+
+def thumbnail_from_row(row, request):
+    """
+    Returns the URL of a row's small WebP variant, like get_thumbnail.
+    """
+    name = row['image_variants'].get('thumb_webp')
+    if not name:
+        return None
+    url = Recipe._meta.get_field('image').storage.url(name)
+
+    return request.build_absolute_uri(url) if request else url
+
+
+# Method fields computed from values() rows, by field name, with the
+# columns they read.
+ROW_METHODS = {
+    'thumbnail': (thumbnail_from_row, ('image_variants',)),
+}
+
+
+class RowSerializer:
+    """
+    Read-only list representation built from values() rows.
+
+    Every field of the wrapped serializer is compiled once into a column
+    and a mapper: None where the representation is the database value,
+    otherwise the field's own to_representation. The output is equal to
+    the serializer's, without instantiating models or walking fields.
+    Many-to-many fields are rendered as lists of related IDs.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        if fields is None:
+            serializer = serializer_class()
+        else:
+            serializer = serializer_class(fields=fields)
+        self.model = serializer_class.Meta.model
+        columns = {'id'}
+        self.mappers = []
+        self.relations = []
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.ManyRelatedField):
+                self.relations.append(name)
+                self.mappers.append((name, None, None))
+            elif isinstance(field, serializers.SerializerMethodField):
+                method, method_columns = ROW_METHODS[name]
+                columns.update(method_columns)
+                self.mappers.append((name, None, method))
+            else:
+                columns.add(field.source)
+                if type(field) in IDENTITY_FIELDS and field.source == name:
+                    self.mappers.append((name, name, None))
+                else:
+                    self.mappers.append((name, field.source, field))
+        self.columns = sorted(columns)
+
+    def get_rows(self, queryset):
+        """
+        Returns a values() queryset of the columns the fields read.
+        """
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def get_related_ids(self, rows):
+        """
+        Returns the related IDs of rows, by relation and row ID.
+
+        IDs are in ascending order, like the prefetches of the views.
+        """
+        ids = [row['id'] for row in rows]
+        own_column = f'{self.model._meta.model_name}_id'
+        related = {}
+        for name in self.relations:
+            m2m_field = self.model._meta.get_field(name)
+            through = m2m_field.remote_field.through
+            column = f'{m2m_field.related_model._meta.model_name}_id'
+            links = defaultdict(list)
+            pairs = through.objects.filter(**{
+                f'{own_column}__in': ids,
+            }).order_by(own_column, column).values_list(own_column, column)
+            for row_id, related_id in pairs:
+                links[row_id].append(related_id)
+            related[name] = links
+
+        return related
+
+    def represent(self, rows, request=None):
+        """
+        Returns the representation of a list of rows.
+        """
+        related = self.get_related_ids(rows) if self.relations else {}
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, mapper in self.mappers:
+                if source is None:
+                    if mapper is None:
+                        item[name] = related[name].get(row['id'], [])
+                    else:
+                        item[name] = mapper(row, request)
+                    continue
+                value = row[source]
+                if mapper is None or value is None:
+                    item[name] = value
+                else:
+                    item[name] = mapper.to_representation(value)
+            data.append(item)
+
+        return data
+
+
+@lru_cache(maxsize=128)
+def get_row_serializer(serializer_class, fields=None):
+    """
+    Returns the compiled row serializer of a serializer and fieldset.
+    """
+    return RowSerializer(
+        serializer_class,
+        list(fields) if fields is not None else None,
+    )
+
+
+class FastListMixin:
+    """
+    Serves list responses from values() rows instead of model instances.
+
+    Views opt out per request with `use_fast_list`, e.g. when relations
+    are nested, and globally with the RECIPE_FAST_LIST setting.
+    """
+
+    def use_fast_list(self):
+        """
+        Returns whether the current list can use the row serializer.
+        """
+        return getattr(settings, 'RECIPE_FAST_LIST', True)
+
+    def get_fieldset(self):
+        """
+        Returns the requested fields, or None for all of them.
+        """
+        return None
+
+    def list(self, request, *args, **kwargs):
+        """
+        Lists rows rendered by the compiled row serializer.
+        """
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+
+        fields = self.get_fieldset()
+        row_serializer = get_row_serializer(
+            self.get_serializer_class(),
+            tuple(fields) if fields is not None else None,
+        )
+        rows = row_serializer.get_rows(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                row_serializer.represent(page, request))
+
+        return Response(row_serializer.represent(list(rows), request))
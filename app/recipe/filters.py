@@ -0,0 +1,49 @@
+from django.db.models import Count
+from core.models import Recipe
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+MATCH_MODES = (MATCH_ANY, MATCH_ALL)
+
+
+def recipes_linked_to(field, related_ids, match=MATCH_ANY):
+    """
+    Returns a subquery of IDs of recipes linked through a M2M field.
+
+    With `any` a recipe matches if it is linked to at least one of the
+    related IDs, with `all` it must be linked to every one of them. The
+    through table is grouped by recipe instead of being joined onto the
+    recipes, so a recipe matching several IDs is still returned once.
+    """
+    related_ids = set(related_ids)
+    m2m_field = Recipe._meta.get_field(field)
+    through = m2m_field.remote_field.through
+    column = f'{m2m_field.related_model._meta.model_name}_id'
+
+    links = through.objects.filter(**{f'{column}__in': related_ids})
+    if match == MATCH_ALL:
+        links = links.values('recipe_id').annotate(
+            matched=Count(column)
+        ).filter(matched=len(related_ids))
+
+    return links.values('recipe_id')
+
+
+def filter_recipes(queryset, tag_ids=None, ingredient_ids=None,
+                   match=MATCH_ANY):
+    """
+    Filters recipes by tags and ingredients.
+
+    Tag and ingredient conditions are combined with AND, `match` decides
+    how the IDs within each of them are combined.
+    """
+    if tag_ids:
+        queryset = queryset.filter(
+            pk__in=recipes_linked_to('tags', tag_ids, match)
+        )
+    if ingredient_ids:
+        queryset = queryset.filter(
+            pk__in=recipes_linked_to('ingredients', ingredient_ids, match)
+        )
+
+    return queryset
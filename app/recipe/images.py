@@ -0,0 +1,198 @@
+import logging
+import os
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image
+from core.models import Recipe, ImageJob
+from core.storage import add_references, remove_references
+from .cache import invalidate_user
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = 'uploads/recipe/variants/'
+# Pillow format name and file extension for each variant format.
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_variant_sizes():
+    """
+    Returns the variant names mapped to their maximum edge in pixels.
+    """
+    return getattr(
+        settings,
+        'RECIPE_IMAGE_VARIANTS',
+        {'thumb': 200, 'medium': 800},
+    )
+
+
+def render_variant(image, size, image_format):
+    """
+    Returns image shrunk to fit a size x size box, encoded as image_format.
+    """
+    variant = image.copy()
+    variant.thumbnail((size, size))
+    if variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    variant.save(
+        buffer,
+        format=FORMATS[image_format][0],
+        quality=getattr(settings, 'RECIPE_IMAGE_QUALITY', 80),
+    )
+
+    return buffer.getvalue()
+
+
+def generate_variants(image_field):
+    """
+    Writes every variant of an image to storage.
+
+    Returns a dict of `<size>_<format>` variant names to storage names.
+    """
+    storage = image_field.storage
+    stem = os.path.splitext(os.path.basename(image_field.name))[0]
+    variants = {}
+    with storage.open(image_field.name, 'rb') as original:
+        with Image.open(original) as image:
+            image.load()
+            for size_name, size in get_variant_sizes().items():
+                for image_format, (_, ext) in FORMATS.items():
+                    name = f'{size_name}_{image_format}'
+                    variants[name] = storage.save(
+                        f'{VARIANT_DIR}{stem}_{size_name}.{ext}',
+                        ContentFile(render_variant(image, size, image_format)),
+                    )
+
+    return variants
+
+
+def finish_job(job_id, status, **fields):
+    """
+    Sets the final status of an image job.
+
+    Queryset updates skip auto_now, so updated_at is set here.
+    """
+    ImageJob.objects.filter(pk=job_id).update(
+        status=status,
+        updated_at=timezone.now(),
+        **fields,
+    )
+
+
+def requeue_stale_jobs(stale_after):
+    """
+    Returns jobs left processing for stale_after seconds to pending.
+
+    A job stays processing when the process running it dies, e.g. on a
+    restart. Returns the number of jobs requeued.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+
+    return ImageJob.objects.filter(
+        status=ImageJob.PROCESSING,
+        updated_at__lt=cutoff,
+    ).update(status=ImageJob.PENDING, updated_at=timezone.now())
+
+
+def process_job(job_id):
+    """
+    Generates the variants of an image job and stores them on its recipe.
+
+    The job is claimed with a conditional update, so running it twice, or
+    from several workers, only processes it once. Jobs whose recipe has a
+    newer image since are completed without work.
+    """
+    claimed = ImageJob.objects.filter(
+        pk=job_id,
+        status=ImageJob.PENDING,
+    ).update(status=ImageJob.PROCESSING, updated_at=timezone.now())
+    if not claimed:
+        return
+    job = ImageJob.objects.select_related('recipe').get(pk=job_id)
+    recipe = job.recipe
+    if recipe.image.name != job.image:
+        finish_job(job_id, ImageJob.DONE)
+        return
+
+    try:
+        variants = generate_variants(recipe.image)
+    except Exception as exc:
+        logger.exception('Image job %s failed', job_id)
+        finish_job(job_id, ImageJob.FAILED, error=str(exc))
+        return
+
+    with transaction.atomic():
+        updated = Recipe.objects.filter(
+            pk=recipe.pk,
+            image=job.image,
+        ).update(image_variants=variants)
+        # The update bypasses the recipe signals, so count the swapped
+        # files here. Variants of an image replaced in the meantime stay
+        # unreferenced and are collected by gc_media.
+        if updated:
+            add_references(variants.values())
+            remove_references(recipe.image_variants.values())
+            invalidate_user(recipe.user_id)
+    finish_job(job_id, ImageJob.DONE)
+
+
+def run_job(job_id):
+    """
+    Runs an image job on a worker thread with its own DB connection.
+
+    Errors are logged, the executor would only store them in a future
+    nobody reads.
+    """
+    close_old_connections()
+    try:
+        process_job(job_id)
+    except Exception:
+        logger.exception('Image job %s crashed', job_id)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    """
+    Returns the shared worker pool, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RECIPE_IMAGE_WORKERS', 2),
+                thread_name_prefix='recipe-image',
+            )
+
+    return _executor
+
+
+def enqueue_image_job(recipe):
+    """
+    Queues variant generation for the recipe's current image.
+
+    The job row is written in the caller's transaction and handed to the
+    worker pool once it commits. Jobs still pending, or left processing,
+    after a restart can be run with the process_image_jobs command.
+    """
+    job = ImageJob.objects.create(recipe=recipe, image=recipe.image.name)
+    if getattr(settings, 'RECIPE_IMAGE_PROCESSING', 'thread') == 'sync':
+        transaction.on_commit(lambda: process_job(job.pk))
+    else:
+        transaction.on_commit(
+            lambda: get_executor().submit(run_job, job.pk)
+        )
+
+    return job
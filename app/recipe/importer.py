@@ -0,0 +1,236 @@
+import csv
+import json
+import os
+from itertools import islice
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from core.models import Tag, Ingredient
+from core.renderers import orjson
+from .bulk import bulk_create_recipes, upsert_names
+from .serializers import RecipeImportSerializer
+
+# Import formats by media type and by file extension.
+MEDIA_TYPES = {
+    'application/x-ndjson': 'ndjson',
+    'text/csv': 'csv',
+}
+EXTENSIONS = {
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.csv': 'csv',
+}
+# Separates the tag or ingredient names of a CSV cell.
+CSV_LIST_SEPARATOR = ';'
+# Relations given by name, with their model.
+NAME_FIELDS = (('ingredients', Ingredient), ('tags', Tag))
+
+
+def get_batch_size():
+    """
+    Returns the number of rows validated and written per transaction.
+    """
+    return getattr(settings, 'RECIPE_IMPORT_BATCH_SIZE', 500)
+
+
+def get_max_errors():
+    """
+    Returns the number of row errors kept for the import report.
+    """
+    return getattr(settings, 'RECIPE_IMPORT_MAX_ERRORS', 100)
+
+
+def get_format(name='', media_type=''):
+    """
+    Returns the import format of a file name or media type, or None.
+    """
+    extension = os.path.splitext(name or '')[1].lower()
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+
+    return MEDIA_TYPES.get((media_type or '').split(';')[0].strip())
+
+
+def loads(line):
+    """
+    Decodes a JSON document, with orjson when it is installed.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # E.g. integers beyond 64 bits, which the stdlib can decode.
+            pass
+
+    return json.loads(line)
+
+
+def read_ndjson(lines):
+    """
+    Yields (line number, item, error) triples of NDJSON lines.
+
+    Blank lines are skipped, lines that are not JSON yield an error.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, loads(line), None
+        except ValueError:
+            yield number, None, 'Invalid JSON.'
+
+
+def decode_lines(lines):
+    """
+    Yields lines decoded as UTF-8, dropping a leading byte order mark.
+    """
+    for number, line in enumerate(lines):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8-sig' if number == 0 else 'utf-8')
+        yield line
+
+
+def read_csv(lines):
+    """
+    Yields (line number, item, error) triples of CSV rows.
+
+    The first row names the columns. Tag and ingredient cells hold names
+    separated by CSV_LIST_SEPARATOR, empty and unknown cells are ignored.
+    Reading stops at the first line that is not valid UTF-8.
+    """
+    reader = csv.DictReader(decode_lines(lines))
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            yield reader.line_num + 1, None, 'Invalid UTF-8.'
+            return
+        except csv.Error as exc:
+            yield reader.line_num, None, f'Invalid CSV: {exc}.'
+            return
+        item = {}
+        for name, value in row.items():
+            if name is None or value is None or value == '':
+                continue
+            name = name.strip()
+            if name in ('tags', 'ingredients'):
+                value = [
+                    part.strip()
+                    for part in value.split(CSV_LIST_SEPARATOR)
+                    if part.strip()
+                ]
+            item[name] = value
+        yield reader.line_num, item, None
+
+
+READERS = {
+    'ndjson': read_ndjson,
+    'csv': read_csv,
+}
+
+
+class ImportResult:
+    """
+    Counts of an import in progress, with the first errors by line.
+    """
+
+    def __init__(self, max_errors=None):
+        self.max_errors = get_max_errors() if max_errors is None \
+            else max_errors
+        self.processed = 0
+        self.created = 0
+        self.failed = 0
+        self.names_created = {field: 0 for field, _ in NAME_FIELDS}
+        self.errors = []
+
+    def add_error(self, line, detail):
+        """
+        Counts a rejected row, keeping its errors up to max_errors.
+        """
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': detail})
+
+    def as_dict(self):
+        """
+        Returns the report of the import.
+        """
+        return {
+            'processed': self.processed,
+            'created': self.created,
+            'failed': self.failed,
+            'ingredients_created': self.names_created['ingredients'],
+            'tags_created': self.names_created['tags'],
+            'errors': self.errors,
+        }
+
+
+class RecipeImporter:
+    """
+    Imports a stream of recipe rows for a user.
+
+    Rows are read lazily and handled batch_size at a time: each batch is
+    validated, its tag and ingredient names resolved with a few queries,
+    and its valid recipes written in one transaction. Invalid rows are
+    reported without failing their batch. `progress` is called with the
+    ImportResult after every batch.
+    """
+
+    def __init__(self, user, batch_size=None, max_errors=None,
+                 progress=None):
+        self.user = user
+        self.batch_size = batch_size or get_batch_size()
+        self.progress = progress
+        self.result = ImportResult(max_errors)
+        self.serializer = RecipeImportSerializer(context={'user': user})
+
+    def run(self, rows):
+        """
+        Imports (line number, item, error) rows and returns the result.
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return self.result
+            items = []
+            for line, item, error in batch:
+                self.result.processed += 1
+                if error is not None:
+                    self.result.add_error(line, [error])
+                    continue
+                try:
+                    items.append(self.serializer.run_validation(item))
+                except ValidationError as exc:
+                    self.result.add_error(line, exc.detail)
+            if items:
+                self.write(items)
+                self.result.created += len(items)
+            if self.progress is not None:
+                self.progress(self.result)
+
+    @transaction.atomic
+    def write(self, items):
+        """
+        Creates the recipes of validated items with their named relations.
+        """
+        for field, model in NAME_FIELDS:
+            names = list(dict.fromkeys(
+                name for data in items for name in data[field]
+            ))
+            objects, created = upsert_names(model, self.user, names)
+            self.result.names_created[field] += created
+            for data in items:
+                data[field] = [objects[name] for name in data[field]]
+        bulk_create_recipes(self.user, items)
+
+
+def import_recipes(user, lines, file_format, **kwargs):
+    """
+    Imports recipes for user from lines of an NDJSON or CSV file.
+
+    Keyword arguments are passed to RecipeImporter. Returns the result.
+    """
+    return RecipeImporter(user, **kwargs).run(READERS[file_format](lines))
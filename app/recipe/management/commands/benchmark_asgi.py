@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from core.benchmark import create_benchmark_user, seed_recipes
+from core.models import Recipe
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare recipe reads under WSGI and ASGI.
+
+    Requests go through in-process test clients: WSGI with one client
+    per thread, like a threaded WSGI server, and ASGI with concurrent
+    requests on one event loop, to the sync views and to their async
+    variants. Every request reads another recipe's detail, so responses
+    are not served from the list cache.
+
+    The threads need to see the seeded rows, so they are committed and
+    deleted again at the end, and the database must not be in-memory.
+    """
+    help = 'Benchmarks recipe reads under WSGI sync, ASGI sync and ' \
+           'ASGI async.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=1000,
+            help='Number of recipes to seed.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Requests per measurement.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            default='1,10,50',
+            help='Comma separated numbers of concurrent clients.',
+        )
+
+    def handle(self, *args, **options):
+        user = create_benchmark_user()
+        # Connections stay open on every path, so only the way requests
+        # are dispatched differs. Thread connections share this dict.
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        connection.settings_dict['CONN_MAX_AGE'] = None
+        try:
+            seed_recipes(user, options['recipes'])
+            token = Token.objects.create(user=user)
+            ids = list(Recipe.objects.filter(user=user).values_list(
+                'id', flat=True)[:options['requests']])
+            self.authorization = f'Token {token.key}'
+            # The test clients send requests to the host 'testserver'.
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                self.measure(ids, options)
+        finally:
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+            user.delete()
+
+    def measure(self, ids, options):
+        """
+        Writes the time each dispatch mode takes to get recipe details.
+        """
+        for concurrency in [
+                int(n) for n in options['concurrency'].split(',')]:
+            for name, url_name, run in (
+                    ('wsgi sync', 'recipe:recipe-detail', self.wsgi),
+                    ('asgi sync', 'recipe:recipe-detail', self.asgi),
+                    ('asgi async', 'recipe:recipe-detail-async',
+                     self.asgi)):
+                urls = [
+                    reverse(url_name, args=[ids[n % len(ids)]])
+                    for n in range(options['requests'])
+                ]
+                ms = run(urls, concurrency)
+                self.stdout.write(
+                    f'{concurrency:>4} clients  {name:<12} '
+                    f'{ms:9.2f} ms  {len(urls) / ms * 1000:8.1f} req/s'
+                )
+
+    def check_statuses(self, statuses):
+        """
+        Fails the benchmark unless every request succeeded.
+        """
+        failed = [status for status in statuses if status != 200]
+        if failed:
+            raise CommandError(
+                f'{len(failed)} requests failed, e.g. with {failed[0]}.')
+
+    def wsgi(self, urls, concurrency):
+        """
+        Returns the ms taken by concurrent threads to get urls via WSGI.
+        """
+        local = threading.local()
+
+        def get(url):
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_AUTHORIZATION=self.authorization)
+            return local.client.get(url).status_code
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            start = time.perf_counter()
+            statuses = list(executor.map(get, urls))
+            ms = (time.perf_counter() - start) * 1000
+        self.check_statuses(statuses)
+
+        return ms
+
+    def asgi(self, urls, concurrency):
+        """
+        Returns the ms taken by concurrent requests to get urls via ASGI.
+        """
+        client = AsyncClient()
+
+        async def get(semaphore, url):
+            async with semaphore:
+                response = await client.get(
+                    url, authorization=self.authorization)
+                return response.status_code
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*[get(semaphore, url) for url in urls])
+
+        start = time.perf_counter()
+        statuses = asyncio.run(run())
+        ms = (time.perf_counter() - start) * 1000
+        self.check_statuses(statuses)
+
+        return ms
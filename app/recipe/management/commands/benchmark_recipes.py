@@ -0,0 +1,298 @@
+import tracemalloc
+from io import BytesIO
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Upper
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from core.benchmark import (rolled_back, measure, create_benchmark_user,
+                            seed_recipes)
+from core.models import Tag, Ingredient, Recipe
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+from recipe.filters import MATCH_ANY, MATCH_ALL, filter_recipes
+from recipe.search import refresh_search_documents, search_recipes
+from recipe.autocomplete import PrefixIndex
+from recipe.fastpath import RowSerializer
+from recipe.export import iter_export
+from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
+from recipe.views import TagViewSet, RecipeViewSet
+
+
+class Command(BaseCommand):
+    """
+    Django command to benchmark recipe API queries on seeded data.
+
+    Everything the benchmark writes is rolled back when it finishes.
+    """
+    help = 'Benchmarks recipe API queries against seeded data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenario',
+            choices=sorted(self.scenarios),
+        )
+        parser.add_argument(
+            '--recipes',
+            default='1000,10000',
+            help='Comma separated recipe counts to benchmark.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per measurement; the median is reported.',
+        )
+
+    def handle(self, *args, **options):
+        scenario = getattr(self, self.scenarios[options['scenario']])
+        for count in [int(n) for n in options['recipes'].split(',')]:
+            with rolled_back():
+                user = create_benchmark_user()
+                results = scenario(user, count, options['repeat'])
+            self.report(count, results)
+
+    def report(self, count, results):
+        """
+        Writes one line per measured variant.
+        """
+        for name, ms in results:
+            self.stdout.write(f'{count:>8} recipes  {name:<24} {ms:9.2f} ms')
+
+    scenarios = {
+        'assigned_only': 'bench_assigned_only',
+        'filter': 'bench_filter',
+        'bulk': 'bench_bulk',
+        'search': 'bench_search',
+        'autocomplete': 'bench_autocomplete',
+        'serialize': 'bench_serialize',
+        'json': 'bench_json',
+        'export': 'bench_export',
+    }
+
+    def bench_assigned_only(self, user, count, repeat):
+        """
+        Compares the DISTINCT join with the EXISTS filter for tags.
+        """
+        seed_recipes(user, count)
+        distinct_join = Tag.objects.filter(
+            recipe__isnull=False,
+            user=user,
+        ).order_by('-name', '-id').distinct()
+        exists = Tag.objects.filter(
+            TagViewSet()._assigned_to_recipe(),
+            user=user,
+        ).order_by('-name', '-id')
+
+        return [
+            ('join + distinct', measure(
+                lambda: list(distinct_join.all()), repeat)),
+            ('exists', measure(lambda: list(exists.all()), repeat)),
+        ]
+
+    def bench_filter(self, user, count, repeat):
+        """
+        Compares chained M2M joins with the grouped subquery filters.
+        """
+        tag_ids, ingredient_ids = seed_recipes(user, count)
+        tag_ids = tag_ids[:3]
+        ingredient_ids = ingredient_ids[:3]
+        recipes = Recipe.objects.filter(user=user).order_by('-id')
+        joins = recipes.filter(
+            tags__id__in=tag_ids,
+        ).filter(
+            ingredients__id__in=ingredient_ids,
+        ).distinct()
+        match_any = filter_recipes(
+            recipes, tag_ids, ingredient_ids, MATCH_ANY)
+        match_all = filter_recipes(
+            recipes, tag_ids[:2], ingredient_ids[:2], MATCH_ALL)
+
+        def fetch(queryset):
+            return lambda: list(queryset.values_list('id', flat=True))
+
+        return [
+            ('join + distinct', measure(fetch(joins), repeat)),
+            ('match=any', measure(fetch(match_any), repeat)),
+            ('match=all', measure(fetch(match_all), repeat)),
+        ]
+
+    def bench_bulk(self, user, count, repeat):
+        """
+        Compares creating recipes one POST at a time with one bulk POST.
+        """
+        tag_ids, ingredient_ids = seed_recipes(user, 0)
+        factory = APIRequestFactory()
+        items = [
+            {
+                'title': f'Imported {i}',
+                'prep_time_mins': 5,
+                'cook_time_mins': 10,
+                'price': '4.50',
+                'tags': tag_ids[:2],
+                'ingredients': ingredient_ids[:3],
+            }
+            for i in range(count)
+        ]
+
+        def post(view, payload):
+            request = factory.post('/', payload, format='json')
+            force_authenticate(request, user=user)
+            response = view(request)
+            if response.status_code != 201:
+                raise CommandError(f'POST failed: {response.data}')
+
+        def single():
+            view = RecipeViewSet.as_view({'post': 'create'})
+            for item in items:
+                post(view, item)
+
+        def bulk():
+            post(RecipeViewSet.as_view({'post': 'bulk'}), items)
+
+        return [
+            (f'single POST x {count}', measure(single, repeat)),
+            ('bulk POST', measure(bulk, repeat)),
+        ]
+
+    def bench_search(self, user, count, repeat):
+        """
+        Compares an icontains scan over the joins with the search index.
+        """
+        seed_recipes(user, count)
+        recipes = Recipe.objects.filter(user=user)
+        refresh_search_documents(recipes.values_list('id', flat=True))
+        query = 'Ingredient 7'
+        scan = recipes.filter(
+            Q(title__icontains=query)
+            | Q(tags__name__icontains=query)
+            | Q(ingredients__name__icontains=query)
+        ).distinct().order_by('-id')
+        search = search_recipes(recipes, query)
+        label = (
+            'full-text search' if connection.vendor == 'postgresql'
+            else 'search document scan'
+        )
+
+        def first_page(queryset):
+            return lambda: list(
+                queryset.all().values_list('id', flat=True)[:100])
+
+        return [
+            ('icontains + distinct', measure(first_page(scan), repeat)),
+            (label, measure(first_page(search), repeat)),
+        ]
+
+    def bench_autocomplete(self, user, count, repeat):
+        """
+        Compares prefix queries on the database with the in-memory index.
+
+        Seeds as many tags as the recipe count. The index is measured
+        directly, whatever RECIPE_AUTOCOMPLETE_CACHE_MAX_NAMES allows.
+        """
+        seed_recipes(user, 0, tags=count)
+        rows = list(
+            Tag.objects.filter(user=user).values_list('id', 'name'))
+        index = PrefixIndex(rows)
+
+        def database():
+            list(Tag.objects.filter(
+                user=user, name__istartswith='tag 1',
+            ).order_by(Upper('name'), 'id').values_list('id', 'name')[:10])
+
+        return [
+            ('database', measure(database, repeat)),
+            ('index build', measure(lambda: PrefixIndex(rows), repeat)),
+            ('index lookup', measure(
+                lambda: index.search('tag 1', 10), repeat)),
+        ]
+
+    def bench_serialize(self, user, count, repeat):
+        """
+        Compares RecipeSerializer with the row serializer on a full list.
+        """
+        seed_recipes(user, count)
+        recipes = Recipe.objects.filter(user=user).order_by('-id')
+        instances = recipes.prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.only('id')),
+            Prefetch('ingredients', queryset=Ingredient.objects.only('id')),
+        )
+        row_serializer = RowSerializer(RecipeSerializer)
+
+        def serializer():
+            RecipeSerializer(instances.all(), many=True).data
+
+        def rows():
+            row_serializer.represent(
+                list(row_serializer.get_rows(recipes.all())))
+
+        return [
+            ('ModelSerializer', measure(serializer, repeat)),
+            ('row serializer', measure(rows, repeat)),
+        ]
+
+    def bench_json(self, user, count, repeat):
+        """
+        Compares the stdlib and fast JSON renderers and parsers.
+
+        The payload is the recipe list representation of every recipe.
+        """
+        seed_recipes(user, count)
+        row_serializer = RowSerializer(RecipeSerializer)
+        data = row_serializer.represent(list(row_serializer.get_rows(
+            Recipe.objects.filter(user=user).order_by('-id'))))
+        body = JSONRenderer().render(data)
+        suffix = '' if orjson is not None else ' (no orjson)'
+
+        def parse(parser):
+            return lambda: parser.parse(
+                BytesIO(body), 'application/json', {})
+
+        return [
+            ('render stdlib', measure(
+                lambda: JSONRenderer().render(data), repeat)),
+            (f'render fast{suffix}', measure(
+                lambda: FastJSONRenderer().render(data), repeat)),
+            ('parse stdlib', measure(parse(JSONParser()), repeat)),
+            (f'parse fast{suffix}', measure(
+                parse(FastJSONParser()), repeat)),
+        ]
+
+    def bench_export(self, user, count, repeat):
+        """
+        Compares one JSON response of every recipe with the NDJSON stream.
+
+        Labels include the peak memory allocated by one run.
+        """
+        seed_recipes(user, count)
+        recipes = Recipe.objects.filter(user=user).order_by('-id')
+        instances = recipes.prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.only('id', 'name')),
+            Prefetch(
+                'ingredients',
+                queryset=Ingredient.objects.only('id', 'name'),
+            ),
+        )
+
+        def response():
+            FastJSONRenderer().render(
+                RecipeDetailSerializer(instances.all(), many=True).data)
+
+        def stream():
+            for line in iter_export(recipes.all()):
+                pass
+
+        def peak(func):
+            tracemalloc.start()
+            try:
+                func()
+                return tracemalloc.get_traced_memory()[1] // 1024
+            finally:
+                tracemalloc.stop()
+
+        return [
+            (f'response ({peak(response)} KiB)', measure(response, repeat)),
+            (f'stream ({peak(stream)} KiB)', measure(stream, repeat)),
+        ]
@@ -0,0 +1,79 @@
+import json
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from recipe.importer import READERS, get_format, import_recipes
+
+
+class Command(BaseCommand):
+    """
+    Django command to import recipes for a user from a file.
+
+    The file is streamed line by line and written in batches, so files
+    of any size can be imported. Progress is reported after each batch.
+    """
+    help = 'Imports recipes from an NDJSON or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Email of the recipes owner.')
+        parser.add_argument('path', help='File to import, - for stdin.')
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='File format, guessed from the extension by default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows written per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}.')
+        path = options['path']
+        file_format = options['format'] or get_format(path)
+        if file_format is None:
+            raise CommandError('Unknown file format, pass --format.')
+
+        if path == '-':
+            result = self.run(user, sys.stdin.buffer, file_format, options)
+        else:
+            try:
+                lines = open(path, 'rb')
+            except OSError as exc:
+                raise CommandError(f'Cannot read {path}: {exc.strerror}.')
+            with lines:
+                result = self.run(user, lines, file_format, options)
+
+        for error in result.errors:
+            self.stderr.write(
+                f'Line {error["line"]}: {json.dumps(error["errors"])}')
+        if result.failed > len(result.errors):
+            self.stderr.write(
+                f'{result.failed - len(result.errors)} more rows failed')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} recipes, {result.failed} failed'))
+
+    def run(self, user, lines, file_format, options):
+        """
+        Imports the lines, reporting progress after each batch.
+        """
+        return import_recipes(
+            user,
+            lines,
+            file_format,
+            batch_size=options['batch_size'],
+            progress=self.report,
+        )
+
+    def report(self, result):
+        """
+        Writes the counts of the import so far.
+        """
+        self.stdout.write(
+            f'{result.processed} rows read, {result.created} created, '
+            f'{result.failed} failed'
+        )
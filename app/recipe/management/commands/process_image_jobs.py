@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import ImageJob
+from recipe.images import process_job, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    """
+    Django command to run queued recipe image jobs.
+
+    Jobs are normally run by the web process' worker pool. This picks up
+    jobs left pending by a restart, requeues jobs processing for longer
+    than --stale-after seconds, whose worker is assumed dead, and
+    optionally retries failed ones.
+    """
+    help = 'Generates variants for pending recipe image jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also run jobs that failed before.',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=getattr(settings, 'RECIPE_IMAGE_JOB_TIMEOUT', 600),
+            help='Seconds after which a processing job is run again.',
+        )
+
+    def handle(self, *args, **options):
+        requeue_stale_jobs(options['stale_after'])
+        if options['retry_failed']:
+            ImageJob.objects.filter(status=ImageJob.FAILED).update(
+                status=ImageJob.PENDING,
+                error='',
+                updated_at=timezone.now(),
+            )
+        job_ids = ImageJob.objects.filter(
+            status=ImageJob.PENDING,
+        ).order_by('id').values_list('id', flat=True)
+
+        processed = 0
+        for job_id in job_ids.iterator():
+            process_job(job_id)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from recipe.cache import (cache_stats, get_cache, is_process_local,
+                          reset_cache_stats)
+
+
+class Command(BaseCommand):
+    """
+    Django command to show the recipe API response cache counters.
+
+    The counters are kept in RECIPE_CACHE_ALIAS, which must be shared with
+    the server processes for this command to read them.
+    """
+    help = 'Shows recipe API response cache hits and misses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after showing them.',
+        )
+
+    def handle(self, *args, **options):
+        if is_process_local(get_cache()):
+            raise CommandError(
+                'RECIPE_CACHE_ALIAS is a per-process cache, its counters '
+                'are only visible to the server process keeping them.'
+            )
+        stats = cache_stats()
+        lookups = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / lookups if lookups else 0
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f'hit_ratio={ratio:.2%}'
+        )
+        if options['reset']:
+            reset_cache_stats()
@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Keyset pagination for recipes, newest first.
+
+    Each page seeks past the last row of the previous page instead of
+    counting an offset, so deep pages cost the same as the first one.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class NameCursorPagination(RecipeCursorPagination):
+    """
+    Keyset pagination for tags and ingredients, ordered by name.
+
+    Cursors only record the name of the last row. Names are unique per
+    user, so that name alone marks where the next page starts and `-id`
+    never decides the order.
+    """
+    ordering = ('-name', '-id')
+
+
+class RecipeSearchPagination(PageNumberPagination):
+    """
+    Numbered pages for recipe search results, best matches first.
+
+    Ranks are not unique and only exist for one search, so results are
+    paged by offset rather than with a cursor.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
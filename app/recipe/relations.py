@@ -0,0 +1,123 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class BatchedManyRelatedField(serializers.ManyRelatedField):
+    """
+    Many related field that resolves all submitted values at once.
+    """
+
+    def to_internal_value(self, data):
+        """
+        Validates a list of primary keys with a single query.
+        """
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        return self.child_relation.to_internal_value_many(data)
+
+
+class UserScopedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key related field limited to the requesting user's objects.
+
+    With `many=True` the submitted IDs are looked up in one query instead
+    of one per ID, or none when the serializer context holds the objects
+    under `related_objects`, see resolve_related. Error messages are the
+    same as PrimaryKeyRelatedField.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """
+        Wraps the field in a BatchedManyRelatedField.
+        """
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def get_queryset(self):
+        """
+        Returns the queryset filtered to the requesting user, if known.
+        """
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        user = self.context.get('user', getattr(request, 'user', None))
+        if user is not None:
+            queryset = queryset.filter(user=user)
+
+        return queryset
+
+    def to_pk(self, item):
+        """
+        Returns the primary key of a submitted value.
+        """
+        if item is None:
+            self.fail('null')
+        if self.pk_field is not None:
+            item = self.pk_field.to_internal_value(item)
+        try:
+            if isinstance(item, bool):
+                raise TypeError
+            return self.get_queryset().model._meta.pk.to_python(item)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(item).__name__)
+
+    def get_objects(self, pks):
+        """
+        Returns the objects with the given primary keys, by primary key.
+        """
+        queryset = self.get_queryset()
+        resolved = self.context.get('related_objects', {})
+        if queryset.model in resolved:
+            return resolved[queryset.model]
+
+        return queryset.in_bulk(set(pks)) if pks else {}
+
+    def to_internal_value_many(self, data):
+        """
+        Returns the objects for a list of primary keys, in input order.
+        """
+        pks = [self.to_pk(item) for item in data]
+        objects = self.get_objects(pks)
+        for item, pk in zip(data, pks):
+            if pk not in objects:
+                self.fail('does_not_exist', pk_value=item)
+
+        return [objects[pk] for pk in pks]
+
+
+def resolve_related(serializer, items):
+    """
+    Looks up the related objects of a list of submitted items at once.
+
+    Returns the objects of every batched relation of serializer by model
+    and primary key, one query per relation. Passed to serializers as the
+    `related_objects` context, each item is validated without queries.
+    Invalid values are skipped here and reported by the fields.
+    """
+    resolved = {}
+    for name, field in serializer.fields.items():
+        if field.read_only or not isinstance(field, BatchedManyRelatedField):
+            continue
+        child = field.child_relation
+        pks = set()
+        for item in items:
+            values = item.get(name) if isinstance(item, dict) else None
+            if isinstance(values, str) or not hasattr(values, '__iter__'):
+                continue
+            for value in values:
+                try:
+                    pks.add(child.to_pk(value))
+                except serializers.ValidationError:
+                    pass
+        queryset = child.get_queryset()
+        resolved[queryset.model] = queryset.in_bulk(pks) if pks else {}
+
+    return resolved
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, Value, When
+from core.models import Recipe
+
+# Text search configuration, core_recipe_search_idx is built with it.
+SEARCH_CONFIG = 'english'
+# Longest accepted search string and most terms used by the fallback.
+MAX_QUERY_LENGTH = 200
+MAX_TERMS = 10
+BATCH_SIZE = 500
+
+
+def clean(text):
+    """
+    Returns text on a single line, lines separate document fields.
+    """
+    return ' '.join(text.split())
+
+
+def build_document(title, names=()):
+    """
+    Returns the searchable text of a recipe.
+
+    The title is the first line, followed by one line per tag and
+    ingredient name, so a new title can be swapped in without a query.
+    """
+    return '\n'.join([clean(title), *(clean(name) for name in names)])
+
+
+def replace_title(document, title):
+    """
+    Returns a search document with its title line replaced.
+    """
+    _, newline, names = document.partition('\n')
+
+    return clean(title) + newline + names
+
+
+def refresh_search_documents(recipe_ids):
+    """
+    Rebuilds the search documents of recipes from their current names.
+
+    Takes four queries per batch of recipes, whatever their number of
+    tags and ingredients.
+    """
+    recipe_ids = list(set(recipe_ids))
+    for start in range(0, len(recipe_ids), BATCH_SIZE):
+        batch = recipe_ids[start:start + BATCH_SIZE]
+        names = defaultdict(list)
+        for field in ('tags', 'ingredients'):
+            m2m_field = Recipe._meta.get_field(field)
+            through = m2m_field.remote_field.through
+            related = m2m_field.related_model._meta.model_name
+            links = through.objects.filter(
+                recipe_id__in=batch,
+            ).order_by(f'{related}__name').values_list(
+                'recipe_id', f'{related}__name')
+            for recipe_id, name in links:
+                names[recipe_id].append(name)
+
+        recipes = Recipe.objects.filter(pk__in=batch).only('id', 'title')
+        for recipe in recipes:
+            recipe.search_document = build_document(
+                recipe.title, names[recipe.pk])
+        Recipe.objects.bulk_update(recipes, ['search_document'])
+
+
+class SearchDocument(Func):
+    """
+    The tsvector of a recipe, as indexed by core_recipe_search_idx.
+    """
+    function = 'to_tsvector'
+    template = f"%(function)s('{SEARCH_CONFIG}'::regconfig, %(expressions)s)"
+
+
+def search_recipes(queryset, query):
+    """
+    Returns recipes matching a search string, best matches first.
+
+    PostgreSQL matches the query against the indexed tsvector of the
+    search documents and ranks by ts_rank, counting the title twice.
+    Other databases fall back to requiring every term as a substring,
+    again ranking title matches first.
+    """
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                    SearchVectorField)
+        search_query = SearchQuery(
+            query,
+            config=SEARCH_CONFIG,
+            search_type='websearch',
+        )
+        queryset = queryset.annotate(
+            document=SearchDocument(
+                'search_document',
+                output_field=SearchVectorField(),
+            ),
+        ).filter(document=search_query).annotate(
+            rank=SearchRank(F('document'), search_query) + SearchRank(
+                SearchDocument('title', output_field=SearchVectorField()),
+                search_query,
+            ),
+        )
+    else:
+        terms = query.split()[:MAX_TERMS]
+        rank = Value(0.0, output_field=FloatField())
+        for term in terms:
+            queryset = queryset.filter(search_document__icontains=term)
+            rank = rank + Case(
+                When(title__icontains=term, then=Value(1.0)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        queryset = queryset.annotate(rank=rank)
+
+    return queryset.order_by('-rank', '-id')
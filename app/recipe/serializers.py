@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from core.models import Tag, Ingredient, Recipe
+from .relations import UserScopedPrimaryKeyRelatedField
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -37,16 +38,82 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+def variant_url(serializer, recipe, name):
+    """
+    Returns the absolute URL of an image variant, or None if missing.
+    """
+    storage_name = recipe.image_variants.get(name)
+    if not storage_name:
+        return None
+    url = recipe.image.storage.url(storage_name)
+    request = serializer.context.get('request')
+
+    return request.build_absolute_uri(url) if request else url
+
+
+def variant_urls(serializer, recipe):
+    """
+    Returns the absolute URLs of all image variants by name.
+    """
+    return {
+        name: variant_url(serializer, recipe, name)
+        for name in recipe.image_variants
+    }
+
+
+class SparseFieldsetMixin:
+    """
+    Lets a serializer render a subset of its fields.
+
+    `fields` names the fields to keep and `expand` the relations to nest
+    as objects rather than IDs. Either may be None for the default.
+    """
+    # Relations that can be nested, with the serializer nesting them.
+    expandable = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if expand is not None:
+            for name, serializer_class in self.expandable.items():
+                if name not in self.fields:
+                    continue
+                if name in expand:
+                    self.fields[name] = serializer_class(
+                        many=True,
+                        read_only=True,
+                    )
+                else:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(
+                        many=True,
+                        read_only=True,
+                    )
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class RecipeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializes and deserializes recipe instances
     into representations(JSON).
     """
-    ingredients = serializers.PrimaryKeyRelatedField(
+    expandable = {
+        'ingredients': IngredientSerializer,
+        'tags': TagSerializer,
+    }
+    # Model columns read by fields that are not plain columns.
+    field_columns = {
+        'ingredients': (),
+        'tags': (),
+        'thumbnail': ('image', 'image_variants'),
+        'image_variants': ('image', 'image_variants'),
+    }
+    thumbnail = serializers.SerializerMethodField()
+    ingredients = UserScopedPrimaryKeyRelatedField(
         many=True,
         queryset=Ingredient.objects.all()
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = UserScopedPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
@@ -65,9 +132,27 @@ class RecipeSerializer(serializers.ModelSerializer):
             'cook_time_mins',
             'price',
             'url',
+            'thumbnail',
         )
         read_only_fields = ('id',)
 
+    @classmethod
+    def get_columns(cls, fields):
+        """
+        Returns the model columns needed to render the given fields.
+        """
+        columns = {'id'}
+        for name in fields:
+            columns.update(cls.field_columns.get(name, (name,)))
+
+        return columns
+
+    def get_thumbnail(self, obj):
+        """
+        Returns the URL of the small WebP variant of the recipe image.
+        """
+        return variant_url(self, obj, 'thumb_webp')
+
 
 class RecipeDetailSerializer(RecipeSerializer):
     """
@@ -82,6 +167,17 @@ class RecipeDetailSerializer(RecipeSerializer):
         many=True,
         read_only=True
     )
+    image = serializers.ImageField(read_only=True)
+    image_variants = serializers.SerializerMethodField()
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ('image', 'image_variants')
+
+    def get_image_variants(self, obj):
+        """
+        Returns the URLs of the resized copies of the recipe image.
+        """
+        return variant_urls(self, obj)
 
 
 class RecipeImageSerializer(serializers.ModelSerializer):
@@ -89,11 +185,62 @@ class RecipeImageSerializer(serializers.ModelSerializer):
     Serializes and deserializes recipe image
     instances into representations(JSON).
     """
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = (
             'id',
             'image',
+            'image_variants',
         )
         read_only_fields = ('id',)
+
+    def get_image_variants(self, obj):
+        """
+        Returns the URLs of the resized copies of the recipe image.
+        """
+        return variant_urls(self, obj)
+
+
+class NameListField(serializers.ListField):
+    """
+    List of tag or ingredient names.
+
+    Items may be names or objects with a `name`, as in exported recipes.
+    Duplicates are dropped, keeping the first occurrence.
+    """
+    child = serializers.CharField(max_length=150)
+
+    def to_internal_value(self, data):
+        """
+        Returns the distinct names of the list, in input order.
+        """
+        if isinstance(data, list):
+            data = [
+                item.get('name') if isinstance(item, dict) else item
+                for item in data
+            ]
+        names = super().to_internal_value(data)
+
+        return list(dict.fromkeys(names))
+
+
+class RecipeImportSerializer(serializers.ModelSerializer):
+    """
+    Validates imported recipes, with tags and ingredients given by name.
+    """
+    ingredients = NameListField(required=False, default=list)
+    tags = NameListField(required=False, default=list)
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'title',
+            'ingredients',
+            'tags',
+            'prep_time_mins',
+            'cook_time_mins',
+            'price',
+            'url',
+        )
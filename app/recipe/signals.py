@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (pre_save, post_save, pre_delete,
+                                      post_delete, m2m_changed)
+from django.dispatch import receiver
+from core.models import Tag, Ingredient, Recipe
+from .cache import bump_user_version, invalidate_user
+from .search import build_document, replace_title, refresh_search_documents
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+def recipe_data_changed(sender, instance, **kwargs):
+    """
+    Invalidates the owner's cache when recipe data is written.
+    """
+    invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def recipe_links_changed(sender, instance, action, **kwargs):
+    """
+    Invalidates the owner's cache when recipe links change.
+    """
+    if action.startswith('post_'):
+        invalidate_user(instance.user_id)
+
+
+@receiver(pre_save, sender=Recipe)
+def recipe_saving(sender, instance, **kwargs):
+    """
+    Writes the recipe's title into its search document.
+    """
+    if instance._state.adding and not instance.search_document:
+        instance.search_document = build_document(instance.title)
+    elif 'search_document' in instance.__dict__:
+        instance.search_document = replace_title(
+            instance.search_document, instance.title)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    """
+    Rebuilds the search document of a recipe saved without it loaded.
+    """
+    if not created and 'search_document' not in instance.__dict__:
+        refresh_search_documents([instance.pk])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def recipe_names_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """
+    Rebuilds the search documents of recipes whose links changed.
+    """
+    if not reverse:
+        if action.startswith('post_'):
+            refresh_search_documents([instance.pk])
+    elif action == 'pre_clear':
+        instance._cleared_recipe_ids = list(
+            sender.objects.filter(**{
+                f'{instance._meta.model_name}_id': instance.pk,
+            }).values_list('recipe_id', flat=True)
+        )
+    elif action == 'post_clear':
+        refresh_search_documents(instance._cleared_recipe_ids)
+    elif action in ('post_add', 'post_remove'):
+        refresh_search_documents(pk_set)
+
+
+def linked_recipe_ids(instance):
+    """
+    Returns the IDs of recipes linked to a tag or ingredient.
+    """
+    return list(instance.recipe_set.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def name_saved(sender, instance, created, **kwargs):
+    """
+    Rebuilds the search documents of recipes using a changed name.
+    """
+    if not created:
+        refresh_search_documents(linked_recipe_ids(instance))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def name_deleting(sender, instance, **kwargs):
+    """
+    Remembers the recipes of a tag or ingredient about to be deleted.
+    """
+    instance._linked_recipe_ids = linked_recipe_ids(instance)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def name_deleted(sender, instance, **kwargs):
+    """
+    Drops a deleted name from the search documents of its recipes.
+    """
+    refresh_search_documents(instance._linked_recipe_ids)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_created(sender, instance, created, **kwargs):
+    """
+    Gives new users a fresh version in case their ID was used before.
+    """
+    if created:
+        bump_user_version(instance.pk)
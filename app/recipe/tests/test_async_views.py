@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.test import AsyncClient, TransactionTestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+
+# The async views read in pool threads with their own connections, so
+# the data must be committed.
+
+
+class AsyncReadViewTests(TransactionTestCase):
+    """
+    Test the async variants of the read endpoints.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.token = Token.objects.create(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Kale')
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Kale salad',
+            prep_time_mins=5,
+            cook_time_mins=0,
+            price=4,
+        )
+        self.recipe.tags.add(tag)
+        self.recipe.ingredients.add(ingredient)
+
+    def assertSameResponse(self, url_name, *args):
+        """
+        Asserts the async variant of a view responds like the view.
+        """
+        res = self.client.get(reverse(f'recipe:{url_name}-async', args=args))
+        sync = self.client.get(reverse(f'recipe:{url_name}', args=args))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), sync.json())
+
+    def test_lists(self):
+        """
+        Test the tag, ingredient and recipe lists match the sync views.
+        """
+        for url_name in ('tag-list', 'ingredient-list', 'recipe-list'):
+            with self.subTest(url_name):
+                self.assertSameResponse(url_name)
+
+    def test_recipe_detail(self):
+        """
+        Test the recipe detail matches the sync view.
+        """
+        self.assertSameResponse('recipe-detail', self.recipe.id)
+
+    def test_read_only(self):
+        """
+        Test the async views refuse writes.
+        """
+        res = self.client.post(
+            reverse('recipe:tag-list-async'), {'name': 'Quick'})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertFalse(Tag.objects.filter(name='Quick').exists())
+
+    def test_login_required(self):
+        """
+        Test anonymous requests are refused.
+        """
+        res = APIClient().get(reverse('recipe:recipe-list-async'))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_asgi_detail(self):
+        """
+        Test the recipe detail through the ASGI handler.
+        """
+        res = await AsyncClient().get(
+            reverse('recipe:recipe-detail-async', args=[self.recipe.id]),
+            authorization=f'Token {self.token.key}',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['title'], 'Kale salad')
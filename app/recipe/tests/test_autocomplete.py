@@ -0,0 +1,166 @@
+import tempfile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Tag, Ingredient
+from recipe.autocomplete import PrefixIndex, clear_prefix_indexes
+
+TAGS_AUTOCOMPLETE_URL = reverse('recipe:tag-autocomplete')
+INGREDIENTS_AUTOCOMPLETE_URL = reverse('recipe:ingredient-autocomplete')
+# Like memcached or redis, a file based cache is shared between processes.
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='recipe-cache-'),
+    },
+}
+
+
+class PrefixIndexTests(TestCase):
+
+    def test_search_is_case_insensitive_and_bounded(self):
+        """
+        Test matches ignore case, are ordered by name and limited.
+        """
+        index = PrefixIndex([
+            (1, 'Basil'), (2, 'bacon'), (3, 'Banana'), (4, 'Apple'),
+            (5, 'BBQ'),
+        ])
+
+        self.assertEqual(
+            index.search('ba', 10),
+            [(2, 'bacon'), (3, 'Banana'), (1, 'Basil')],
+        )
+        self.assertEqual(index.search('BA', 2), [(2, 'bacon'), (3, 'Banana')])
+        self.assertEqual(index.search('c', 10), [])
+
+
+class AutocompleteAPITests(TestCase):
+    """
+    Test the tag and ingredient autocomplete endpoints.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        clear_prefix_indexes()
+        self.addCleanup(clear_prefix_indexes)
+
+    def names(self, url, q, **params):
+        """
+        Requests autocomplete matches and returns their names.
+        """
+        res = self.client.get(url, {'q': q, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [item['name'] for item in res.data]
+
+    def test_matches_prefix_for_user(self):
+        """
+        Test only the user's ingredients starting with q are returned.
+        """
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345'
+        )
+        Ingredient.objects.create(user=other, name='Salmon')
+        for name in ('Salt', 'Sage', 'salsa', 'Basil'):
+            Ingredient.objects.create(user=self.user, name=name)
+
+        self.assertEqual(
+            self.names(INGREDIENTS_AUTOCOMPLETE_URL, 'sa'),
+            ['Sage', 'salsa', 'Salt'],
+        )
+        self.assertEqual(
+            self.names(INGREDIENTS_AUTOCOMPLETE_URL, 'sa', limit=1),
+            ['Sage'],
+        )
+        res = self.client.get(INGREDIENTS_AUTOCOMPLETE_URL, {'q': 'Basil'})
+        self.assertEqual(res.data, [{
+            'id': Ingredient.objects.get(name='Basil').id,
+            'name': 'Basil',
+        }])
+
+    def test_no_index_with_process_local_cache(self):
+        """
+        Test names are read from the database without a shared cache.
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.assertEqual(self.names(TAGS_AUTOCOMPLETE_URL, 've'), ['Vegan'])
+
+        with self.assertNumQueries(1):
+            self.names(TAGS_AUTOCOMPLETE_URL, 'veg')
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_cached_index_follows_writes(self):
+        """
+        Test the in-memory index is rebuilt after names change.
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.assertEqual(self.names(TAGS_AUTOCOMPLETE_URL, 've'), ['Vegan'])
+
+        with self.assertNumQueries(0):
+            self.names(TAGS_AUTOCOMPLETE_URL, 'veg')
+        tag.name = 'Vegetarian'
+        tag.save()
+        Tag.objects.create(user=self.user, name='Vermouth')
+        self.assertEqual(
+            self.names(TAGS_AUTOCOMPLETE_URL, 've'),
+            ['Vegetarian', 'Vermouth'],
+        )
+
+    @override_settings(RECIPE_AUTOCOMPLETE_CACHE_MAX_NAMES=2)
+    def test_large_lists_use_database(self):
+        """
+        Test users with more names than the cache allows are queried.
+        """
+        for name in ('Pepper', 'Pear', 'Plum'):
+            Tag.objects.create(user=self.user, name=name)
+
+        self.assertEqual(
+            self.names(TAGS_AUTOCOMPLETE_URL, 'pe'),
+            ['Pear', 'Pepper'],
+        )
+        with self.assertNumQueries(1):
+            self.names(TAGS_AUTOCOMPLETE_URL, 'p')
+
+    @override_settings(RECIPE_AUTOCOMPLETE_CACHE_USERS=0)
+    def test_database_escapes_wildcards(self):
+        """
+        Test LIKE wildcards in q are matched literally.
+        """
+        Tag.objects.create(user=self.user, name='100% Rye')
+        Tag.objects.create(user=self.user, name='100 Calories')
+
+        self.assertEqual(
+            self.names(TAGS_AUTOCOMPLETE_URL, '100%'),
+            ['100% Rye'],
+        )
+
+    def test_empty_query_and_invalid_limit(self):
+        """
+        Test a blank q returns nothing and bad limits are rejected.
+        """
+        Tag.objects.create(user=self.user, name='Brunch')
+
+        self.assertEqual(self.names(TAGS_AUTOCOMPLETE_URL, ''), [])
+        for limit in ('0', '51', 'ten'):
+            res = self.client.get(
+                TAGS_AUTOCOMPLETE_URL,
+                {'q': 'b', 'limit': limit},
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_required(self):
+        """
+        Test autocomplete requires authentication.
+        """
+        res = APIClient().get(TAGS_AUTOCOMPLETE_URL, {'q': 'a'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,283 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+
+BULK_URL = reverse('recipe:recipe-bulk')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def recipe_payload(**params):
+    """
+    Returns a valid recipe payload.
+    """
+    payload = {
+        'title': 'Sample Recipe',
+        'prep_time_mins': 5,
+        'cook_time_mins': 15,
+        'price': '20.00',
+        'tags': [],
+        'ingredients': [],
+    }
+    payload.update(params)
+
+    return payload
+
+
+class BulkRecipeAPITests(TestCase):
+    """
+    Test the bulk recipe endpoint.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Dessert')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Sugar'
+        )
+
+    def test_bulk_create(self):
+        """
+        Test creating several recipes with their relations.
+        """
+        payload = [
+            recipe_payload(title='Pie', tags=[self.tag.id]),
+            recipe_payload(
+                title='Cake',
+                tags=[self.tag.id],
+                ingredients=[self.ingredient.id, self.ingredient.id],
+            ),
+        ]
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([r['title'] for r in res.data], ['Pie', 'Cake'])
+        cake = Recipe.objects.get(id=res.data[1]['id'], user=self.user)
+        self.assertEqual(list(cake.tags.all()), [self.tag])
+        self.assertEqual(list(cake.ingredients.all()), [self.ingredient])
+        self.assertEqual(res.data[1]['ingredients'], [self.ingredient.id])
+
+    def test_bulk_create_reports_errors_per_item(self):
+        """
+        Test invalid items are reported by position and nothing is saved.
+        """
+        payload = [
+            recipe_payload(title='Pie'),
+            recipe_payload(title=''),
+            recipe_payload(title='Tart', tags=[99999]),
+        ]
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('title', res.data[1])
+        self.assertIn('tags', res.data[2])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_requires_list(self):
+        """
+        Test a single object is rejected.
+        """
+        res = self.client.post(BULK_URL, recipe_payload(), format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_limit(self):
+        """
+        Test requests above the item limit are rejected.
+        """
+        with self.settings(RECIPE_BULK_MAX_ITEMS=2):
+            res = self.client.post(
+                BULK_URL,
+                [recipe_payload()] * 3,
+                format='json',
+            )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_invalidates_list_cache(self):
+        """
+        Test bulk created recipes show up in a previously cached list.
+        """
+        self.client.get(RECIPES_URL)
+        self.client.post(BULK_URL, [recipe_payload()], format='json')
+
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def bulk_payload(self, count):
+        """
+        Returns count recipe payloads with a tag and an ingredient each.
+        """
+        return [
+            recipe_payload(
+                title=f'Recipe {i}',
+                tags=[self.tag.id],
+                ingredients=[self.ingredient.id],
+            )
+            for i in range(count)
+        ]
+
+    def count_selects(self, method, payload):
+        """
+        Sends payload to the bulk endpoint and returns the SELECTs run.
+
+        SQLite inserts recipes one row at a time, so only reads count.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res = getattr(self.client, method)(
+                BULK_URL, payload, format='json')
+        self.assertLess(res.status_code, 300)
+
+        return sum(
+            query['sql'].startswith('SELECT') for query in queries
+        )
+
+    def test_bulk_create_query_count(self):
+        """
+        Test validation does not query once per item.
+        """
+        self.assertEqual(
+            self.count_selects('post', self.bulk_payload(2)),
+            self.count_selects('post', self.bulk_payload(20)),
+        )
+
+    def test_bulk_update_query_count(self):
+        """
+        Test validating updates does not query once per item.
+        """
+        res = self.client.post(BULK_URL, self.bulk_payload(20), format='json')
+        payload = [{'id': r['id'], 'tags': [self.tag.id]} for r in res.data]
+
+        self.assertEqual(
+            self.count_selects('patch', payload[:2]),
+            self.count_selects('patch', payload),
+        )
+
+    def test_bulk_update(self):
+        """
+        Test partially updating several recipes.
+        """
+        pie = Recipe.objects.create(
+            user=self.user,
+            title='Pie',
+            prep_time_mins=5,
+            cook_time_mins=40,
+            price=5
+        )
+        pie.tags.add(self.tag)
+        cake = Recipe.objects.create(
+            user=self.user,
+            title='Cake',
+            prep_time_mins=5,
+            cook_time_mins=30,
+            price=6
+        )
+        payload = [
+            {'id': pie.id, 'tags': []},
+            {'id': cake.id, 'price': '7.50', 'tags': [self.tag.id]},
+        ]
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        pie.refresh_from_db()
+        cake.refresh_from_db()
+        self.assertEqual(pie.title, 'Pie')
+        self.assertEqual(pie.tags.count(), 0)
+        self.assertEqual(cake.price, Decimal('7.50'))
+        self.assertEqual(list(cake.tags.all()), [self.tag])
+
+    def test_bulk_update_repeated_id(self):
+        """
+        Test listing a recipe twice is reported and nothing is saved.
+        """
+        pie = Recipe.objects.create(
+            user=self.user,
+            title='Pie',
+            prep_time_mins=5,
+            cook_time_mins=40,
+            price=5
+        )
+        payload = [
+            {'id': pie.id, 'tags': [self.tag.id]},
+            {'id': pie.id, 'title': 'Tart', 'tags': [self.tag.id]},
+        ]
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        pie.refresh_from_db()
+        self.assertEqual(pie.title, 'Pie')
+        self.assertEqual(pie.tags.count(), 0)
+
+    def test_bulk_update_unknown_id(self):
+        """
+        Test updating another user's recipe is reported as not found.
+        """
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        recipe = Recipe.objects.create(
+            user=other,
+            title='Secret',
+            prep_time_mins=5,
+            cook_time_mins=5,
+            price=1
+        )
+        res = self.client.patch(
+            BULK_URL,
+            [{'id': recipe.id, 'title': 'Mine'}],
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[0])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'Secret')
+
+    def test_bulk_delete(self):
+        """
+        Test deleting several recipes only deletes the user's own.
+        """
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        own = [
+            Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                prep_time_mins=5,
+                cook_time_mins=5,
+                price=1
+            )
+            for i in range(3)
+        ]
+        foreign = Recipe.objects.create(
+            user=other,
+            title='Secret',
+            prep_time_mins=5,
+            cook_time_mins=5,
+            price=1
+        )
+        ids = [own[0].id, own[1].id, foreign.id]
+        res = self.client.delete(BULK_URL, ids, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'deleted': 2})
+        self.assertEqual(
+            list(Recipe.objects.values_list('id', flat=True).order_by('id')),
+            [own[2].id, foreign.id],
+        )
@@ -0,0 +1,180 @@
+from io import StringIO
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag
+from recipe import cache as recipe_cache
+from recipe.cache import get_cache, cache_stats
+from recipe.checks import check_list_cache
+from recipe.tests.test_autocomplete import SHARED_CACHES
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def create_sample_recipe(user, **params):
+    """
+    Creates a sample recipe.
+    """
+    content = {
+        'title': 'Sample Recipe',
+        'prep_time_mins': 5,
+        'cook_time_mins': 15,
+        'price': 20,
+    }
+    content.update(params)
+
+    return Recipe.objects.create(user=user, **content)
+
+
+@override_settings(RECIPE_CACHE_LISTS=True)
+class ResponseCacheTests(TestCase):
+    """
+    Test the per-user list response cache.
+    """
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_list_is_served_from_cache(self):
+        """
+        Test an unchanged list is served without querying the database.
+        """
+        create_sample_recipe(user=self.user)
+        first = self.client.get(RECIPES_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+
+    def test_query_string_is_part_of_key(self):
+        """
+        Test different query strings are cached separately.
+        """
+        self.client.get(TAGS_URL)
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+        self.assertEqual(res['X-Cache'], 'MISS')
+
+    def test_create_invalidates(self):
+        """
+        Test creating a tag invalidates the cached tag list.
+        """
+        self.client.get(TAGS_URL)
+        Tag.objects.create(user=self.user, name='Brunch')
+
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_delete_invalidates(self):
+        """
+        Test deleting a recipe invalidates the cached recipe list.
+        """
+        recipe = create_sample_recipe(user=self.user)
+        self.client.get(RECIPES_URL)
+        recipe.delete()
+
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'], [])
+
+    def test_m2m_change_invalidates(self):
+        """
+        Test linking a tag to a recipe invalidates the cached lists.
+        """
+        recipe = create_sample_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Brunch')
+        self.client.get(RECIPES_URL)
+        recipe.tags.add(tag)
+
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'][0]['tags'], [tag.id])
+
+    def test_other_users_writes_keep_cache(self):
+        """
+        Test another user's writes neither invalidate nor leak in.
+        """
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        self.client.get(TAGS_URL)
+        Tag.objects.create(user=other, name='Private')
+
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res['X-Cache'], 'HIT')
+        self.assertEqual(res.data['results'], [])
+
+    @override_settings(CACHES=SHARED_CACHES, RECIPE_CACHE_LISTS=None)
+    def test_stats(self):
+        """
+        Test hits and misses are counted and readable from elsewhere.
+        """
+        get_cache().clear()
+        self.client.get(TAGS_URL)
+        self.client.get(TAGS_URL)
+        self.client.get(TAGS_URL)
+
+        # A separate cache instance stands in for the command's process.
+        other = caches.create_connection('default')
+        with patch.object(recipe_cache, 'get_cache', return_value=other):
+            self.assertEqual(cache_stats(), {'hits': 2, 'misses': 1})
+            out = StringIO()
+            call_command('recipe_cache_stats', '--reset', stdout=out)
+        self.assertIn('hits=2 misses=1', out.getvalue())
+        self.assertEqual(cache_stats(), {'hits': 0, 'misses': 0})
+
+
+class ProcessLocalCacheTests(TestCase):
+    """
+    Test list caching is off by default with a per-process cache.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lists_not_cached(self):
+        """
+        Test lists are built on every request.
+        """
+        self.client.get(TAGS_URL)
+        res = self.client.get(TAGS_URL)
+
+        self.assertNotIn('X-Cache', res)
+        self.assertEqual(cache_stats(), {'hits': 0, 'misses': 0})
+
+    def test_stats_command_requires_shared_cache(self):
+        """
+        Test the counters are not reported from a per-process cache.
+        """
+        with self.assertRaises(CommandError):
+            call_command('recipe_cache_stats', stdout=StringIO())
+
+    def test_check_warns_about_forced_list_cache(self):
+        """
+        Test forcing list caching on with a per-process cache is flagged.
+        """
+        with self.settings(RECIPE_CACHE_LISTS=True):
+            warnings = check_list_cache(None)
+        self.assertEqual([w.id for w in warnings], ['recipe.W002'])
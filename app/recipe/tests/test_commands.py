@@ -0,0 +1,120 @@
+from io import StringIO
+from django.test import TestCase, TransactionTestCase
+from django.core.management import call_command
+from core.models import Recipe
+
+
+class BenchmarkCommandTests(TestCase):
+
+    def run_scenario(self, scenario):
+        """
+        Runs a benchmark scenario on a tiny data set and returns its output.
+        """
+        out = StringIO()
+        call_command(
+            'benchmark_recipes',
+            scenario,
+            '--recipes', '20',
+            '--repeat', '1',
+            stdout=out,
+        )
+
+        return out.getvalue()
+
+    def test_benchmark_rolls_back(self):
+        """
+        Test benchmark data is not left in the database.
+        """
+        self.run_scenario('assigned_only')
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_benchmark_assigned_only(self):
+        """
+        Test the assigned_only benchmark reports both variants.
+        """
+        output = self.run_scenario('assigned_only')
+        self.assertIn('join + distinct', output)
+        self.assertIn('exists', output)
+
+    def test_benchmark_filter(self):
+        """
+        Test the filter benchmark reports each match mode.
+        """
+        output = self.run_scenario('filter')
+        self.assertIn('match=any', output)
+        self.assertIn('match=all', output)
+
+    def test_benchmark_bulk(self):
+        """
+        Test the bulk benchmark reports both write paths.
+        """
+        output = self.run_scenario('bulk')
+        self.assertIn('single POST x 20', output)
+        self.assertIn('bulk POST', output)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_benchmark_search(self):
+        """
+        Test the search benchmark reports the scan and the search.
+        """
+        output = self.run_scenario('search')
+        self.assertIn('icontains + distinct', output)
+        self.assertIn('search', output.split('distinct', 1)[1])
+
+    def test_benchmark_autocomplete(self):
+        """
+        Test the autocomplete benchmark reports both lookups.
+        """
+        output = self.run_scenario('autocomplete')
+        self.assertIn('database', output)
+        self.assertIn('index lookup', output)
+
+    def test_benchmark_serialize(self):
+        """
+        Test the serialize benchmark reports both list paths.
+        """
+        output = self.run_scenario('serialize')
+        self.assertIn('ModelSerializer', output)
+        self.assertIn('row serializer', output)
+
+    def test_benchmark_json(self):
+        """
+        Test the JSON benchmark reports rendering and parsing.
+        """
+        output = self.run_scenario('json')
+        self.assertIn('render fast', output)
+        self.assertIn('parse stdlib', output)
+
+    def test_benchmark_export(self):
+        """
+        Test the export benchmark reports both response shapes.
+        """
+        output = self.run_scenario('export')
+        self.assertIn('response (', output)
+        self.assertIn('stream (', output)
+
+
+class BenchmarkAsgiCommandTests(TransactionTestCase):
+    """
+    Test the benchmark_asgi command, whose client threads read the
+    committed seed data.
+    """
+
+    def test_benchmark_asgi(self):
+        """
+        Test every dispatch mode is measured and the data removed.
+        """
+        out = StringIO()
+
+        call_command(
+            'benchmark_asgi',
+            '--recipes', '5',
+            '--requests', '10',
+            '--concurrency', '1,2',
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        for name in ('wsgi sync', 'asgi sync', 'asgi async'):
+            self.assertEqual(output.count(name), 2)
+        self.assertFalse(Recipe.objects.exists())
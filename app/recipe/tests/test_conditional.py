@@ -0,0 +1,135 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag
+from recipe.checks import check_etag_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+def recipe_detail_url(recipe_id):
+    """
+    Recipe detail URL.
+    """
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+@override_settings(RECIPE_ETAGS=True)
+class ConditionalGetTests(TestCase):
+    """
+    Test ETag and If-None-Match handling on the recipe API.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Pancakes',
+            prep_time_mins=5,
+            cook_time_mins=10,
+            price=3.00
+        )
+
+    def test_not_modified_without_queries(self):
+        """
+        Test a matching ETag gets 304 without running any query.
+        """
+        for url in (RECIPES_URL, TAGS_URL, INGREDIENTS_URL,
+                    recipe_detail_url(self.recipe.id)):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(0):
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(res['ETag'], etag)
+            self.assertEqual(res.content, b'')
+
+    def test_etag_is_strong_and_private(self):
+        """
+        Test ETags are strong and responses must be revalidated.
+        """
+        res = self.client.get(RECIPES_URL)
+        self.assertTrue(res['ETag'].startswith('"'))
+        self.assertIn('private', res['Cache-Control'])
+        self.assertIn('no-cache', res['Cache-Control'])
+        self.assertIn('Authorization', res['Vary'])
+
+    def test_write_changes_etag(self):
+        """
+        Test a write makes the old ETag stale.
+        """
+        etag = self.client.get(TAGS_URL)['ETag']
+        Tag.objects.create(user=self.user, name='Breakfast')
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_etag_differs_per_url(self):
+        """
+        Test different query strings do not share an ETag.
+        """
+        etag = self.client.get(RECIPES_URL)['ETag']
+        res = self.client.get(
+            RECIPES_URL,
+            {'page_size': 1},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_etag_differs_per_user(self):
+        """
+        Test another user's ETag is not honoured.
+        """
+        etag = self.client.get(RECIPES_URL)['ETag']
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        self.client.force_authenticate(other)
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
+
+
+class ETagSettingTests(TestCase):
+    """
+    Test ETags are only sent when the version counter is shared.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_no_etags_with_process_local_cache(self):
+        """
+        Test the default per-process cache disables ETags.
+        """
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', res)
+
+    def test_check_warns_about_forced_etags(self):
+        """
+        Test forcing ETags on with a per-process cache is flagged.
+        """
+        self.assertEqual(check_etag_cache(None), [])
+        with self.settings(RECIPE_ETAGS=True):
+            warnings = check_etag_cache(None)
+        self.assertEqual([w.id for w in warnings], ['recipe.W001'])
@@ -0,0 +1,160 @@
+import json
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+def read_lines(res):
+    """
+    Returns the decoded lines of a streamed NDJSON response.
+    """
+    content = b''.join(res.streaming_content)
+
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class PublicExportTests(TestCase):
+    """
+    Test unauthenticated export requests.
+    """
+
+    def test_auth_required(self):
+        """
+        Test the error is rendered for NDJSON clients.
+        """
+        res = APIClient().get(
+            EXPORT_URL,
+            HTTP_ACCEPT='application/x-ndjson',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(res.content.endswith(b'}\n'))
+
+
+class PrivateExportTests(TestCase):
+    """
+    Test the streaming recipe export.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Kale',
+        )
+        self.recipes = []
+        for i in range(5):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                prep_time_mins=i,
+                cook_time_mins=10,
+                price='7.50',
+            )
+            if i % 2:
+                recipe.tags.add(self.tag)
+            recipe.ingredients.add(self.ingredient)
+            self.recipes.append(recipe)
+
+    def test_streams_recipes(self):
+        """
+        Test every recipe is a line with its relations nested.
+        """
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertIn('recipes.ndjson', res['Content-Disposition'])
+        lines = read_lines(res)
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[0], {
+            'id': self.recipes[4].id,
+            'title': 'Recipe 4',
+            'ingredients': [{'id': self.ingredient.id, 'name': 'Kale'}],
+            'tags': [],
+            'prep_time_mins': 4,
+            'cook_time_mins': 10,
+            'price': '7.50',
+            'url': '',
+        })
+        self.assertEqual(
+            lines[1]['tags'],
+            [{'id': self.tag.id, 'name': 'Vegan'}],
+        )
+
+    def test_only_own_recipes(self):
+        """
+        Test recipes of other users are not exported.
+        """
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        Recipe.objects.create(
+            user=other,
+            title='Other',
+            prep_time_mins=1,
+            cook_time_mins=1,
+            price='1.00',
+        )
+
+        lines = read_lines(self.client.get(EXPORT_URL))
+
+        self.assertNotIn('Other', {line['title'] for line in lines})
+
+    def test_filters(self):
+        """
+        Test the list filters narrow the export.
+        """
+        lines = read_lines(self.client.get(EXPORT_URL, {'tags': self.tag.id}))
+
+        self.assertEqual(
+            [line['title'] for line in lines],
+            ['Recipe 3', 'Recipe 1'],
+        )
+
+    def test_relations_ordered_like_api(self):
+        """
+        Test relations added out of ID order are exported by ID.
+        """
+        recipe = self.recipes[0]
+        tags = [Tag.objects.create(user=self.user, name=name)
+                for name in ('Quick', 'Dinner')]
+        recipe.tags.clear()
+        for tag in reversed([self.tag] + tags):
+            recipe.tags.add(tag)
+
+        lines = read_lines(self.client.get(EXPORT_URL))
+        exported = next(line for line in lines if line['id'] == recipe.id)
+        detail = self.client.get(
+            reverse('recipe:recipe-detail', args=[recipe.id]))
+
+        self.assertEqual(
+            [tag['id'] for tag in exported['tags']],
+            [tag['id'] for tag in detail.data['tags']],
+        )
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_relations_fetched_per_chunk(self):
+        """
+        Test relations are read once per chunk, not per recipe.
+        """
+        res = self.client.get(EXPORT_URL)
+
+        # The rows, then tags and ingredients for each of three chunks.
+        with self.assertNumQueries(7):
+            lines = read_lines(res)
+        self.assertEqual(len(lines), 5)
@@ -0,0 +1,125 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+from recipe.fastpath import RowSerializer
+from recipe.serializers import RecipeSerializer, TagSerializer
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+class FastListTests(TestCase):
+    """
+    Test list responses built from rows match the serializers exactly.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Dinner', 'Vegan', 'Quick')
+        ]
+        ingredient = Ingredient.objects.create(user=self.user, name='Kale')
+        for i in range(4):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                prep_time_mins=i,
+                cook_time_mins=10,
+                price='7.5',
+                url='https://example.com/r' if i % 2 else '',
+                image_variants={'thumb_webp': f'uploads/t{i}.webp'}
+                if i % 2 else {},
+            )
+            recipe.tags.add(*tags[:i])
+            recipe.ingredients.add(ingredient)
+
+    def assertSameContent(self, url, params=None):
+        """
+        Asserts the fast and serializer list responses are identical.
+        """
+        fast = self.client.get(url, params)
+        cache.clear()
+        with self.settings(RECIPE_FAST_LIST=False):
+            slow = self.client.get(url, params)
+
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_recipe_list_identical(self):
+        """
+        Test recipe lists render byte for byte like RecipeSerializer.
+        """
+        self.assertSameContent(RECIPES_URL)
+        self.assertSameContent(RECIPES_URL, {'page_size': 2})
+        self.assertSameContent(RECIPES_URL, {'fields': 'id,price,thumbnail'})
+        self.assertSameContent(RECIPES_URL, {'search': 'recipe'})
+
+    def test_relations_added_out_of_id_order(self):
+        """
+        Test related IDs are listed in the same order by both paths.
+        """
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Shuffled',
+            prep_time_mins=1,
+            cook_time_mins=1,
+            price='1',
+        )
+        tags = list(Tag.objects.filter(user=self.user).order_by('id'))
+        for tag in reversed(tags):
+            recipe.tags.add(tag)
+
+        self.assertSameContent(RECIPES_URL)
+        res = self.client.get(RECIPES_URL, {'fields': 'id,tags'})
+        listed = next(r for r in res.json()['results'] if r['id'] == recipe.id)
+        self.assertEqual(listed['tags'], [tag.id for tag in tags])
+
+    def test_tag_and_ingredient_lists_identical(self):
+        """
+        Test tag and ingredient lists render like their serializers.
+        """
+        self.assertSameContent(TAGS_URL)
+        self.assertSameContent(TAGS_URL, {'assigned_only': 1})
+        self.assertSameContent(INGREDIENTS_URL)
+
+    def test_expanded_list_uses_serializer(self):
+        """
+        Test nested relations are still rendered by the serializer.
+        """
+        res = self.client.get(RECIPES_URL, {'expand': 'tags'})
+
+        names = {tag['name'] for tag in res.data['results'][0]['tags']}
+        self.assertEqual(names, {'Dinner', 'Vegan', 'Quick'})
+
+    def test_row_serializer_compiles_mappers(self):
+        """
+        Test plain columns are copied and other fields converted.
+        """
+        row_serializer = RowSerializer(RecipeSerializer)
+
+        self.assertEqual(row_serializer.relations, ['ingredients', 'tags'])
+        self.assertIn(('title', 'title', None), row_serializer.mappers)
+        self.assertNotIn('image', row_serializer.columns)
+        self.assertEqual(
+            RowSerializer(TagSerializer).columns,
+            ['id', 'name'],
+        )
+
+    @override_settings(RECIPE_FAST_LIST=True)
+    def test_fast_list_query_count(self):
+        """
+        Test the recipe list reads rows and each relation in one query.
+        """
+        with self.assertNumQueries(3):
+            self.client.get(RECIPES_URL)
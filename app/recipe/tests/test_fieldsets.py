@@ -0,0 +1,141 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def recipe_detail_url(recipe_id):
+    """
+    Recipe detail URL.
+    """
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class SparseFieldsetTests(TestCase):
+    """
+    Test the `fields` and `expand` query parameters of recipes.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Dinner')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Garlic'
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Pasta',
+            prep_time_mins=5,
+            cook_time_mins=10,
+            price=5.00
+        )
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(self.ingredient)
+
+    def test_list_selected_fields(self):
+        """
+        Test only the requested fields and columns are loaded.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.recipe.id, 'title': 'Pasta'}],
+        )
+        # No prefetch of the unrequested relations.
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('price', queries[0]['sql'])
+
+    def test_list_thumbnail_field(self):
+        """
+        Test computed fields load the columns they depend on.
+        """
+        res = self.client.get(RECIPES_URL, {'fields': 'id,thumbnail'})
+
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.recipe.id, 'thumbnail': None}],
+        )
+
+    def test_list_expand_relations(self):
+        """
+        Test expanded relations are nested, others stay IDs.
+        """
+        res = self.client.get(
+            RECIPES_URL,
+            {'fields': 'id,tags,ingredients', 'expand': 'tags'},
+        )
+
+        self.assertEqual(res.data['results'], [{
+            'id': self.recipe.id,
+            'tags': [{'id': self.tag.id, 'name': 'Dinner'}],
+            'ingredients': [self.ingredient.id],
+        }])
+
+    def test_detail_fields_and_expand(self):
+        """
+        Test detail views nest relations unless expand says otherwise.
+        """
+        url = recipe_detail_url(self.recipe.id)
+        res = self.client.get(url, {'fields': 'title,tags'})
+        self.assertEqual(res.data, {
+            'title': 'Pasta',
+            'tags': [{'id': self.tag.id, 'name': 'Dinner'}],
+        })
+
+        res = self.client.get(url, {'fields': 'tags', 'expand': ''})
+        self.assertEqual(res.data, {'tags': [self.tag.id]})
+
+    def test_default_representation_unchanged(self):
+        """
+        Test responses without parameters keep every field.
+        """
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res.data['results'][0]['tags'], [self.tag.id])
+        self.assertIn('price', res.data['results'][0])
+
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+        self.assertIn('image_variants', res.data)
+        self.assertEqual(res.data['ingredients'][0]['name'], 'Garlic')
+
+    def test_unknown_fields_rejected(self):
+        """
+        Test unknown fields and relations are a bad request.
+        """
+        res = self.client.get(RECIPES_URL, {'fields': 'id,secret'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('secret', str(res.data['fields']))
+
+        res = self.client.get(RECIPES_URL, {'expand': 'user'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Detail-only fields are not part of the list representation.
+        res = self.client.get(RECIPES_URL, {'fields': 'image_variants'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_ignores_fields(self):
+        """
+        Test write responses always carry the full representation.
+        """
+        res = self.client.patch(
+            recipe_detail_url(self.recipe.id) + '?fields=id',
+            {'title': 'Penne'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'Penne')
+        self.assertIn('tags', res.data)
@@ -0,0 +1,236 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from PIL import Image
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, ImageJob
+from recipe.images import enqueue_image_job, process_job, run_job
+
+
+def recipe_image_url(recipe_id):
+    """
+    Recipe image URL.
+    """
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def recipe_detail_url(recipe_id):
+    """
+    Recipe detail URL.
+    """
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def image_upload(size=(1200, 900), image_format='JPEG', suffix='.jpg'):
+    """
+    Returns an open temporary image file for multipart uploads.
+    """
+    ntf = tempfile.NamedTemporaryFile(suffix=suffix)
+    Image.new('RGB', size, color=(200, 80, 40)).save(ntf, format=image_format)
+    ntf.seek(0)
+
+    return ntf
+
+
+@override_settings(
+    RECIPE_IMAGE_PROCESSING='sync',
+    RECIPE_IMAGE_VARIANTS={'thumb': 100, 'medium': 400},
+)
+class ImageVariantTests(TestCase):
+    """
+    Test generating resized variants of recipe images.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Tacos',
+            prep_time_mins=10,
+            cook_time_mins=10,
+            price=6.00
+        )
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        for name in self.recipe.image_variants.values():
+            self.recipe.image.storage.delete(name)
+        self.recipe.image.delete()
+
+    def upload(self, **kwargs):
+        """
+        Uploads an image and runs the queued job.
+        """
+        with image_upload(**kwargs) as ntf:
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(
+                    recipe_image_url(self.recipe.id),
+                    {'image': ntf},
+                    format='multipart',
+                )
+        self.recipe.refresh_from_db()
+
+        return res
+
+    def test_upload_queues_job(self):
+        """
+        Test the upload responds before variants exist and queues a job.
+        """
+        with image_upload() as ntf:
+            res = self.client.post(
+                recipe_image_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['image_variants'], {})
+        job = ImageJob.objects.get(recipe=self.recipe)
+        self.assertEqual(job.status, ImageJob.PENDING)
+
+    def test_variants_generated(self):
+        """
+        Test every size is written as WebP and JPEG within its bounds.
+        """
+        self.upload()
+        variants = self.recipe.image_variants
+        self.assertEqual(
+            sorted(variants),
+            ['medium_jpeg', 'medium_webp', 'thumb_jpeg', 'thumb_webp'],
+        )
+        storage = self.recipe.image.storage
+        with Image.open(storage.path(variants['thumb_webp'])) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (100, 75))
+        with Image.open(storage.path(variants['medium_jpeg'])) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (400, 300))
+        self.assertLess(
+            os.path.getsize(storage.path(variants['thumb_webp'])),
+            os.path.getsize(self.recipe.image.path),
+        )
+        job = ImageJob.objects.get(recipe=self.recipe)
+        self.assertEqual(job.status, ImageJob.DONE)
+
+    def test_serializers_expose_variant_urls(self):
+        """
+        Test the list and detail responses link the variants.
+        """
+        self.upload()
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+        thumb = self.recipe.image_variants['thumb_webp']
+        self.assertTrue(res.data['image_variants']['thumb_webp'].endswith(
+            thumb))
+        self.assertTrue(res.data['image'].startswith('http'))
+
+        res = self.client.get(reverse('recipe:recipe-list'))
+        self.assertTrue(res.data['results'][0]['thumbnail'].endswith(thumb))
+
+    def test_new_upload_replaces_variants(self):
+        """
+        Test uploading again releases the previous files for collection.
+        """
+        self.upload()
+        storage = self.recipe.image.storage
+        old_variants = self.recipe.image_variants
+        old_image = self.recipe.image.name
+
+        self.upload(size=(300, 300), image_format='PNG', suffix='.png')
+        call_command('gc_media', grace=-1, stdout=StringIO())
+        self.assertFalse(storage.exists(old_image))
+        for name in old_variants.values():
+            self.assertFalse(storage.exists(name))
+        for name in self.recipe.image_variants.values():
+            self.assertTrue(storage.exists(name))
+
+    def test_superseded_job_is_skipped(self):
+        """
+        Test a job for an image that was replaced does no work.
+        """
+        self.recipe.image.save('first.jpg', ContentFile(b'not an image'))
+        job = ImageJob.objects.create(recipe=self.recipe, image='old.jpg')
+
+        process_job(job.id)
+        job.refresh_from_db()
+        self.recipe.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.DONE)
+        self.assertEqual(self.recipe.image_variants, {})
+
+    def test_invalid_image_fails_job(self):
+        """
+        Test an unreadable image marks the job as failed.
+        """
+        self.recipe.image.save('broken.jpg', ContentFile(b'not an image'))
+        job = ImageJob.objects.create(
+            recipe=self.recipe,
+            image=self.recipe.image.name,
+        )
+
+        with self.assertLogs('recipe.images', level='ERROR'):
+            process_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.FAILED)
+        self.assertTrue(job.error)
+
+    def test_command_runs_pending_jobs(self):
+        """
+        Test pending jobs left behind are processed by the command.
+        """
+        with image_upload() as ntf:
+            self.recipe.image.save('left.jpg', ContentFile(ntf.read()))
+        enqueue_image_job(self.recipe)
+
+        out = StringIO()
+        call_command('process_image_jobs', stdout=out)
+        self.recipe.refresh_from_db()
+        self.assertIn('Processed 1 jobs', out.getvalue())
+        self.assertEqual(len(self.recipe.image_variants), 4)
+
+    def test_command_requeues_stale_jobs(self):
+        """
+        Test jobs left processing past the timeout are run again.
+        """
+        with image_upload() as ntf:
+            self.recipe.image.save('stuck.jpg', ContentFile(ntf.read()))
+        stale = ImageJob.objects.create(
+            recipe=self.recipe,
+            image=self.recipe.image.name,
+            status=ImageJob.PROCESSING,
+        )
+        recent = ImageJob.objects.create(
+            recipe=self.recipe,
+            image=self.recipe.image.name,
+            status=ImageJob.PROCESSING,
+        )
+        ImageJob.objects.filter(pk=stale.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=120))
+
+        call_command('process_image_jobs', stale_after=60, stdout=StringIO())
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.recipe.refresh_from_db()
+        self.assertEqual(stale.status, ImageJob.DONE)
+        self.assertEqual(recent.status, ImageJob.PROCESSING)
+        self.assertEqual(len(self.recipe.image_variants), 4)
+
+    def test_worker_logs_errors(self):
+        """
+        Test errors outside the render step are logged by the worker.
+        """
+        with patch('recipe.images.process_job', side_effect=RuntimeError):
+            with self.assertLogs('recipe.images', level='ERROR'):
+                run_job(1)
@@ -0,0 +1,297 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+from recipe.importer import import_recipes
+
+IMPORT_URL = reverse('recipe:recipe-import')
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+def ndjson(*items):
+    """
+    Returns items encoded as NDJSON bytes.
+    """
+    return b''.join(json.dumps(item).encode() + b'\n' for item in items)
+
+
+def sample_item(**params):
+    """
+    Returns an importable recipe.
+    """
+    item = {
+        'title': 'Soup',
+        'prep_time_mins': 5,
+        'cook_time_mins': 20,
+        'price': '4.50',
+    }
+    item.update(params)
+
+    return item
+
+
+class ImportApiTests(TestCase):
+    """
+    Test importing recipes through the API.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, body, content_type='application/x-ndjson'):
+        """
+        Posts a raw import body.
+        """
+        return self.client.generic(
+            'POST', IMPORT_URL, body, content_type=content_type)
+
+    def test_auth_required(self):
+        """
+        Test anonymous imports are refused.
+        """
+        res = APIClient().post(IMPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_import_ndjson(self):
+        """
+        Test recipes are created with their names resolved or created.
+        """
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        Ingredient.objects.create(user=other, name='Kale')
+
+        res = self.post(ndjson(
+            sample_item(tags=['Vegan', 'Quick'], ingredients=['Kale']),
+            sample_item(title='Stew', tags=[{'id': 1, 'name': 'Quick'}]),
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['tags_created'], 1)
+        self.assertEqual(res.data['ingredients_created'], 1)
+        soup = Recipe.objects.get(user=self.user, title='Soup')
+        self.assertIn(vegan, soup.tags.all())
+        self.assertEqual(
+            sorted(soup.tags.values_list('name', flat=True)),
+            ['Quick', 'Vegan'],
+        )
+        kale = soup.ingredients.get()
+        self.assertEqual(kale.user, self.user)
+        stew = Recipe.objects.get(user=self.user, title='Stew')
+        self.assertEqual(list(stew.tags.all()), list(soup.tags.filter(
+            name='Quick')))
+        self.assertEqual(Tag.objects.filter(name='Quick').count(), 1)
+
+    def test_invalid_rows_reported(self):
+        """
+        Test invalid rows are reported by line and the others imported.
+        """
+        body = ndjson(sample_item()) + b'{"title": \n\n' + ndjson(
+            sample_item(price='cheap'),
+            sample_item(title='Stew'),
+        )
+
+        res = self.post(body)
+
+        self.assertEqual(res.data['processed'], 4)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['failed'], 2)
+        self.assertEqual(res.data['errors'][0]['line'], 2)
+        self.assertEqual(res.data['errors'][1]['line'], 4)
+        self.assertIn('price', res.data['errors'][1]['errors'])
+
+    def test_import_csv(self):
+        """
+        Test CSV rows are imported, with names separated by semicolons.
+        """
+        body = (
+            '﻿title,prep_time_mins,cook_time_mins,price,tags\r\n'
+            'Crème brûlée,10,40,6.00,Dessert; French\r\n'
+            'Toast,1,2,1.00,\r\n'
+        ).encode()
+
+        res = self.post(body, 'text/csv; charset=utf-8')
+
+        self.assertEqual(res.data['created'], 2)
+        recipe = Recipe.objects.get(title='Crème brûlée')
+        self.assertEqual(
+            sorted(recipe.tags.values_list('name', flat=True)),
+            ['Dessert', 'French'],
+        )
+        self.assertFalse(Recipe.objects.get(title='Toast').tags.exists())
+
+    def test_import_multipart_file(self):
+        """
+        Test the file can be uploaded as a form field.
+        """
+        upload = SimpleUploadedFile(
+            'recipes.ndjson',
+            ndjson(sample_item()),
+            content_type='application/octet-stream',
+        )
+
+        res = self.client.post(IMPORT_URL, {'file': upload})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 1)
+
+    def test_unsupported_format(self):
+        """
+        Test other content types are refused.
+        """
+        res = self.post(b'<recipes/>', 'application/xml')
+
+        self.assertEqual(
+            res.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_export_round_trip(self):
+        """
+        Test an export imports into an equal collection.
+        """
+        self.post(ndjson(
+            sample_item(tags=['Vegan'], ingredients=['Kale', 'Salt']),
+        ))
+        exported = b''.join(self.client.get(EXPORT_URL).streaming_content)
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        self.client.force_authenticate(other)
+
+        self.post(exported)
+
+        recipe = Recipe.objects.get(user=other)
+        self.assertEqual(
+            sorted(recipe.ingredients.values_list('name', flat=True)),
+            ['Kale', 'Salt'],
+        )
+        self.assertEqual(recipe.tags.get().user, other)
+
+
+class ImporterTests(TestCase):
+    """
+    Test the batched importer.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+
+    def test_batches_and_progress(self):
+        """
+        Test rows are written in fixed-size batches, reporting each one.
+        """
+        lines = ndjson(*[
+            sample_item(title=f'Recipe {i}', tags=[f'Tag {i % 2}'])
+            for i in range(5)
+        ]).splitlines(keepends=True)
+        progress = []
+
+        result = import_recipes(
+            self.user,
+            iter(lines),
+            'ndjson',
+            batch_size=2,
+            progress=lambda result: progress.append(result.created),
+        )
+
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(result.created, 5)
+        self.assertEqual(result.names_created['tags'], 2)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_errors_capped(self):
+        """
+        Test only the first errors are kept.
+        """
+        lines = [b'nope\n'] * 5
+
+        result = import_recipes(self.user, lines, 'ndjson', max_errors=2)
+
+        self.assertEqual(result.failed, 5)
+        self.assertEqual(len(result.errors), 2)
+
+    @override_settings(RECIPE_IMPORT_BATCH_SIZE=100)
+    def test_batch_query_count(self):
+        """
+        Test names are resolved with a fixed number of queries per batch.
+        """
+        def queries(count):
+            lines = ndjson(*[
+                sample_item(
+                    title=f'Recipe {i}',
+                    tags=[f'Tag {count} {i}'],
+                    ingredients=[f'Ingredient {count} {i}'],
+                )
+                for i in range(count)
+            ]).splitlines()
+            with CaptureQueriesContext(connection) as captured:
+                import_recipes(self.user, lines, 'ndjson')
+            return len(captured)
+
+        # Without RETURNING on bulk inserts recipes are saved one by one.
+        per_recipe = \
+            0 if connection.features.can_return_rows_from_bulk_insert else 1
+        self.assertEqual(queries(30) - queries(3), 27 * per_recipe)
+
+
+class ImportCommandTests(TestCase):
+    """
+    Test the import_recipes management command.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        handle, self.path = tempfile.mkstemp(suffix='.ndjson')
+        with os.fdopen(handle, 'wb') as file:
+            file.write(ndjson(
+                sample_item(),
+                sample_item(title='Stew'),
+                sample_item(title=''),
+            ))
+        self.addCleanup(os.remove, self.path)
+
+    def test_imports_file(self):
+        """
+        Test the file is imported with progress and errors reported.
+        """
+        out = StringIO()
+        err = StringIO()
+
+        call_command(
+            'import_recipes',
+            self.user.email,
+            self.path,
+            '--batch-size', '2',
+            stdout=out,
+            stderr=err,
+        )
+
+        self.assertIn('2 rows read, 2 created, 0 failed', out.getvalue())
+        self.assertIn('Imported 2 recipes, 1 failed', out.getvalue())
+        self.assertIn('Line 3', err.getvalue())
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
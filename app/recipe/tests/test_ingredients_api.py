@@ -7,6 +7,7 @@ from core.models import Ingredient, Recipe
 from recipe.serializers import IngredientSerializer
 
 INGREDIENTS_URL = reverse('recipe:ingredient-list')
+UPSERT_URL = reverse('recipe:ingredient-upsert')
 
 
 class PublicIngredientsAPITests(TestCase):
@@ -49,7 +50,7 @@ class AuthenticatedIngredientsAPITests(TestCase):
         ingredients = Ingredient.objects.all().order_by('-name')
         serializer = IngredientSerializer(ingredients, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_for_authenticated_user(self):
         """
@@ -64,8 +65,8 @@ class AuthenticatedIngredientsAPITests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ingredient.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ingredient.name)
 
     def test_create_ingredient_successful(self):
         """
@@ -115,8 +116,8 @@ class AuthenticatedIngredientsAPITests(TestCase):
 
         serializer1 = IngredientSerializer(ingredient1)
         serializer2 = IngredientSerializer(ingredient2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
 
     def test_retrieve_ingredient_assigned_unique(self):
         """
@@ -142,4 +143,18 @@ class AuthenticatedIngredientsAPITests(TestCase):
         recipe2.ingredients.add(ingredient)
 
         res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_upsert_ingredients(self):
+        """
+        Test upserting names returns existing and new ingredients.
+        """
+        kale = Ingredient.objects.create(user=self.user, name='Kale')
+
+        res = self.client.post(
+            UPSERT_URL, [{'name': 'Kale'}, {'name': 'Salt'}], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data[0], {'id': kale.id, 'name': 'Kale'})
+        self.assertTrue(
+            Ingredient.objects.filter(user=self.user, name='Salt').exists())
@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def create_sample_recipe(user, **params):
+    """
+    Creates a sample recipe.
+    """
+    content = {
+        'title': 'Sample Recipe',
+        'prep_time_mins': 5,
+        'cook_time_mins': 15,
+        'price': 20,
+    }
+    content.update(params)
+
+    return Recipe.objects.create(user=user, **content)
+
+
+class CursorPaginationTests(TestCase):
+    """
+    Test the cursor pagination of list endpoints.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def collect_pages(self, url, params):
+        """
+        Follows next links and returns the results of every page.
+        """
+        pages = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append(res.data['results'])
+            if not res.data['next']:
+                return pages
+            res = self.client.get(res.data['next'])
+
+    def test_page_size_param(self):
+        """
+        Test clients can choose the page size.
+        """
+        for i in range(5):
+            create_sample_recipe(user=self.user, title=f'Recipe {i}')
+
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+    def test_recipe_pages_cover_all_rows_in_order(self):
+        """
+        Test walking recipe pages returns each recipe once, newest first.
+        """
+        recipes = [create_sample_recipe(user=self.user) for i in range(7)]
+
+        pages = self.collect_pages(RECIPES_URL, {'page_size': 3})
+        ids = [item['id'] for page in pages for item in page]
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(ids, sorted((r.id for r in recipes), reverse=True))
+
+    def test_cursor_stable_after_insert(self):
+        """
+        Test new recipes do not shift items into an already issued cursor.
+        """
+        for i in range(4):
+            create_sample_recipe(user=self.user)
+        first = self.client.get(RECIPES_URL, {'page_size': 2})
+        seen = [item['id'] for item in first.data['results']]
+
+        create_sample_recipe(user=self.user)
+        second = self.client.get(first.data['next'])
+        remaining = [item['id'] for item in second.data['results']]
+        self.assertEqual(len(remaining), 2)
+        self.assertFalse(set(seen) & set(remaining))
+        self.assertLess(max(remaining), min(seen))
+
+    def test_tag_pages_by_name(self):
+        """
+        Test tags are paged by name, none skipped nor repeated.
+        """
+        for name in ['Vegan', 'Vegetarian', 'Veg', 'BBQ', 'Snack']:
+            Tag.objects.create(user=self.user, name=name)
+
+        pages = self.collect_pages(TAGS_URL, {'page_size': 2})
+        items = [item for page in pages for item in page]
+        names = [item['name'] for item in items]
+        self.assertEqual(
+            names, ['Vegetarian', 'Vegan', 'Veg', 'Snack', 'BBQ'])
+        self.assertEqual(len({item['id'] for item in items}), 5)
+
+    def test_invalid_cursor(self):
+        """
+        Test a malformed cursor is rejected.
+        """
+        res = self.client.get(RECIPES_URL, {'cursor': 'not-a-cursor'})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
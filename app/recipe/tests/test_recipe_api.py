@@ -105,7 +105,7 @@ class AuthenticatedRecipesAPITests(TestCase):
         recipe = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipe, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipes_for_authenticated_user(self):
         """
@@ -122,8 +122,8 @@ class AuthenticatedRecipesAPITests(TestCase):
         recipe = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipe, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_view_recipe_detail_url(self):
         """
@@ -307,9 +307,9 @@ class RecipeImageUploadTests(TestCase):
         serializer_1 = RecipeSerializer(recipe_1)
         serializer_2 = RecipeSerializer(recipe_2)
         serializer_3 = RecipeSerializer(recipe_3)
-        self.assertIn(serializer_1.data, res.data)
-        self.assertIn(serializer_2.data, res.data)
-        self.assertNotIn(serializer_3.data, res.data)
+        self.assertIn(serializer_1.data, res.data['results'])
+        self.assertIn(serializer_2.data, res.data['results'])
+        self.assertNotIn(serializer_3.data, res.data['results'])
 
     def test_filter_recipes_by_ingredients(self):
         """
@@ -333,6 +333,107 @@ class RecipeImageUploadTests(TestCase):
         serializer_1 = RecipeSerializer(recipe_1)
         serializer_2 = RecipeSerializer(recipe_2)
         serializer_3 = RecipeSerializer(recipe_3)
-        self.assertIn(serializer_1.data, res.data)
-        self.assertIn(serializer_2.data, res.data)
-        self.assertNotIn(serializer_3.data, res.data)
+        self.assertIn(serializer_1.data, res.data['results'])
+        self.assertIn(serializer_2.data, res.data['results'])
+        self.assertNotIn(serializer_3.data, res.data['results'])
+
+
+class RecipeFilterMatchTests(TestCase):
+    """
+    Test the any/all match modes of the recipe filters.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test3@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.vegan = create_sample_tag(user=self.user, name='Vegan')
+        self.quick = create_sample_tag(user=self.user, name='Quick')
+        self.both = create_sample_recipe(user=self.user, title='Salad')
+        self.both.tags.add(self.vegan, self.quick)
+        self.vegan_only = create_sample_recipe(user=self.user, title='Stew')
+        self.vegan_only.tags.add(self.vegan)
+        self.neither = create_sample_recipe(user=self.user, title='Steak')
+
+    def result_ids(self, params):
+        """
+        Returns the IDs of recipes listed for the query parameters.
+        """
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_match_any_returns_each_recipe_once(self):
+        """
+        Test a recipe matching several tags is not duplicated.
+        """
+        ids = self.result_ids({
+            'tags': f'{self.vegan.id},{self.quick.id}',
+        })
+        self.assertEqual(ids, [self.vegan_only.id, self.both.id])
+
+    def test_match_all(self):
+        """
+        Test match=all only returns recipes having every tag.
+        """
+        ids = self.result_ids({
+            'tags': f'{self.vegan.id},{self.quick.id}',
+            'match': 'all',
+        })
+        self.assertEqual(ids, [self.both.id])
+
+    def test_match_all_with_repeated_id(self):
+        """
+        Test repeating an ID does not make match=all stricter.
+        """
+        ids = self.result_ids({
+            'tags': f'{self.vegan.id},{self.vegan.id}',
+            'match': 'all',
+        })
+        self.assertEqual(ids, [self.vegan_only.id, self.both.id])
+
+    def test_match_all_combines_tags_and_ingredients(self):
+        """
+        Test tag and ingredient filters must both match.
+        """
+        salt = create_sample_ingredient(user=self.user, name='Salt')
+        pepper = create_sample_ingredient(user=self.user, name='Pepper')
+        self.both.ingredients.add(salt)
+        self.vegan_only.ingredients.add(salt, pepper)
+
+        ids = self.result_ids({
+            'tags': f'{self.vegan.id}',
+            'ingredients': f'{salt.id},{pepper.id}',
+            'match': 'all',
+        })
+        self.assertEqual(ids, [self.vegan_only.id])
+
+    def test_invalid_match(self):
+        """
+        Test an unknown match mode is rejected.
+        """
+        res = self.client.get(RECIPES_URL, {
+            'tags': f'{self.vegan.id}',
+            'match': 'some',
+        })
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ids(self):
+        """
+        Test non-integer tag or ingredient IDs are rejected.
+        """
+        res = self.client.get(RECIPES_URL, {'tags': 'abc'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags', res.data)
+
+        res = self.client.get(RECIPES_URL, {'ingredients': '1,x'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ingredients', res.data)
+
+        res = self.client.get(
+            reverse('recipe:recipe-export'), {'tags': 'abc'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
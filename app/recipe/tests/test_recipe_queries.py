@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def recipe_detail_url(recipe_id):
+    """
+    Recipe detail URL.
+    """
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class RecipeQueryCountTests(TestCase):
+    """
+    Test the recipe API runs a fixed number of queries per request.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Dinner')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Garlic'
+        )
+
+    def create_recipes(self, count):
+        """
+        Creates recipes that each have a tag and an ingredient.
+        """
+        recipes = []
+        for i in range(count):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                prep_time_mins=5,
+                cook_time_mins=10,
+                price=5.00
+            )
+            recipe.tags.add(self.tag)
+            recipe.ingredients.add(self.ingredient)
+            recipes.append(recipe)
+
+        return recipes
+
+    def assertQueriesIndependentOfCount(self, num, url, params=None):
+        """
+        Asserts a GET costs the same queries for 1 and for 15 recipes.
+        """
+        self.create_recipes(1)
+        with self.assertNumQueries(num):
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.create_recipes(14)
+        with self.assertNumQueries(num):
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_query_count(self):
+        """
+        Test listing recipes does not query once per recipe.
+        """
+        self.assertQueriesIndependentOfCount(3, RECIPES_URL)
+
+    def test_filtered_list_query_count(self):
+        """
+        Test filtering recipes does not query once per recipe.
+        """
+        self.assertQueriesIndependentOfCount(
+            3,
+            RECIPES_URL,
+            {'tags': self.tag.id, 'ingredients': self.ingredient.id}
+        )
+
+    def test_retrieve_query_count(self):
+        """
+        Test retrieving a recipe loads its relations in one query each.
+        """
+        recipe = self.create_recipes(1)[0]
+        for i in range(5):
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f'T{i}'))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(recipe_detail_url(recipe.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 6)
+        self.assertEqual(len(res.data['ingredients']), 1)
@@ -0,0 +1,109 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Tag, Ingredient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class ScopedRelatedFieldTests(TestCase):
+    """
+    Test validating tag and ingredient IDs submitted with recipes.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(5)
+        ]
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Flour'
+        )
+
+    def post_recipe(self, **params):
+        """
+        Posts a recipe and returns the response and the queries run.
+        """
+        payload = {
+            'title': 'Bread',
+            'prep_time_mins': 20,
+            'cook_time_mins': 40,
+            'price': '3.00',
+            'ingredients': [self.ingredient.id],
+        }
+        payload.update(params)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(RECIPES_URL, payload, format='json')
+
+        return res, len(queries)
+
+    def test_query_count_independent_of_id_count(self):
+        """
+        Test submitting more IDs does not add queries.
+        """
+        res, one = self.post_recipe(tags=[self.tags[0].id])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res, five = self.post_recipe(tags=[tag.id for tag in self.tags])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(one, five)
+        self.assertEqual(len(res.data['tags']), 5)
+
+    def test_other_users_tag_rejected(self):
+        """
+        Test another user's tag cannot be attached.
+        """
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        tag = Tag.objects.create(user=other, name='Private')
+
+        res, _ = self.post_recipe(tags=[self.tags[0].id, tag.id])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data['tags'],
+            [f'Invalid pk "{tag.id}" - object does not exist.'],
+        )
+
+    def test_incorrect_type(self):
+        """
+        Test non integer IDs keep the standard error message.
+        """
+        res, _ = self.post_recipe(tags=['abc'])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data['tags'],
+            ['Incorrect type. Expected pk value, received str.'],
+        )
+
+    def test_not_a_list(self):
+        """
+        Test a single ID instead of a list is rejected.
+        """
+        res, _ = self.post_recipe(tags=self.tags[0].id)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data['tags'],
+            ['Expected a list of items but got type "int".'],
+        )
+
+    def test_duplicate_ids(self):
+        """
+        Test repeated IDs resolve to the same object.
+        """
+        tag = self.tags[0]
+        res, _ = self.post_recipe(tags=[tag.id, str(tag.id)])
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['tags'], [tag.id])
@@ -0,0 +1,155 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+BULK_URL = reverse('recipe:recipe-bulk')
+
+
+def recipe_detail_url(recipe_id):
+    """
+    Recipe detail URL.
+    """
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def create_sample_recipe(user, **params):
+    """
+    Creates a sample recipe.
+    """
+    content = {
+        'title': 'Sample Recipe',
+        'prep_time_mins': 5,
+        'cook_time_mins': 15,
+        'price': 20,
+    }
+    content.update(params)
+
+    return Recipe.objects.create(user=user, **content)
+
+
+class RecipeSearchTests(TestCase):
+    """
+    Test searching recipes by title, tag and ingredient names.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, query, **params):
+        """
+        Searches recipes and returns the IDs of the results.
+        """
+        res = self.client.get(RECIPES_URL, {'search': query, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [item['id'] for item in res.data['results']]
+
+    def test_search_title_tags_and_ingredients(self):
+        """
+        Test a recipe is found by any of its names.
+        """
+        recipe = create_sample_recipe(self.user, title='Green Curry')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Thai'))
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Coconut Milk'))
+        create_sample_recipe(self.user, title='Porridge')
+
+        self.assertEqual(self.search('curry'), [recipe.id])
+        self.assertEqual(self.search('thai'), [recipe.id])
+        self.assertEqual(self.search('coconut'), [recipe.id])
+        self.assertEqual(self.search('thai coconut'), [recipe.id])
+        self.assertEqual(self.search('thai porridge'), [])
+
+    def test_title_matches_rank_first(self):
+        """
+        Test recipes matching by title come before those matching by name.
+        """
+        by_tag = create_sample_recipe(self.user, title='Stew')
+        by_tag.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        by_title = create_sample_recipe(self.user, title='Vegan Stew')
+        by_title.tags.add(Tag.objects.create(user=self.user, name='Winter'))
+
+        self.assertEqual(self.search('vegan'), [by_title.id, by_tag.id])
+
+    def test_search_is_paginated(self):
+        """
+        Test search results come in numbered pages with a total count.
+        """
+        for i in range(5):
+            create_sample_recipe(self.user, title=f'Soup {i}')
+
+        res = self.client.get(RECIPES_URL, {'search': 'soup', 'page_size': 2})
+        self.assertEqual(res.data['count'], 5)
+        self.assertEqual(len(res.data['results']), 2)
+        res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_search_limited_to_user(self):
+        """
+        Test recipes of other users are not returned.
+        """
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345*'
+        )
+        create_sample_recipe(other, title='Lasagne')
+
+        self.assertEqual(self.search('lasagne'), [])
+
+    def test_search_too_long(self):
+        """
+        Test an overly long search is rejected.
+        """
+        res = self.client.get(RECIPES_URL, {'search': 'x' * 201})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_documents_follow_changes(self):
+        """
+        Test renamed titles and tags and removed links are searchable.
+        """
+        recipe = create_sample_recipe(self.user, title='Chili')
+        tag = Tag.objects.create(user=self.user, name='Spicy')
+        self.client.patch(
+            recipe_detail_url(recipe.id),
+            {'title': 'Bean Chili', 'tags': [tag.id]},
+        )
+        self.assertEqual(self.search('bean spicy'), [recipe.id])
+
+        tag.name = 'Hot'
+        tag.save()
+        self.assertEqual(self.search('spicy'), [])
+        self.assertEqual(self.search('hot'), [recipe.id])
+
+        tag.recipe_set.clear()
+        self.assertEqual(self.search('hot'), [])
+        recipe.tags.add(tag)
+        tag.delete()
+        self.assertEqual(self.search('hot'), [])
+        self.assertEqual(self.search('chili'), [recipe.id])
+
+    def test_bulk_created_recipes_searchable(self):
+        """
+        Test recipes written by the bulk endpoint are indexed.
+        """
+        tag = Tag.objects.create(user=self.user, name='Breakfast')
+        res = self.client.post(BULK_URL, [{
+            'title': 'Pancakes',
+            'prep_time_mins': 5,
+            'cook_time_mins': 10,
+            'price': '4.50',
+            'tags': [tag.id],
+            'ingredients': [],
+        }], format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(len(self.search('breakfast pancakes')), 1)
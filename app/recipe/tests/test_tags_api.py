@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -7,6 +8,7 @@ from core.models import Tag, Recipe
 from recipe.serializers import TagSerializer
 
 TAGS_URL = reverse('recipe:tag-list')
+UPSERT_URL = reverse('recipe:tag-upsert')
 
 
 class PublicTagsAPITests(TestCase):
@@ -49,7 +51,7 @@ class AuthenticatedTagsAPITests(TestCase):
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_for_authenticated_user(self):
         """
@@ -63,8 +65,8 @@ class AuthenticatedTagsAPITests(TestCase):
         tag = Tag.objects.create(user=self.user, name='Side Dishes')
         res = self.client.get(TAGS_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
 
     def test_create_tag_successful(self):
         """
@@ -111,8 +113,8 @@ class AuthenticatedTagsAPITests(TestCase):
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
         serializer1 = TagSerializer(tag1)
         serializer2 = TagSerializer(tag2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
 
     def test_retrieve_tags_assigned_unique(self):
         """
@@ -139,4 +141,85 @@ class AuthenticatedTagsAPITests(TestCase):
         )
         recipe2.tags.add(tag)
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_retrieve_tags_assigned_keeps_order(self):
+        """
+        Test filtering assigned tags keeps the name ordering.
+        """
+        recipe = Recipe.objects.create(
+            title='Chili',
+            prep_time_mins=10,
+            cook_time_mins=60,
+            price=8.00,
+            user=self.user
+        )
+        for name in ['Beans', 'Spicy', 'Comfort']:
+            recipe.tags.add(Tag.objects.create(user=self.user, name=name))
+        Tag.objects.create(user=self.user, name='Unused')
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+        names = [tag['name'] for tag in res.data['results']]
+        self.assertEqual(names, ['Spicy', 'Comfort', 'Beans'])
+
+    def test_create_duplicate_tag_invalid(self):
+        """
+        Test creating a tag with a name the user has is refused.
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', res.data)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_upsert_tag(self):
+        """
+        Test upserting a name creates it once and then returns it.
+        """
+        cache.clear()
+        self.client.get(TAGS_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                UPSERT_URL, {'name': 'Vegan'}, format='json')
+        again = self.client.post(UPSERT_URL, {'name': 'Vegan'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, again.data)
+        tag = Tag.objects.get(user=self.user)
+        self.assertEqual(res.data, {'id': tag.id, 'name': 'Vegan'})
+        listed = self.client.get(TAGS_URL).data['results']
+        self.assertEqual([item['id'] for item in listed], [tag.id])
+
+    def test_upsert_tags_batch(self):
+        """
+        Test a list of names is answered in order with the existing reused.
+        """
+        dinner = Tag.objects.create(user=self.user, name='Dinner')
+        other = get_user_model().objects.create_user(
+            'other@blainesmith.me',
+            'password12345'
+        )
+        Tag.objects.create(user=other, name='Quick')
+        payload = [{'name': 'Quick'}, {'name': 'Dinner'}, {'name': 'Quick'}]
+
+        with self.assertNumQueries(3):
+            res = self.client.post(UPSERT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        quick = Tag.objects.get(user=self.user, name='Quick')
+        self.assertEqual([tag['id'] for tag in res.data],
+                         [quick.id, dinner.id, quick.id])
+
+    def test_upsert_tag_invalid(self):
+        """
+        Test invalid names are reported per item.
+        """
+        res = self.client.post(
+            UPSERT_URL, [{'name': 'Vegan'}, {'name': ''}], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', res.data[1])
+        self.assertFalse(Tag.objects.exists())
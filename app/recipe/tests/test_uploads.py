@@ -0,0 +1,229 @@
+import os
+import tempfile
+import tracemalloc
+from io import BytesIO
+from PIL import Image
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.test import force_authenticate
+from core.models import Recipe
+from recipe.uploads import HEADER_LIMIT, JPEGScanner
+from recipe.views import RecipeViewSet
+
+
+def recipe_image_url(recipe_id):
+    """
+    Recipe image URL.
+    """
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def noisy_jpeg(size):
+    """
+    Returns JPEG bytes of random noise, which compresses poorly.
+    """
+    buffer = BytesIO()
+    Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3)).save(
+        buffer,
+        format='JPEG',
+        quality=95,
+    )
+
+    return buffer.getvalue()
+
+
+class JPEGScannerTests(SimpleTestCase):
+
+    def test_size_found_across_tiny_chunks(self):
+        """
+        Test the dimensions are found however the bytes are split.
+        """
+        content = noisy_jpeg((30, 20))
+        scanner = JPEGScanner()
+        sizes = [scanner.feed(content[i:i + 1]) for i in range(len(content))]
+
+        self.assertIn((30, 20), sizes)
+
+    def test_rejects_data_without_frame(self):
+        """
+        Test a JPEG reaching image data without a frame header is invalid.
+        """
+        with self.assertRaises(ValueError):
+            JPEGScanner().feed(b'\xff\xd8\xff\xda\x00\x02')
+
+
+class StreamingUploadTests(TestCase):
+    """
+    Test the streaming, size-bounded image upload handler.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@blainesmith.me',
+            'password12345*'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Curry',
+            prep_time_mins=10,
+            cook_time_mins=30,
+            price=7.00
+        )
+        self.upload_dir = self.recipe.image.storage.path('uploads/recipe')
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        if self.recipe.image:
+            self.recipe.image.delete()
+
+    def upload(self, content, suffix='.jpg'):
+        """
+        Uploads raw bytes as the recipe image.
+        """
+        with tempfile.NamedTemporaryFile(suffix=suffix) as ntf:
+            ntf.write(content)
+            ntf.seek(0)
+            return self.client.post(
+                recipe_image_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart',
+            )
+
+    def assertNoPartialFiles(self):
+        """
+        Asserts no partially written uploads were left behind.
+        """
+        leftovers = [
+            name for name in os.listdir(self.upload_dir)
+            if name.endswith('.part')
+        ]
+        self.assertEqual(leftovers, [])
+
+    def test_valid_upload_is_moved_into_storage(self):
+        """
+        Test a valid image ends up at its storage path.
+        """
+        res = self.upload(noisy_jpeg((64, 64)))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+        self.assertNoPartialFiles()
+
+    def test_jpeg_with_large_metadata(self):
+        """
+        Test metadata spanning several chunks does not hide the size.
+        """
+        buffer = BytesIO()
+        # Pillow splits the profile into APP2 segments of 64KB each.
+        Image.new('RGB', (64, 64)).save(
+            buffer,
+            format='JPEG',
+            icc_profile=os.urandom(300 * 1024),
+        )
+        content = buffer.getvalue()
+        self.assertGreater(len(content), 4 * HEADER_LIMIT)
+
+        res = self.upload(content)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNoPartialFiles()
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=100 * 100)
+    def test_rejects_large_jpeg_behind_metadata(self):
+        """
+        Test the pixel limit applies to JPEGs with large metadata.
+        """
+        buffer = BytesIO()
+        Image.new('RGB', (200, 200)).save(
+            buffer,
+            format='JPEG',
+            icc_profile=os.urandom(300 * 1024),
+        )
+        res = self.upload(buffer.getvalue())
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pixels', str(res.data['image']))
+        self.assertNoPartialFiles()
+
+    def test_rejects_non_image_bytes(self):
+        """
+        Test a file without image magic bytes is rejected.
+        """
+        res = self.upload(b'#!/bin/sh\necho definitely not an image\n')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+        self.assertNoPartialFiles()
+
+    @override_settings(RECIPE_IMAGE_MAX_BYTES=20 * 1024)
+    def test_rejects_large_file(self):
+        """
+        Test a file above the byte limit is rejected.
+        """
+        res = self.upload(noisy_jpeg((400, 400)))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('bytes', str(res.data['image']))
+        self.assertNoPartialFiles()
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=100 * 100)
+    def test_rejects_too_many_pixels(self):
+        """
+        Test an image above the pixel limit is rejected.
+        """
+        buffer = BytesIO()
+        Image.new('L', (2000, 2000)).save(buffer, format='PNG')
+        res = self.upload(buffer.getvalue(), suffix='.png')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pixels', str(res.data['image']))
+        self.assertNoPartialFiles()
+
+    def test_rejects_decompression_bomb(self):
+        """
+        Test a tiny file declaring a huge canvas is refused undecoded.
+        """
+        buffer = BytesIO()
+        Image.new('1', (20000, 20000)).save(buffer, format='PNG')
+        content = buffer.getvalue()
+        self.assertLess(len(content), 100 * 1024)
+
+        res = self.upload(content, suffix='.png')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pixels', str(res.data['image']))
+
+    def test_peak_memory_below_upload_size(self):
+        """
+        Test handling an upload does not buffer the file in memory.
+        """
+        content = noisy_jpeg((1200, 1200))
+        self.assertGreater(len(content), 1024 * 1024)
+        factory = APIRequestFactory()
+        view = RecipeViewSet.as_view({'post': 'upload_image'})
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            ntf.write(content)
+            ntf.seek(0)
+            request = factory.post(
+                recipe_image_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart',
+            )
+        force_authenticate(request, user=self.user)
+        # Load Pillow's format plugins up front, they are imported lazily.
+        Image.init()
+
+        tracemalloc.start()
+        try:
+            res = view(request, pk=self.recipe.id)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertLess(peak, len(content) / 4)
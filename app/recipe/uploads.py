@@ -0,0 +1,286 @@
+import hashlib
+import os
+import uuid
+from io import BytesIO
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (FileUploadHandler,
+                                             StopFutureHandlers)
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from core.models import Recipe
+
+# Leading bytes of the accepted image formats.
+MAGIC_BYTES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'RIFF', 'WEBP'),
+)
+# Most bytes buffered while looking for the dimensions of PNG, GIF and
+# WebP images. JPEG headers are scanned as they arrive, see JPEGScanner.
+HEADER_LIMIT = 64 * 1024
+# Allowance for multipart boundaries and other form fields.
+BODY_OVERHEAD = 64 * 1024
+
+
+def sniff_format(header):
+    """
+    Returns the image format the header starts with, or None.
+    """
+    for magic, image_format in MAGIC_BYTES:
+        if header.startswith(magic):
+            if image_format == 'WEBP' and header[8:12] != b'WEBP':
+                return None
+            return image_format
+
+    return None
+
+
+class JPEGScanner:
+    """
+    Finds the dimensions of a JPEG from chunks, skipping other segments.
+
+    Metadata segments such as EXIF or ICC profiles can add up to far more
+    than one chunk, so they are skipped by length as they stream past
+    instead of being buffered.
+    """
+    # Start of frame markers, whose segment holds the dimensions.
+    SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+    # Markers without a length and payload.
+    STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+
+    def __init__(self):
+        self.buffer = b''
+        self.skip = 0
+
+    def feed(self, data):
+        """
+        Consumes data, returns (width, height) once the frame is reached.
+
+        Returns None while more data is needed and raises ValueError for
+        data that is not a well formed JPEG header.
+        """
+        self.buffer += data
+        while True:
+            if self.skip:
+                skipped = min(self.skip, len(self.buffer))
+                self.buffer = self.buffer[skipped:]
+                self.skip -= skipped
+                if self.skip:
+                    return None
+            if len(self.buffer) < 2:
+                return None
+            if self.buffer[0] != 0xFF:
+                raise ValueError('Expected a JPEG marker.')
+            marker = self.buffer[1]
+            if marker == 0xFF:
+                # Fill byte before a marker.
+                self.buffer = self.buffer[1:]
+                continue
+            if marker in self.STANDALONE_MARKERS:
+                self.buffer = self.buffer[2:]
+                continue
+            if marker in (0xD9, 0xDA):
+                raise ValueError('No frame header before the image data.')
+            if len(self.buffer) < 4:
+                return None
+            length = int.from_bytes(self.buffer[2:4], 'big')
+            if length < 2:
+                raise ValueError('Invalid JPEG segment length.')
+            if marker in self.SOF_MARKERS:
+                if len(self.buffer) < 9:
+                    return None
+                height = int.from_bytes(self.buffer[5:7], 'big')
+                width = int.from_bytes(self.buffer[7:9], 'big')
+                return width, height
+            self.buffer = self.buffer[2:]
+            self.skip = length
+
+
+class StreamedImageFile(UploadedFile):
+    """
+    Uploaded image already written next to its final storage location.
+
+    Exposing the path lets Django validate the image from disk and move it
+    into place with a rename instead of copying it.
+    """
+
+    def __init__(self, path, name, content_type, size, charset,
+                 content_type_extra=None):
+        super().__init__(
+            open(path, 'rb'),
+            name,
+            content_type,
+            size,
+            charset,
+            content_type_extra,
+        )
+        self.path = path
+
+    def temporary_file_path(self):
+        """
+        Returns the path of the uploaded file.
+        """
+        return self.path
+
+    def close(self):
+        """
+        Closes the file and removes it unless it was moved into storage.
+        """
+        try:
+            return self.file.close()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Streams image uploads to disk, rejecting bad ones from the first bytes.
+
+    The format is checked against magic bytes and the dimensions are read
+    from the image header before anything is decoded. Oversized bodies,
+    files and pixel counts are refused, as are decompression bombs, and
+    the file is written straight into the media directory in chunks.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_bytes = getattr(
+            settings, 'RECIPE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+        self.max_pixels = getattr(
+            settings, 'RECIPE_IMAGE_MAX_PIXELS', 40 * 1000 * 1000)
+        self.storage = Recipe._meta.get_field('image').storage
+        self.destination = None
+        self.path = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        """
+        Rejects request bodies that cannot hold an acceptable image.
+        """
+        if content_length > self.max_bytes + BODY_OVERHEAD:
+            self.reject(f'Image exceeds {self.max_bytes} bytes.')
+
+    def new_file(self, *args, **kwargs):
+        """
+        Opens the destination file in the media directory.
+        """
+        super().new_file(*args, **kwargs)
+        self.header = b''
+        self.jpeg = None
+        self.checked = False
+        self.digest = hashlib.sha256()
+        directory = self.storage.path('uploads/recipe')
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'.{uuid.uuid4()}.part')
+        self.destination = open(self.path, 'wb')
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        """
+        Checks the header on the first chunks, writes and hashes the data.
+        """
+        if start + len(raw_data) > self.max_bytes:
+            self.reject(f'Image exceeds {self.max_bytes} bytes.')
+        if not self.checked:
+            self.check_header(raw_data)
+        self.destination.write(raw_data)
+        self.digest.update(raw_data)
+
+    def check_header(self, raw_data):
+        """
+        Validates format and dimensions once the header has arrived.
+        """
+        if self.jpeg is not None:
+            self.check_jpeg(raw_data)
+            return
+        self.header += raw_data
+        if len(self.header) < 12:
+            return
+        image_format = sniff_format(self.header)
+        if image_format is None:
+            self.reject('Upload a valid JPEG, PNG, GIF or WebP image.')
+        if image_format == 'JPEG':
+            self.jpeg = JPEGScanner()
+            header, self.header = self.header, b''
+            self.check_jpeg(header)
+            return
+
+        try:
+            # Image.open only parses the header, no pixels are decoded.
+            with Image.open(BytesIO(self.header)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.reject(f'Image exceeds {self.max_pixels} pixels.')
+        except (OSError, SyntaxError):
+            if len(self.header) < HEADER_LIMIT:
+                return
+            self.reject('Upload a valid JPEG, PNG, GIF or WebP image.')
+        self.check_size(width, height)
+
+    def check_jpeg(self, raw_data):
+        """
+        Feeds the JPEG scanner and validates the dimensions it finds.
+        """
+        try:
+            size = self.jpeg.feed(raw_data)
+        except ValueError:
+            self.reject('Upload a valid JPEG, PNG, GIF or WebP image.')
+        if size is not None:
+            self.check_size(*size)
+
+    def check_size(self, width, height):
+        """
+        Rejects images above the pixel limit, accepts the header otherwise.
+        """
+        if width * height > self.max_pixels:
+            self.reject(f'Image exceeds {self.max_pixels} pixels.')
+        self.checked = True
+        self.header = b''
+        self.jpeg = None
+
+    def file_complete(self, file_size):
+        """
+        Returns the written file once the whole upload was received.
+        """
+        self.destination.close()
+        if not self.checked:
+            self.reject('Upload a valid JPEG, PNG, GIF or WebP image.')
+
+        uploaded = StreamedImageFile(
+            self.path,
+            self.file_name,
+            self.content_type,
+            file_size,
+            self.charset,
+            self.content_type_extra,
+        )
+        # Hashed while streaming, so storage need not read the file again.
+        uploaded.content_hash = self.digest.hexdigest()
+
+        return uploaded
+
+    def upload_interrupted(self):
+        """
+        Removes the partial file of an aborted upload.
+        """
+        self.discard()
+
+    def discard(self):
+        """
+        Closes and deletes the destination file, if any.
+        """
+        if self.destination is not None:
+            self.destination.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def reject(self, message):
+        """
+        Discards the upload and fails the request with a 400 response.
+        """
+        self.discard()
+        raise ValidationError({'image': [message]})
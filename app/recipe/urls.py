@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from core.offload import offload
 from .views import TagViewSet, IngredientViewSet, RecipeViewSet
 
 router = DefaultRouter()
@@ -13,4 +14,25 @@ urlpatterns = [
         '',
         include(router.urls),
     ),
+    # Async variants of the read endpoints, for ASGI deployments.
+    path(
+        'async/tags/',
+        offload(TagViewSet.as_view({'get': 'list'})),
+        name='tag-list-async',
+    ),
+    path(
+        'async/ingredients/',
+        offload(IngredientViewSet.as_view({'get': 'list'})),
+        name='ingredient-list-async',
+    ),
+    path(
+        'async/recipes/',
+        offload(RecipeViewSet.as_view({'get': 'list'})),
+        name='recipe-list-async',
+    ),
+    path(
+        'async/recipes/<int:pk>/',
+        offload(RecipeViewSet.as_view({'get': 'retrieve'})),
+        name='recipe-detail-async',
+    ),
 ]
@@ -1,22 +1,63 @@
-from rest_framework import status, mixins, viewsets
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from rest_framework import serializers, status, mixins, viewsets
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError, UnsupportedMediaType
+from django.db.models import Exists, OuterRef, Prefetch
+from core.authentication import CachedTokenAuthentication
 from core.models import Tag, Ingredient, Recipe
+from core.renderers import FastJSONRenderer
+from .pagination import (RecipeCursorPagination, NameCursorPagination,
+                         RecipeSearchPagination)
+from .filters import MATCH_ANY, MATCH_MODES, filter_recipes
+from .search import MAX_QUERY_LENGTH, search_recipes
+from .autocomplete import autocomplete
+from .cache import CachedListMixin, ConditionalGetMixin
+from .fastpath import FastListMixin
+from .export import NDJSONRenderer, iter_export
+from .importer import get_format, import_recipes
+from .images import enqueue_image_job
+from .uploads import ImageUploadHandler
+from .bulk import (bulk_create_recipes, bulk_update_recipes,
+                   bulk_delete_recipes, prefetch_related_ids, upsert_names)
+from .relations import resolve_related
 from .serializers import (TagSerializer, IngredientSerializer,
                           RecipeSerializer, RecipeDetailSerializer,
                           RecipeImageSerializer)
 
 
-class BaseRecipeViewSet(viewsets.GenericViewSet,
+class BaseRecipeViewSet(ConditionalGetMixin,
+                        CachedListMixin,
+                        FastListMixin,
+                        viewsets.GenericViewSet,
                         mixins.ListModelMixin,
                         mixins.CreateModelMixin):
     """
     Viewset for recipe attributes.
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = NameCursorPagination
+    # Name of the Recipe many-to-many field that points at this model.
+    recipe_field = None
+
+    def _assigned_to_recipe(self):
+        """
+        Returns an EXISTS condition matching objects used by any recipe.
+
+        Probing the through table once per row avoids joining every
+        recipe and then de-duplicating the result with DISTINCT.
+        """
+        field = Recipe._meta.get_field(self.recipe_field)
+        through = field.remote_field.through
+        model_name = self.queryset.model._meta.model_name
+
+        return Exists(
+            through.objects.filter(**{model_name: OuterRef('pk')})
+        )
 
     def get_queryset(self):
         """
@@ -27,56 +68,280 @@ class BaseRecipeViewSet(viewsets.GenericViewSet,
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = queryset.filter(self._assigned_to_recipe())
 
         return queryset.filter(
-            user=self.request.user).order_by('-name').distinct()
-        # return self.queryset.filter(user=self.request.user).order_by('-name')
+            user=self.request.user).order_by('-name', '-id')
 
     def perform_create(self, serializer):
         """
-        Creates a new recipe.
+        Creates a new object, refusing names the user already has.
         """
-        serializer.save(user=self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            # The unique (user, name) constraint also catches names
+            # created concurrently.
+            raise ValidationError(
+                {'name': ['An object with this name already exists.']}
+            )
+
+    @action(methods=['POST'], detail=False)
+    def upsert(self, request):
+        """
+        Returns the user's objects with the given names, creating them.
+
+        Takes an object with a `name`, or a list of up to
+        RECIPE_BULK_MAX_ITEMS of them, and answers in the same shape and
+        order. Responds 201 if any name was created, else 200.
+        """
+        many = isinstance(request.data, list)
+        max_items = getattr(settings, 'RECIPE_BULK_MAX_ITEMS', 1000)
+        if many and len(request.data) > max_items:
+            raise ValidationError(
+                f'Ensure there are no more than {max_items} items.'
+            )
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+
+        items = serializer.validated_data if many \
+            else [serializer.validated_data]
+        names = [item['name'] for item in items]
+        objects, created = upsert_names(
+            self.queryset.model,
+            request.user,
+            list(dict.fromkeys(names)),
+        )
+        serializer = self.get_serializer(
+            [objects[name] for name in names],
+            many=True,
+        )
+
+        return Response(
+            serializer.data if many else serializer.data[0],
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def _get_limit(self):
+        """
+        Returns the requested number of autocomplete matches.
+        """
+        default = getattr(settings, 'RECIPE_AUTOCOMPLETE_LIMIT', 10)
+        maximum = getattr(settings, 'RECIPE_AUTOCOMPLETE_MAX_LIMIT', 50)
+        try:
+            limit = int(self.request.query_params.get('limit', default))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= maximum:
+            raise ValidationError(
+                {'limit': f'Must be a number from 1 to {maximum}.'}
+            )
+
+        return limit
+
+    @action(methods=['GET'], detail=False)
+    def autocomplete(self, request):
+        """
+        Returns the user's objects whose name starts with `q`, by name.
+        """
+        limit = self._get_limit()
+        prefix = request.query_params.get('q', '').strip()
+        max_length = self.queryset.model._meta.get_field('name').max_length
+        if not prefix or len(prefix) > max_length:
+            return Response([])
+
+        return Response([
+            {'id': pk, 'name': name}
+            for pk, name in autocomplete(
+                self.queryset.model,
+                request.user.pk,
+                prefix,
+                limit,
+            )
+        ])
 
 
 class TagViewSet(BaseRecipeViewSet):
     """
     Viewset for displaying active tag data as JSON.
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     # Retrieves active tags.
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    recipe_field = 'tags'
 
 
 class IngredientViewSet(BaseRecipeViewSet):
     """
     Viewset for displaying active ingredient data as JSON.
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     # Retrieves active ingredients.
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
+    recipe_field = 'ingredients'
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ConditionalGetMixin,
+                    CachedListMixin,
+                    FastListMixin,
+                    viewsets.ModelViewSet):
     """
     Viewset for displaying active recipe data as JSON.
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     # Retrieves active recipes.
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
+    pagination_class = RecipeCursorPagination
+    # Actions accepting the `fields` and `expand` query parameters.
+    read_actions = ('list', 'retrieve')
 
-    def _params_to_ints(self, querystring):
+    def _params_to_ints(self, querystring, param):
         """
         Convert list of IDs (string) to a list of integers.
+
+        Raises ValidationError for the query parameter `param` if any ID
+        is not an integer.
+        """
+        try:
+            return [int(str_id) for str_id in querystring.split(',')]
+        except ValueError:
+            raise ValidationError(
+                {param: 'Must be a comma-separated list of IDs.'}
+            )
+
+    def _get_search(self):
+        """
+        Returns the search string of a list request, or None.
+        """
+        if self.action != 'list':
+            return None
+        search = self.request.query_params.get('search', '').strip()
+        if len(search) > MAX_QUERY_LENGTH:
+            raise ValidationError(
+                {'search': f'Must be at most {MAX_QUERY_LENGTH} characters.'}
+            )
+
+        return search or None
+
+    @property
+    def paginator(self):
+        """
+        Pages search results by number, other lists by cursor.
+        """
+        if not hasattr(self, '_paginator') and self._get_search():
+            self._paginator = RecipeSearchPagination()
+
+        return super().paginator
+
+    def _get_param_list(self, name):
+        """
+        Returns the comma separated values of a query parameter, or None.
+        """
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+    def _get_fieldset(self):
+        """
+        Returns the fields requested with `fields`, or None for all.
+        """
+        if self.action not in self.read_actions:
+            return None
+        fields = self._get_param_list('fields')
+        if not fields:
+            return None
+        unknown = set(fields) - set(self.get_serializer_class().Meta.fields)
+        if unknown:
+            raise ValidationError(
+                {'fields': f'Unknown fields: {", ".join(sorted(unknown))}.'}
+            )
+
+        return fields
+
+    def _get_expand(self):
+        """
+        Returns the relations requested with `expand`, or None.
+        """
+        if self.action not in self.read_actions:
+            return None
+        expand = self._get_param_list('expand')
+        if expand is None:
+            return None
+        expandable = self.get_serializer_class().expandable
+        unknown = set(expand) - set(expandable)
+        if unknown:
+            raise ValidationError({
+                'expand': f'Must be a subset of: {", ".join(expandable)}.'
+            })
+
+        return set(expand)
+
+    def use_fast_list(self):
+        """
+        Uses the row serializer unless relations are nested.
+        """
+        return super().use_fast_list() and not self._get_expand()
+
+    def get_fieldset(self):
         """
-        return [int(str_id) for str_id in querystring.split(',')]
+        Returns the fields requested with `fields`, or None for all.
+        """
+        return self._get_fieldset()
+
+    def _get_prefetches(self):
+        """
+        Returns the related lookups to prefetch for the current action.
+
+        Reads only prefetch the relations they render, loading just the
+        IDs unless the relation is nested. Lists nest nothing and detail
+        views everything by default. Either way the number of queries
+        stays fixed no matter how many recipes are returned. Related
+        objects are ordered by ID, like the fast list path.
+        """
+        if self.action in ('upload_image', 'bulk', 'export', 'import_file'):
+            return ()
+        elif self.action not in self.read_actions:
+            return (
+                Prefetch('tags', queryset=Tag.objects.order_by('id')),
+                Prefetch('ingredients',
+                         queryset=Ingredient.objects.order_by('id')),
+            )
+
+        fields = self._get_fieldset()
+        expand = self._get_expand()
+        if expand is None:
+            expand = {'tags', 'ingredients'} \
+                if self.action == 'retrieve' else set()
+        prefetches = []
+        for name, model in (('tags', Tag), ('ingredients', Ingredient)):
+            if fields is not None and name not in fields:
+                continue
+            columns = ('id', 'name') if name in expand else ('id',)
+            prefetches.append(
+                Prefetch(name, queryset=model.objects.only(
+                    *columns).order_by('id'))
+            )
+
+        return prefetches
+
+    def _get_columns(self, queryset):
+        """
+        Limits a read to the columns of the requested fields.
+        """
+        fields = self._get_fieldset()
+        if fields is None:
+            return queryset.defer('search_document')
+
+        return queryset.only(*self.get_serializer_class().get_columns(fields))
 
     def get_queryset(self):
         """
@@ -84,16 +349,31 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
-        queryset = self.queryset
+        match = self.request.query_params.get('match', MATCH_ANY)
+        queryset = self.queryset.prefetch_related(*self._get_prefetches())
+
+        if match not in MATCH_MODES:
+            raise ValidationError(
+                {'match': f'Must be one of: {", ".join(MATCH_MODES)}.'}
+            )
+        queryset = filter_recipes(
+            queryset,
+            tag_ids=self._params_to_ints(tags, 'tags') if tags else None,
+            ingredient_ids=(
+                self._params_to_ints(ingredients, 'ingredients')
+                if ingredients else None
+            ),
+            match=match,
+        )
 
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+        queryset = queryset.filter(user=self.request.user)
+        if self.action in self.read_actions:
+            queryset = self._get_columns(queryset)
+        search = self._get_search()
+        if search:
+            return search_recipes(queryset, search)
 
-        return queryset.filter(user=self.request.user).order_by('-id')
+        return queryset.order_by('-id')
 
     def get_serializer_class(self):
         """
@@ -106,6 +386,37 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return self.serializer_class
 
+    def get_serializer(self, *args, **kwargs):
+        """
+        Returns a serializer limited to the requested fields on reads.
+        """
+        if self.action in self.read_actions:
+            kwargs.setdefault('fields', self._get_fieldset())
+            kwargs.setdefault('expand', self._get_expand())
+
+        return super().get_serializer(*args, **kwargs)
+
+    def initialize_request(self, request, *args, **kwargs):
+        """
+        Streams image uploads through the size-bounded upload handler.
+        """
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == 'upload_image':
+            request.upload_handlers = [ImageUploadHandler(request)]
+
+        return drf_request
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns a recipe, or 304 if the client's copy is current.
+        """
+        return self.conditional_get(
+            super().retrieve,
+            request,
+            *args,
+            **kwargs
+        )
+
     def perform_create(self, serializer):
         """
         Creates a new recipe.
@@ -115,7 +426,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
         """
-        Uploads an image to a recipe.
+        Uploads an image to a recipe and queues its resized variants.
         """
         recipe = self.get_object()
         serializer = self.get_serializer(
@@ -124,7 +435,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
 
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                # Variants are rendered off the request thread, the
+                # response lists them once the job has finished. Files
+                # of the previous image are released by the save.
+                serializer.save(image_variants={})
+                enqueue_image_job(recipe)
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK,
@@ -134,3 +450,170 @@ class RecipeViewSet(viewsets.ModelViewSet):
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+    @action(
+        methods=['GET'],
+        detail=False,
+        renderer_classes=[NDJSONRenderer, FastJSONRenderer],
+    )
+    def export(self, request):
+        """
+        Streams the user's recipes as newline delimited JSON.
+
+        Accepts the `tags`, `ingredients` and `match` filters of the list.
+        Each line is a recipe with its tags and ingredients nested.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            iter_export(queryset),
+            content_type=NDJSONRenderer.media_type,
+        )
+        response['Content-Disposition'] = \
+            'attachment; filename="recipes.ndjson"'
+
+        return response
+
+    @action(
+        methods=['POST'],
+        detail=False,
+        url_path='import',
+        url_name='import',
+    )
+    def import_file(self, request):
+        """
+        Imports recipes from an NDJSON or CSV file.
+
+        The file is the request body, typed `application/x-ndjson` or
+        `text/csv`, or the `file` field of a multipart form. It is read
+        line by line and written in batches, tags and ingredients are
+        matched or created by name. Returns counts and per-line errors.
+        """
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({'file': ['No file was submitted.']})
+            file_format = get_format(upload.name, upload.content_type)
+            lines = upload
+        else:
+            file_format = get_format(media_type=request.content_type)
+            lines = request.stream or ()
+        if file_format is None:
+            raise UnsupportedMediaType(request.content_type)
+
+        result = import_recipes(request.user, lines, file_format)
+
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    @action(methods=['POST', 'PATCH', 'DELETE'], detail=False)
+    def bulk(self, request):
+        """
+        Creates, updates or deletes many recipes in one transaction.
+
+        POST takes a list of recipes, PATCH a list of partial recipes with
+        their `id` and DELETE a list of IDs. Errors are reported per item
+        and nothing is written unless every item is valid.
+        """
+        items = request.data
+        max_items = getattr(settings, 'RECIPE_BULK_MAX_ITEMS', 1000)
+        if not isinstance(items, list):
+            raise ValidationError('Expected a list of items.')
+        if len(items) > max_items:
+            raise ValidationError(
+                f'Ensure there are no more than {max_items} items.'
+            )
+
+        if request.method == 'DELETE':
+            return self._bulk_delete(items)
+        elif request.method == 'PATCH':
+            return self._bulk_update(items)
+
+        return self._bulk_create(items)
+
+    def _get_bulk_context(self, items):
+        """
+        Returns the serializer context with the items' relations resolved.
+
+        Tags and ingredients of all items are looked up in one query per
+        relation, so validation does not query once per item.
+        """
+        context = self.get_serializer_context()
+        context['related_objects'] = resolve_related(
+            self.get_serializer(), items)
+
+        return context
+
+    def _bulk_create(self, items):
+        """
+        Validates and creates a list of recipes.
+        """
+        serializer = self.get_serializer(
+            data=items,
+            many=True,
+            context=self._get_bulk_context(items),
+        )
+        serializer.is_valid(raise_exception=True)
+        recipes = bulk_create_recipes(
+            self.request.user,
+            serializer.validated_data,
+        )
+        prefetch_related_ids(recipes)
+
+        return Response(
+            self.get_serializer(recipes, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _bulk_update(self, items):
+        """
+        Validates and partially updates a list of recipes.
+
+        Each recipe may only be listed once, repeats are reported as
+        errors on the later items.
+        """
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        recipes = self.get_queryset().in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+        context = self._get_bulk_context(items)
+        seen = set()
+        pairs = []
+        errors = []
+        for item in items:
+            recipe = None
+            if isinstance(item, dict):
+                recipe = recipes.get(item.get('id'))
+            if recipe is None:
+                errors.append({'id': ['Not found.']})
+                continue
+            if recipe.pk in seen:
+                errors.append({'id': ['Listed more than once.']})
+                continue
+            seen.add(recipe.pk)
+            serializer = self.get_serializer(
+                recipe, data=item, partial=True, context=context)
+            if serializer.is_valid():
+                pairs.append((recipe, serializer.validated_data))
+                errors.append({})
+            else:
+                errors.append(serializer.errors)
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        recipes = bulk_update_recipes(self.request.user, pairs)
+        prefetch_related_ids(recipes)
+
+        return Response(
+            self.get_serializer(recipes, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    def _bulk_delete(self, items):
+        """
+        Deletes a list of recipes by ID.
+        """
+        ids = serializers.ListField(
+            child=serializers.IntegerField()
+        ).run_validation(items)
+        deleted = bulk_delete_recipes(self.request.user, ids)
+
+        return Response({'deleted': deleted}, status=status.HTTP_200_OK)
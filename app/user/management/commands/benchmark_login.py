@@ -0,0 +1,85 @@
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.test import APIRequestFactory
+from core.benchmark import rolled_back, measure, create_benchmark_user
+from user.serializers import AuthTokenSerializer
+from user.views import CreateTokenView
+
+# Backends of the stock login, which looks the token up separately.
+STOCK_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+
+
+class Command(BaseCommand):
+    """
+    Django command to benchmark token logins per hashing work factor.
+
+    Compares DRF's stock ObtainAuthToken with the login endpoint. Every
+    user and token the benchmark creates is rolled back.
+    """
+    help = 'Benchmarks login throughput for PBKDF2 iteration counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            help='Comma separated PBKDF2 iteration counts, by default the '
+                 'configured one.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Logins per measurement; the median is reported.',
+        )
+
+    def handle(self, *args, **options):
+        counts = options['iterations'] or str(getattr(
+            settings, 'PASSWORD_HASH_ITERATIONS', 260000))
+        for iterations in [int(n) for n in counts.split(',')]:
+            with override_settings(PASSWORD_HASH_ITERATIONS=iterations):
+                with rolled_back():
+                    results = self.bench(options['repeat'])
+            for name, ms, queries in results:
+                self.stdout.write(
+                    f'{iterations:>8} iterations  {name:<8} {ms:8.2f} ms '
+                    f'{1000 / ms:8.1f} logins/s  {queries} queries'
+                )
+
+    def bench(self, repeat):
+        """
+        Returns the name, median ms and queries of each login path.
+        """
+        password = uuid.uuid4().hex
+        user = create_benchmark_user()
+        user.set_password(password)
+        user.save()
+        factory = APIRequestFactory()
+        payload = {'email': user.email, 'password': password}
+        stock_view = ObtainAuthToken.as_view(
+            serializer_class=AuthTokenSerializer)
+        fast_view = CreateTokenView.as_view()
+
+        def login(view):
+            response = view(factory.post('/', payload, format='json'))
+            if response.status_code != 200:
+                raise CommandError(f'Login failed: {response.data}')
+
+        results = []
+        for name, view, backends in (
+                ('stock', stock_view, STOCK_BACKENDS),
+                ('fast', fast_view, settings.AUTHENTICATION_BACKENDS)):
+            with override_settings(AUTHENTICATION_BACKENDS=backends):
+                # Issues the token, later logins measure the steady state.
+                login(view)
+                with CaptureQueriesContext(connection) as queries:
+                    login(view)
+                results.append((
+                    name,
+                    measure(lambda: login(view), repeat),
+                    len(queries),
+                ))
+
+        return results
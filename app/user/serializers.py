@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import ugettext_lazy as _
 from rest_framework import serializers
 
+AUTHENTICATION_ERROR = _('Cannot authenticate with credentials')
+
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -31,20 +33,26 @@ class UserSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """
         Update user by providing correct password.
+
+        Only the submitted fields are saved, so columns changed elsewhere
+        since the user was read are not written back.
         """
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        update_fields = list(validated_data)
 
         if password:
-            user.set_password(password)
-            user.save()
-        return user
+            instance.set_password(password)
+            update_fields.append('password')
+        if update_fields:
+            instance.save(update_fields=update_fields)
+        return instance
 
 
-class AuthTokenSerializer(serializers.Serializer):
+class CredentialsSerializer(serializers.Serializer):
     """
-    Serializes and deserializes user authentication
-    instances into representations(JSON).
+    Validates the shape of login credentials without checking them.
     """
     email = serializers.CharField()
     password = serializers.CharField(
@@ -52,6 +60,13 @@ class AuthTokenSerializer(serializers.Serializer):
         trim_whitespace=False
     )
 
+
+class AuthTokenSerializer(CredentialsSerializer):
+    """
+    Serializes and deserializes user authentication
+    instances into representations(JSON).
+    """
+
     def validate(self, attrs):
         """
         Authenticates the user.
@@ -65,8 +80,8 @@ class AuthTokenSerializer(serializers.Serializer):
             password=password,
         )
         if not user:
-            msg = _('Cannot authenticate with credentials')
-            raise serializers.ValidationError(msg, code='authentication')
+            raise serializers.ValidationError(
+                AUTHENTICATION_ERROR, code='authentication')
 
         attrs['user'] = user
         return attrs
@@ -0,0 +1,199 @@
+from unittest.mock import patch
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (AsyncClient, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core.hashing import HashPool, hash_pool_stats
+
+CREATE_USER_URL = reverse('user:create-async')
+TOKEN_URL = reverse('user:token-async')
+SYNC_TOKEN_URL = reverse('user:token')
+PROFILE_URL = reverse('user:profile-async')
+PAYLOAD = {
+    'email': 'test@blainesmith.me',
+    'password': 'password12345',
+}
+
+
+@override_settings(PASSWORD_HASH_STATS_ALIAS='default')
+class AsyncUserViewTests(TestCase):
+    """
+    Test the login and signup views hashing in the password pool.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.pool = HashPool(workers=1, queue_size=0, kind='thread')
+        patcher = patch('user.views.get_hash_pool', return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    async def test_asgi_login(self):
+        """
+        Test the login through the ASGI handler.
+        """
+        await sync_to_async(get_user_model().objects.create_user)(**PAYLOAD)
+
+        res = await AsyncClient().post(
+            TOKEN_URL, PAYLOAD, content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', res.json())
+
+    def test_login(self):
+        """
+        Test the login issues the same token as the API view.
+        """
+        user = get_user_model().objects.create_user(**PAYLOAD)
+
+        res = self.client.post(TOKEN_URL, PAYLOAD, format='json')
+        sync = self.client.post(SYNC_TOKEN_URL, PAYLOAD)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['token'], Token.objects.get(user=user).key)
+        self.assertEqual(res.json(), sync.json())
+        self.assertEqual(hash_pool_stats()['jobs'], 1)
+
+    def test_login_invalid_credentials(self):
+        """
+        Test wrong passwords and unknown users get the API's error.
+        """
+        get_user_model().objects.create_user(**PAYLOAD)
+        wrong = dict(PAYLOAD, password='incorrect')
+        unknown = dict(PAYLOAD, email='nobody@blainesmith.me')
+
+        for payload in (wrong, unknown):
+            res = self.client.post(TOKEN_URL, payload, format='json')
+            sync = self.client.post(SYNC_TOKEN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(res.json(), sync.json())
+        self.assertFalse(Token.objects.exists())
+
+    def test_login_missing_field(self):
+        """
+        Test both credentials are required.
+        """
+        res = self.client.post(TOKEN_URL, {'email': PAYLOAD['email']})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', res.json())
+
+    def test_login_upgrades_hash(self):
+        """
+        Test a hash with an outdated work factor is rewritten on login.
+        """
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            user = get_user_model().objects.create_user(**PAYLOAD)
+
+        with self.settings(PASSWORD_HASH_ITERATIONS=1100):
+            self.client.post(TOKEN_URL, PAYLOAD, format='json')
+
+        user.refresh_from_db()
+        self.assertIn('$1100$', user.password)
+
+    def test_signup(self):
+        """
+        Test signing up creates the user with the hashed password.
+        """
+        payload = dict(PAYLOAD, name='Jon Snow')
+
+        res = self.client.post(CREATE_USER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.json(), {
+            'email': 'test@blainesmith.me',
+            'name': 'Jon Snow',
+        })
+        user = get_user_model().objects.get(email=PAYLOAD['email'])
+        self.assertTrue(user.check_password(PAYLOAD['password']))
+
+    def test_signup_invalid(self):
+        """
+        Test existing emails and short passwords are refused.
+        """
+        get_user_model().objects.create_user(**PAYLOAD)
+
+        res = self.client.post(CREATE_USER_URL, PAYLOAD, format='json')
+        short = self.client.post(CREATE_USER_URL, {
+            'email': 'other@blainesmith.me',
+            'password': 'pass',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', res.json())
+        self.assertIn('password', short.json())
+
+    def test_saturated_pool(self):
+        """
+        Test requests are shed with a 429 while the pool is full.
+        """
+        get_user_model().objects.create_user(**PAYLOAD)
+        self.pool.pending = 1
+
+        login = self.client.post(TOKEN_URL, PAYLOAD, format='json')
+        signup = self.client.post(CREATE_USER_URL, dict(
+            PAYLOAD, email='other@blainesmith.me', name='Jon'), format='json')
+
+        for res in (login, signup):
+            self.assertEqual(
+                res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(res['Retry-After'], '1')
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(hash_pool_stats()['rejected'], 2)
+
+    def test_malformed_json(self):
+        """
+        Test bodies that are not JSON are refused.
+        """
+        res = self.client.generic(
+            'POST', TOKEN_URL, b'{"email": ', content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_only(self):
+        """
+        Test other methods are not allowed.
+        """
+        res = self.client.get(TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class AsyncProfileViewTests(TransactionTestCase):
+    """
+    Test the async profile view, which reads in a pool thread and so
+    needs committed data.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            name='Jon', **PAYLOAD)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_retrieve_profile(self):
+        """
+        Test the profile matches the sync view.
+        """
+        res = self.client.get(PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), self.client.get(
+            reverse('user:profile')).json())
+
+    def test_update_not_allowed(self):
+        """
+        Test the async profile is read only.
+        """
+        res = self.client.patch(PROFILE_URL, {'name': 'Jonny'})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Jon')
@@ -0,0 +1,26 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class BenchmarkLoginCommandTests(TestCase):
+
+    def test_benchmark_login(self):
+        """
+        Test both login paths are reported and nothing is kept.
+        """
+        out = StringIO()
+
+        call_command(
+            'benchmark_login',
+            '--iterations', '1000,2000',
+            '--repeat', '1',
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn('1000 iterations  stock', output)
+        self.assertIn('2000 iterations  fast', output)
+        self.assertIn('1 queries', output)
+        self.assertFalse(get_user_model().objects.exists())
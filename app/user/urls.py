@@ -1,4 +1,5 @@
 from django.urls import path
+from core.offload import offload
 from . import views
 
 app_name = 'user'
@@ -14,9 +15,26 @@ urlpatterns = [
         views.CreateTokenView.as_view(),
         name='token'
     ),
+    path(
+        'async/create/',
+        views.create_user_async,
+        name='create-async'
+    ),
+    path(
+        'async/token/',
+        views.create_token_async,
+        name='token-async'
+    ),
     path(
         'profile/',
         views.ManageUserView.as_view(),
         name='profile'
     ),
+    path(
+        'async/profile/',
+        offload(views.ManageUserView.as_view(
+            http_method_names=['get', 'head', 'options'],
+        )),
+        name='profile-async'
+    ),
 ]
@@ -1,7 +1,15 @@
-from rest_framework import generics, authentication, permissions
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
-from .serializers import UserSerializer, AuthTokenSerializer
+from core.authentication import CachedTokenAuthentication, issue_token
+from core.hashing import PoolSaturated, get_hash_pool
+from .serializers import (UserSerializer, AuthTokenSerializer,
+                          CredentialsSerializer, AUTHENTICATION_ERROR)
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -18,17 +26,158 @@ class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
+    def post(self, request, *args, **kwargs):
+        """
+        Returns the user's token, issued without a separate lookup.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = issue_token(serializer.validated_data['user'])
+
+        return Response({'token': token.key})
+
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """
     Manage authenticated user.
     """
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         """
-        Return authenticated user.
+        Return authenticated user, read fresh from the database.
         """
-        return self.request.user
+        return get_user_model().objects.get(pk=self.request.user.pk)
+
+
+def parse_body(request):
+    """
+    Returns the JSON or form data of a request, or None if malformed.
+    """
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+
+    return request.POST
+
+
+def error_response(detail, status):
+    """
+    Returns an error response shaped like the API's.
+    """
+    if isinstance(detail, str):
+        detail = {'detail': detail}
+
+    return JsonResponse(detail, status=status)
+
+
+def saturated_response():
+    """
+    Returns the response to requests shed while the hashing pool is full.
+    """
+    response = error_response(
+        'Too many password checks in progress, retry shortly.',
+        status=429,
+    )
+    response['Retry-After'] = '1'
+
+    return response
+
+
+def get_login_user(email):
+    """
+    Returns the user with email and their token loaded, or None.
+    """
+    UserModel = get_user_model()
+    try:
+        return UserModel._default_manager.select_related(
+            'auth_token').get(**{UserModel.USERNAME_FIELD: email})
+    except UserModel.DoesNotExist:
+        return None
+
+
+def complete_login(user, upgraded):
+    """
+    Stores an upgraded password hash and returns the user's token.
+    """
+    if upgraded is not None:
+        user.password = upgraded
+        user.save(update_fields=['password'])
+
+    return issue_token(user)
+
+
+async def create_token_async(request):
+    """
+    Creates a new auth token for user, hashing in the password pool.
+
+    Accepts the same data as CreateTokenView. The event loop only waits
+    on the database and on the pool, so slow hashes do not hold up other
+    requests. Responds 429 while the pool's queue is full.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    data = parse_body(request)
+    if data is None:
+        return error_response('Malformed request.', status=400)
+    serializer = CredentialsSerializer(data=data)
+    if not serializer.is_valid():
+        return error_response(serializer.errors, status=400)
+
+    pool = get_hash_pool()
+    email = serializer.validated_data['email']
+    password = serializer.validated_data['password']
+    user = await sync_to_async(get_login_user)(email)
+    try:
+        if user is None:
+            # Hash anyway so response times do not reveal which users
+            # exist, like ModelBackend.
+            await pool.make_password(password)
+            valid, upgraded = False, None
+        else:
+            valid, upgraded = await pool.check_password(
+                password, user.password)
+    except PoolSaturated:
+        return saturated_response()
+    if not valid or not user.is_active:
+        return error_response(
+            {'non_field_errors': [AUTHENTICATION_ERROR]}, status=400)
+
+    token = await sync_to_async(complete_login)(user, upgraded)
+
+    return JsonResponse({'token': token.key})
+
+
+async def create_user_async(request):
+    """
+    Creates a new user, hashing the password in the password pool.
+
+    Accepts the same data as CreateUserView. Responds 429 while the
+    pool's queue is full.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    data = parse_body(request)
+    if data is None:
+        return error_response('Malformed request.', status=400)
+    serializer = UserSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return error_response(serializer.errors, status=400)
+
+    try:
+        password_hash = await get_hash_pool().make_password(
+            serializer.validated_data['password'])
+    except PoolSaturated:
+        return saturated_response()
+    await sync_to_async(serializer.save)(password_hash=password_hash)
+
+    return JsonResponse(serializer.data, status=201)
+
+
+# Token and JSON clients, like the API views, which DRF exempts.
+create_token_async.csrf_exempt = True
+create_user_async.csrf_exempt = True